@@ -0,0 +1,134 @@
+import logging
+from PIL import Image, ImageSequence
+
+logger = logging.getLogger("ImageConverter")
+
+FRAME_POLICIES = ("drop", "merge")
+# GIF dengan delay 0 diputar browser sekitar 10 fps; pakai angka yang sama
+DEFAULT_FRAME_MS = 100
+# keyframe default gif2webp (lossy / lossless)
+_KEYFRAMES = {False: (3, 5), True: (9, 17)}
+
+
+def is_animated(img):
+    """
+    True untuk GIF/APNG/WebP dengan lebih dari satu frame. Untuk GIF hanya
+    mengecek keberadaan frame kedua (tanpa menghitung semua frame).
+    """
+    return bool(getattr(img, "is_animated", False))
+
+
+def source_loop(img):
+    """
+    Jumlah putaran untuk WebP (0 = tanpa henti). GIF tanpa blok NETSCAPE diputar
+    sekali, jadi loop=1; APNG menyimpan num_plays di info["loop"].
+    """
+    return int(img.info.get("loop", 1 if img.format == "GIF" else 0))
+
+
+def iter_frames(img, max_fps=None, policy="drop", transform=None):
+    """
+    Generator (frame, timestamp_ms, duration_ms) yang men-decode frame satu per
+    satu (ImageSequence, seek berurutan), jadi memori mengikuti satu-dua frame,
+    bukan seluruh animasi.
+    max_fps: batas frame rate output. Frame yang jatuh di interval yang sama
+             digabung: "drop" menampilkan frame pertama interval itu, "merge"
+             merata-rata semua frame di interval (Image.blend bertahap). Durasi
+             total animasi tidak berubah.
+    transform: callable opsional per frame (mis. resize), dipanggil sebelum digabung.
+    """
+    if policy not in FRAME_POLICIES:
+        raise ValueError("frame policy harus salah satu dari %s" % (FRAME_POLICIES,))
+    min_interval = 1000.0 / max_fps if max_fps else 0.0
+    pending = None  # [frame, timestamp, jumlah frame yang digabung]
+    timestamp = 0
+    for frame in ImageSequence.Iterator(img):
+        duration = frame.info.get("duration") or DEFAULT_FRAME_MS
+        if pending is not None and timestamp - pending[1] < min_interval:
+            if policy == "merge":
+                pending[2] += 1
+                current = _as_rgba(frame, transform)
+                pending[0] = Image.blend(pending[0], current, 1.0 / pending[2])
+            timestamp += duration
+            continue
+        if pending is not None:
+            yield pending[0], pending[1], timestamp - pending[1]
+        converted = _as_rgba(frame, transform) if policy == "merge" else _as_output(frame, transform)
+        pending = [converted, timestamp, 1]
+        timestamp += duration
+    if pending is not None:
+        yield pending[0], pending[1], timestamp - pending[1]
+
+
+def _as_output(frame, transform):
+    # copy: frame sumber dipakai ulang oleh decoder saat seek berikutnya
+    mode = "RGBA" if frame.mode in ("RGBA", "LA", "PA") or "transparency" in frame.info else "RGB"
+    converted = frame.convert(mode) if frame.mode != mode else frame.copy()
+    return transform(converted) if transform is not None else converted
+
+
+def _as_rgba(frame, transform):
+    # blend butuh mode yang sama di semua frame
+    converted = frame.convert("RGBA")
+    return transform(converted) if transform is not None else converted
+
+
+class AnimatedWebPWriter:
+    """
+    Encoder WebP animasi yang menerima frame satu per satu (WebPAnimEncoder
+    Pillow). Frame langsung di-encode saat add(), jadi yang tersimpan hanya
+    hasil kompresi, bukan frame mentah. Image.save(save_all=True) butuh semua
+    frame sebagai list append_images, karena itu encoder dipakai langsung.
+    """
+
+    def __init__(self, size, loop=0, quality=80, lossless=False, method=4, background=(0, 0, 0, 0)):
+        from PIL import _webp
+        if not hasattr(_webp, "WebPAnimEncoder"):
+            raise RuntimeError("Pillow ini dibangun tanpa dukungan WebP animasi")
+        kmin, kmax = _KEYFRAMES[bool(lossless)]
+        r, g, b, a = background
+        self.size = size
+        self.quality = int(quality)
+        self.lossless = bool(lossless)
+        self.method = int(method)
+        self.frames = 0
+        self._end = 0
+        self._new_api = hasattr(Image.Image, "getim")  # Pillow >= 11: size tuple + ImagingCore
+        background = (a << 24) | (r << 16) | (g << 8) | b
+        args = (background, int(loop), False, kmin, kmax, False, False)
+        self._encoder = (_webp.WebPAnimEncoder(size, *args) if self._new_api
+                         else _webp.WebPAnimEncoder(size[0], size[1], *args))
+
+    def add(self, frame, timestamp, duration):
+        if frame.size != self.size:
+            raise ValueError("ukuran frame %s berbeda dari animasi %s" % (frame.size, self.size))
+        if frame.mode not in ("RGB", "RGBA"):
+            frame = frame.convert("RGBA")
+        if self._new_api:
+            self._encoder.add(frame.getim(), int(round(timestamp)), self.lossless, self.quality,
+                              100, self.method)
+        else:
+            rawmode = "RGBA" if frame.mode == "RGBA" else "RGBX"
+            self._encoder.add(frame.tobytes("raw", rawmode), int(round(timestamp)), frame.width,
+                              frame.height, rawmode, self.lossless, self.quality, 100, self.method)
+        self.frames += 1
+        self._end = max(self._end, timestamp + duration)
+
+    def finish(self, fp):
+        """
+        Flush encoder dan tulis file WebP ke fp (file object atau path).
+        """
+        if self._new_api:
+            self._encoder.add(None, int(round(self._end)), self.lossless, self.quality, 100, 0)
+        else:
+            self._encoder.add(None, int(round(self._end)), 0, 0, "", self.lossless, self.quality,
+                              100, 0)
+        data = self._encoder.assemble(b"", b"", b"")
+        if data is None:
+            raise OSError("encoder WebP animasi gagal (assemble mengembalikan None)")
+        if isinstance(fp, str):
+            with open(fp, "wb") as f:
+                f.write(data)
+        else:
+            fp.write(data)
+        return len(data)
@@ -0,0 +1,1137 @@
+"""
+Benchmark untuk ImageConverter.
+
+Contoh:
+    python benchmark.py run --files 200 --save baseline.json
+    python benchmark.py run --files 200 --baseline baseline.json
+    python benchmark.py compare baseline.json current.json
+    python benchmark.py resize
+    python benchmark.py presets --formats webp jpeg png
+    python benchmark.py logging --files 10000
+    python benchmark.py target --files 20 --target-kb 150
+    python benchmark.py autoquality --files 20 --target-ssim 0.95
+    python benchmark.py schedule --small 48 --large 2 --workers 4
+    python benchmark.py memory --files 6 --budget-mb 200
+    python benchmark.py coldstart --repeat 5
+    python benchmark.py bytes --files 50
+    python benchmark.py dedupe --hashes 500000
+    python benchmark.py journal --files 50000
+    python benchmark.py animation --frames 150 --max-fps 15
+"""
+import io
+import os
+import sys
+import json
+import heapq
+import queue
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+from logging.handlers import QueueHandler, QueueListener
+from PIL import Image
+from converter import ImageConverter
+from metrics import JsonLinesSink
+from logsetup import LOG_FORMAT, CompressingRotatingFileHandler
+from sizing import DEFAULT_MIN_QUALITY, search_quality
+from dedupe import DEFAULT_MAX_DISTANCE, group_duplicates
+from journal import DEFAULT_FLUSH_RECORDS, BatchJournal
+from perceptual import DEFAULT_TARGET_SSIM, luma_plane, ssim
+from schedule import SCHEDULES, order_paths
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CORPUS_KINDS = ("jpeg", "png_rgb", "png_rgba", "palette")
+RUN_MODES = ("serial", "parallel", "cache", "metrics")
+
+
+def make_photo(path, width, height, quality=90):
+    """
+    Buat gambar sintetis mirip foto (gradien + noise) supaya encoder
+    tidak mendapat input yang terlalu mudah dikompres.
+    """
+    noise = Image.effect_noise((width, height), 48)
+    gradient = Image.linear_gradient("L")
+    grad_x = gradient.resize((width, height))
+    grad_y = gradient.rotate(90).resize((width, height))
+    img = Image.merge("RGB", (noise, grad_x, grad_y))
+    img.save(path, quality=quality)
+    return path
+
+
+def _synthetic_image(rng, width, height, mode):
+    """
+    Tekstur halus dari noise resolusi rendah yang di-upscale: deterministik
+    untuk seed yang sama dan kompresinya mirip foto (tidak seperti noise murni).
+    """
+    bands = len(mode)
+    small_w, small_h = max(2, width // 16), max(2, height // 16)
+    small = Image.frombytes(mode, (small_w, small_h), rng.randbytes(small_w * small_h * bands))
+    return small.resize((width, height), Image.BICUBIC)
+
+
+def generate_corpus(directory, count=100, seed=1234, min_side=256, max_side=2048, kinds=CORPUS_KINDS):
+    """
+    Buat korpus sintetis yang reproducible (seed sama -> file sama) berisi
+    campuran JPEG, PNG RGB, PNG RGBA dan PNG palette dengan ukuran acak.
+    Mengembalikan list path file yang dibuat.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        width = rng.randint(min_side, max_side)
+        height = max(min_side, int(width * rng.uniform(0.5, 1.5)))
+        if kind == "png_rgba":
+            img = _synthetic_image(rng, width, height, "RGBA")
+        else:
+            img = _synthetic_image(rng, width, height, "RGB")
+        if kind == "jpeg":
+            path = os.path.join(directory, "img_%05d.jpg" % i)
+            img.save(path, quality=rng.randint(70, 95))
+        else:
+            if kind == "palette":
+                img = img.quantize(colors=rng.choice((16, 64, 256)))
+            path = os.path.join(directory, "img_%05d.png" % i)
+            img.save(path, compress_level=1)
+        paths.append(path)
+    return paths
+
+
+class _TimedConverter(ImageConverter):
+    """
+    ImageConverter yang ikut mengembalikan latency per file dari worker
+    (mode paralel), supaya p50/p95 tetap terukur di process pool.
+    """
+
+    def _convert_one(self, input_path, quality=80, use_cache=False, **options):
+        start = time.perf_counter()
+        filename, success, info, record = super()._convert_one(input_path, quality, use_cache, **options)
+        return filename, success, (info, time.perf_counter() - start), record
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _peak_rss_mb():
+    """
+    Peak RSS proses ini dan proses anak (worker pool), dalam MB.
+    """
+    if resource is None:
+        return None
+    scale = 1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0
+    self_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(self_peak, child_peak) / scale, 1)
+
+
+def _copy_corpus(corpus_dir, input_dir):
+    total = 0
+    for name in sorted(os.listdir(corpus_dir)):
+        src = os.path.join(corpus_dir, name)
+        shutil.copy(src, os.path.join(input_dir, name))
+        total += os.path.getsize(src)
+    return total
+
+
+def run_mode(mode, corpus_dir, workers=None, quality=80):
+    """
+    Jalankan satu mode konversi terhadap salinan korpus dan kembalikan metriknya.
+    Dipanggil di subprocess terpisah (lihat run_suite) supaya peak RSS per mode bersih.
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        converter = _TimedConverter(base_media_dir=os.path.join(tmp, "media"))
+        use_cache = mode == "cache"
+        if mode == "metrics":
+            # sama dengan serial tapi metrics hook aktif -> ukur overhead instrumentasi
+            converter.metrics_hook = JsonLinesSink(os.path.join(tmp, "metrics.jsonl"))
+        if use_cache:
+            # warm-up: isi manifest, lalu ukur run kedua (semua cache hit)
+            _copy_corpus(corpus_dir, converter.input_dir)
+            converter.convert_all(quality=quality, use_cache=True)
+            for name in os.listdir(converter.success_dir):
+                os.remove(os.path.join(converter.success_dir, name))
+        total_bytes = _copy_corpus(corpus_dir, converter.input_dir)
+        input_paths = [os.path.join(converter.input_dir, name)
+                       for name in sorted(os.listdir(converter.input_dir))]
+
+        latencies = []
+        failed = 0
+        start = time.perf_counter()
+        if mode == "parallel":
+            results = converter.convert_all(quality=quality, parallel=True, workers=workers)
+            for _, success, (_, elapsed) in results:
+                latencies.append(elapsed)
+                failed += 0 if success else 1
+        elif mode in ("serial", "cache", "metrics"):
+            last = start
+            for _, success, _ in converter.convert_iter(quality=quality, use_cache=use_cache,
+                                                        input_paths=input_paths):
+                now = time.perf_counter()
+                latencies.append(now - last)
+                last = now
+                failed += 0 if success else 1
+        else:
+            raise ValueError("mode tidak dikenal: %s" % mode)
+        wall = time.perf_counter() - start
+
+        return {
+            "files": len(latencies),
+            "failed": failed,
+            "input_mb": round(total_bytes / 1e6, 2),
+            "wall_s": round(wall, 3),
+            "files_per_s": round(len(latencies) / wall, 2) if wall else None,
+            "mb_per_s": round(total_bytes / 1e6 / wall, 2) if wall else None,
+            "latency_p50_ms": round(_percentile(latencies, 50) * 1000, 2) if latencies else None,
+            "latency_p95_ms": round(_percentile(latencies, 95) * 1000, 2) if latencies else None,
+            "peak_rss_mb": _peak_rss_mb(),
+            "workers": converter._resolve_workers(workers) if mode == "parallel" else 1,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run_suite(files=100, seed=1234, min_side=256, max_side=2048, modes=RUN_MODES, workers=None,
+              quality=80):
+    """
+    Buat korpus sekali, lalu jalankan tiap mode di subprocess sendiri.
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_corpus_")
+    try:
+        corpus_dir = os.path.join(tmp, "corpus")
+        generate_corpus(corpus_dir, files, seed, min_side, max_side)
+        report = {
+            "benchmark": "run",
+            "corpus": {"files": files, "seed": seed, "min_side": min_side, "max_side": max_side},
+            "quality": quality,
+            "modes": {},
+        }
+        for mode in modes:
+            cmd = [sys.executable, os.path.abspath(__file__), "_mode", mode,
+                   "--corpus", corpus_dir, "--quality", str(quality)]
+            if workers:
+                cmd += ["--workers", str(workers)]
+            # cwd=tmp supaya app.log dari run benchmark tidak bercampur dengan log aplikasi
+            out = subprocess.run(cmd, cwd=tmp, check=True, capture_output=True, text=True).stdout
+            report["modes"][mode] = json.loads(out)
+        return report
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def compare_reports(baseline, current, threshold_pct=10.0):
+    """
+    Bandingkan dua report 'run'. Regresi: files_per_s turun, atau p95 / peak RSS
+    naik, lebih dari threshold_pct persen.
+    """
+    checks = (("files_per_s", -1), ("latency_p95_ms", 1), ("peak_rss_mb", 1))
+    result = {"threshold_pct": threshold_pct, "modes": {}, "regressions": []}
+    for mode, cur in current.get("modes", {}).items():
+        base = baseline.get("modes", {}).get(mode)
+        if base is None:
+            continue
+        deltas = {}
+        for metric, direction in checks:
+            old, new = base.get(metric), cur.get(metric)
+            if not old or new is None:
+                continue
+            change = 100.0 * (new - old) / old
+            deltas[metric] = {"baseline": old, "current": new, "change_pct": round(change, 1)}
+            if change * direction > threshold_pct:
+                result["regressions"].append("%s.%s" % (mode, metric))
+        result["modes"][mode] = deltas
+    return result
+
+
+def _time_convert(converter, source_path, repeat, **options):
+    filename = os.path.basename(source_path)
+    timings = []
+    output_size = 0
+    for _ in range(repeat):
+        input_path = os.path.join(converter.input_dir, filename)
+        shutil.copy(source_path, input_path)
+        start = time.perf_counter()
+        success, info = converter.convert_file(input_path, **options)
+        timings.append(time.perf_counter() - start)
+        if not success:
+            raise RuntimeError("convert_file gagal: %s" % info)
+        output_size = os.path.getsize(info)
+        os.remove(os.path.join(converter.success_dir, filename))
+    return {"best_s": round(min(timings), 4), "mean_s": round(sum(timings) / len(timings), 4),
+            "output_bytes": output_size}
+
+
+def bench_resize(width=6000, height=4000, max_side=1920, repeat=3, quality=80):
+    """
+    Bandingkan konversi resolusi penuh dengan resize max_side (JPEG draft decoding).
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        converter = ImageConverter(base_media_dir=os.path.join(tmp, "media"))
+        source = make_photo(os.path.join(tmp, "photo.jpg"), width, height)
+        full = _time_convert(converter, source, repeat, quality=quality)
+        resized = _time_convert(converter, source, repeat, quality=quality,
+                                max_width=max_side, max_height=max_side)
+        return {
+            "benchmark": "resize",
+            "source": "%dx%d jpeg" % (width, height),
+            "max_side": max_side,
+            "full": full,
+            "resized": resized,
+            "speedup": round(full["best_s"] / resized["best_s"], 2) if resized["best_s"] else None,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_presets(width=3000, height=2000, formats=("webp",), quality=80):
+    """
+    Ukuran output, bytes saved dan waktu encode per preset (ENCODER_PRESETS).
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        converter = ImageConverter(base_media_dir=os.path.join(tmp, "media"))
+        source = make_photo(os.path.join(tmp, "photo.jpg"), width, height)
+        return {
+            "benchmark": "presets",
+            "source": "%dx%d jpeg (%d bytes)" % (width, height, os.path.getsize(source)),
+            "quality": quality,
+            "results": converter.compare_presets(source, formats=formats, quality=quality),
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_target(files=20, target_kb=150, quality=95, seed=1234, min_side=800, max_side=1600):
+    """
+    Jumlah encode untuk mencapai target ukuran: sweep naif (quality turun per 5),
+    pencarian tanpa hint, dan convert_file dengan hint gambar serupa.
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    target = int(target_kb * 1024)
+    try:
+        corpus = os.path.join(tmp, "corpus")
+        paths = generate_corpus(corpus, files, seed, min_side, max_side, kinds=("jpeg",))
+        naive_probes = search_probes = 0
+        search_s = 0.0
+        for path in paths:
+            with Image.open(path) as img:
+                img.load()
+
+                def encode(q, img=img):
+                    buffer = io.BytesIO()
+                    img.save(buffer, "WEBP", quality=q, method=4)
+                    return buffer
+
+                for q in range(quality, DEFAULT_MIN_QUALITY - 1, -5):
+                    naive_probes += 1
+                    if encode(q).tell() <= target:
+                        break
+                start = time.perf_counter()
+                search_probes += search_quality(encode, target, quality).probes
+                search_s += time.perf_counter() - start
+
+        records = []
+        converter = ImageConverter(base_media_dir=os.path.join(tmp, "media"),
+                                   metrics_hook=records.append)
+        _copy_corpus(corpus, converter.input_dir)
+        start = time.perf_counter()
+        converter.convert_all(quality=quality, target_size=target)
+        hinted_s = time.perf_counter() - start
+        file_records = [r for r in records if r.get("type") == "file"]
+        hinted_probes = sum(r.get("target_probes", 0) for r in file_records)
+        return {
+            "benchmark": "target",
+            "files": len(paths),
+            "target_bytes": target,
+            "naive_sweep_encodes": naive_probes,
+            "search_encodes": search_probes,
+            "search_s": round(search_s, 3),
+            "hinted_encodes": hinted_probes,
+            "hinted_convert_all_s": round(hinted_s, 3),
+            "fits": sum(1 for r in file_records if r.get("target_fits")),
+            "encodes_per_file": {
+                "naive": round(naive_probes / max(1, len(paths)), 2),
+                "search": round(search_probes / max(1, len(paths)), 2),
+                "hinted": round(hinted_probes / max(1, len(paths)), 2),
+            },
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _restore_inputs(converter):
+    # convert_all memindah sumber ke success; kembalikan untuk run berikutnya
+    for name in os.listdir(converter.success_dir):
+        os.replace(os.path.join(converter.success_dir, name), os.path.join(converter.input_dir, name))
+
+
+def bench_autoquality(files=20, target_ssim=DEFAULT_TARGET_SSIM, quality=80, seed=1234,
+                      min_side=800, max_side=2400):
+    """
+    Auto quality (SSIM) vs quality tetap pada korpus campuran: total byte, jumlah
+    encode per file, SSIM rata-rata, run kedua (quality dari cache manifest), dan
+    biaya/akurasi SSIM pada mosaik tile vs resolusi penuh.
+    """
+    import numpy
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        corpus = os.path.join(tmp, "corpus")
+        paths = generate_corpus(corpus, files, seed, min_side, max_side)
+        records = []
+        converter = ImageConverter(base_media_dir=os.path.join(tmp, "media"),
+                                   metrics_hook=records.append)
+        _copy_corpus(corpus, converter.input_dir)
+        start = time.perf_counter()
+        converter.convert_all(quality=quality)
+        fixed_s = time.perf_counter() - start
+        fixed_bytes = sum(r.get("output_bytes", 0) for r in records if r.get("type") == "file")
+
+        runs = {}
+        for run in ("auto", "auto_cached"):
+            _restore_inputs(converter)
+            del records[:]
+            start = time.perf_counter()
+            converter.convert_all(quality=quality, target_ssim=target_ssim)
+            file_records = [r for r in records if r.get("type") == "file"]
+            summary = [r for r in records if r.get("type") == "summary"][-1]
+            runs[run] = {
+                "wall_s": round(time.perf_counter() - start, 3),
+                "bytes": summary["auto_quality"]["bytes"],
+                "encodes_per_file": round(sum(r.get("ssim_probes", 0) for r in file_records)
+                                          / max(1, len(file_records)), 2),
+                "fits": sum(1 for r in file_records if r.get("ssim_fits")),
+                "mean_ssim": round(sum(r.get("ssim", 0.0) for r in file_records)
+                                   / max(1, len(file_records)), 4),
+                "quality_min_max": [min(r.get("auto_quality") for r in file_records),
+                                    max(r.get("auto_quality") for r in file_records)],
+            }
+        saved = fixed_bytes - runs["auto"]["bytes"]
+
+        # biaya + akurasi satu evaluasi SSIM: mosaik tile (<= 512^2 px) vs resolusi penuh
+        with Image.open(max(paths, key=os.path.getsize)) as img:
+            img = img.convert("RGB")
+            buffer = io.BytesIO()
+            img.save(buffer, "WEBP", quality=quality)
+            buffer.seek(0)
+            with Image.open(buffer) as decoded:
+                decoded.load()
+                cost = {}
+                for label, plane in (("sampled", luma_plane),
+                                     ("full", lambda im: numpy.asarray(im.convert("L")))):
+                    start = time.perf_counter()
+                    score = ssim(plane(img), plane(decoded))
+                    cost[label + "_ms"] = round(1000.0 * (time.perf_counter() - start), 2)
+                    cost[label + "_ssim"] = round(score, 4)
+            cost["size"] = list(img.size)
+        return {
+            "benchmark": "autoquality",
+            "files": len(paths),
+            "target_ssim": target_ssim,
+            "fixed_quality": quality,
+            "fixed_bytes": fixed_bytes,
+            "fixed_wall_s": round(fixed_s, 3),
+            "auto": runs["auto"],
+            "auto_cached": runs["auto_cached"],
+            "bytes_saved_vs_fixed": saved,
+            "saved_pct": round(100.0 * saved / max(1, fixed_bytes), 2),
+            "ssim_cost": cost,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def simulate_makespan(durations, workers, chunksize=1):
+    """
+    Waktu selesai batch jika tiap worker yang bebas mengambil chunk berikutnya
+    dari antrian bersama (model ProcessPoolExecutor), dari durasi per file.
+    """
+    finish = [0.0] * max(1, workers)
+    for i in range(0, len(durations), chunksize):
+        start = heapq.heappop(finish)
+        heapq.heappush(finish, start + sum(durations[i:i + chunksize]))
+    return max(finish)
+
+
+def _correlation(xs, ys):
+    n = len(xs)
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    var_y = sum((y - mean_y) ** 2 for y in ys)
+    return cov / (var_x * var_y) ** 0.5 if var_x and var_y else None
+
+
+def bench_schedule(small=48, large=2, large_png=1, workers=4, quality=80, seed=1234):
+    """
+    Makespan batch paralel per schedule pada korpus di mana urutan berpengaruh:
+    banyak file kecil, lalu JPEG besar dan PNG besar (byte besar, pixel sedang)
+    yang namanya di urutan akhir, dengan jumlah file besar < workers. Pada urutan
+    input file besar baru mulai saat file kecil hampir habis, jadi worker lain
+    menganggur di ekor batch.
+    Durasi per file diukur sekali secara serial, lalu makespan tiap schedule
+    disimulasikan untuk 'workers' worker (tidak tergantung jumlah core mesin ini).
+    Semua schedule memakai dispatch yang sama (per file, convert_iter), jadi
+    selisihnya hanya dari urutan. Jalur default convert_all paralel (executor.map
+    dengan chunk statis) dilaporkan terpisah sebagai "static_chunks".
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        corpus = os.path.join(tmp, "corpus")
+        generate_corpus(corpus, small, seed, 256, 900)
+        rng = random.Random(seed)
+        for i in range(large):
+            _synthetic_image(rng, 4000, 3000, "RGB").save(
+                os.path.join(corpus, "zz_large_%02d.jpg" % i), quality=90)
+        for i in range(large_png):
+            _synthetic_image(rng, 2000, 1500, "RGB").save(
+                os.path.join(corpus, "zz_png_%02d.png" % i), compress_level=0)
+
+        records = []
+        converter = ImageConverter(base_media_dir=os.path.join(tmp, "media"),
+                                   metrics_hook=records.append)
+        _copy_corpus(corpus, converter.input_dir)
+        input_paths = [os.path.join(converter.input_dir, name)
+                       for name in sorted(os.listdir(converter.input_dir))]
+        estimates = {os.path.basename(p): converter.estimate_cost(p) for p in input_paths}
+        start = time.perf_counter()
+        converter.convert_all(quality=quality)
+        serial_s = time.perf_counter() - start
+        durations = {r["file"]: r["total_s"] for r in records if r.get("type") == "file"}
+        names = [os.path.basename(p) for p in input_paths]
+        total = sum(durations.values())
+        lower_bound = max(total / workers, max(durations.values()))
+        converter.metrics_hook = None
+
+        def entry(makespan, wall_s, chunksize=1):
+            return {
+                "chunksize": chunksize,
+                "simulated_makespan_s": round(makespan, 3),
+                "vs_lower_bound": round(makespan / lower_bound, 3),
+                "idle_pct": round(100.0 * (1 - total / (workers * makespan)), 1),
+                "measured_wall_s": round(wall_s, 3),
+            }
+
+        policies = {}
+        for schedule in SCHEDULES:
+            # sumber dikembalikan dulu: order_paths membaca ukuran / header file input
+            _restore_inputs(converter)
+            ordered = [os.path.basename(p) for p in order_paths(
+                input_paths, schedule, converter.estimate_cost)]
+            makespan = simulate_makespan([durations[n] for n in ordered], workers)
+            start = time.perf_counter()
+            for _ in converter.convert_iter(quality=quality, parallel=True, workers=workers,
+                                            input_paths=input_paths, schedule=schedule):
+                pass
+            policies[schedule] = entry(makespan, time.perf_counter() - start)
+        base = policies["input"]["simulated_makespan_s"]
+        for item in policies.values():
+            item["speedup_vs_input"] = round(base / item["simulated_makespan_s"], 2)
+
+        # jalur default convert_all paralel: urutan input, executor.map dengan chunk statis
+        chunksize = max(1, len(names) // (workers * 4))
+        _restore_inputs(converter)
+        start = time.perf_counter()
+        converter.convert_all(quality=quality, parallel=True, workers=workers)
+        static = entry(simulate_makespan([durations[n] for n in names], workers, chunksize),
+                       time.perf_counter() - start, chunksize)
+        return {
+            "benchmark": "schedule",
+            "files": len(names),
+            "workers": workers,
+            "cpu_count": os.cpu_count(),
+            "serial_s": round(serial_s, 3),
+            "largest_file_s": round(max(durations.values()), 3),
+            "lower_bound_s": round(lower_bound, 3),
+            "cost_estimate_correlation": round(_correlation(
+                [estimates[n] for n in names], [durations[n] for n in names]), 3),
+            "policies": policies,
+            "static_chunks": static,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _tree_rss_mb(pid):
+    """
+    Total RSS (MB) proses 'pid' + semua turunannya, dari /proc (Linux). None jika tidak tersedia.
+    """
+    try:
+        children = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open("/proc/%s/stat" % entry, "rb") as f:
+                    fields = f.read().rsplit(b")", 1)[1].split()
+                children.setdefault(int(fields[1]), []).append(int(entry))
+            except OSError:
+                continue
+        total = 0
+        stack = [pid]
+        while stack:
+            current = stack.pop()
+            stack.extend(children.get(current, ()))
+            try:
+                with open("/proc/%d/statm" % current, "rb") as f:
+                    total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            except OSError:
+                continue
+        return total / (1024.0 * 1024.0)
+    except OSError:
+        return None
+
+
+def bench_memory(files=6, width=5000, height=4000, workers=3, budget_mb=200, quality=80):
+    """
+    Puncak RSS total (proses utama + worker) batch paralel gambar PNG besar,
+    tanpa dan dengan memory_budget. RSS di-sample tiap 20 ms dari /proc.
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        corpus = os.path.join(tmp, "corpus")
+        os.makedirs(corpus)
+        rng = random.Random(1234)
+        for i in range(files):
+            _synthetic_image(rng, width, height, "RGB").save(os.path.join(corpus, "big_%02d.png" % i),
+                                                             compress_level=1)
+        results = {}
+        for name, budget in (("unbounded", None), ("budget", budget_mb * 1024 * 1024)):
+            converter = ImageConverter(base_media_dir=os.path.join(tmp, name))
+            _copy_corpus(corpus, converter.input_dir)
+            estimate = converter.estimate_memory(os.path.join(corpus, "big_00.png"))
+            peak = [0.0]
+            stop = threading.Event()
+
+            def sample():
+                while not stop.is_set():
+                    rss = _tree_rss_mb(os.getpid())
+                    if rss is None:
+                        return
+                    peak[0] = max(peak[0], rss)
+                    stop.wait(0.02)
+
+            sampler = threading.Thread(target=sample, daemon=True)
+            sampler.start()
+            start = time.perf_counter()
+            converted = converter.convert_all(quality=quality, parallel=True, workers=workers,
+                                              memory_budget=budget)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            sampler.join()
+            results[name] = {
+                "wall_s": round(elapsed, 3),
+                "ok": sum(1 for _, success, _ in converted if success),
+                "peak_tree_rss_mb": round(peak[0], 1) if peak[0] else None,
+                "estimate_per_file_mb": round(estimate / (1024.0 * 1024.0), 1),
+            }
+        return {"benchmark": "memory", "files": files, "source": "%dx%d png" % (width, height),
+                "workers": workers, "budget_mb": budget_mb, "results": results}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_bytes(files=50, seed=1234, min_side=256, max_side=1024, quality=80, repeat=3):
+    """
+    Alur upload di server: convert_bytes (buffer masuk, buffer keluar) vs jalur
+    file (tulis upload ke input_dir, convert_file, baca output kembali ke memori).
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        corpus = os.path.join(tmp, "corpus")
+        paths = generate_corpus(corpus, files, seed, min_side, max_side)
+        uploads = []
+        for path in paths:
+            with open(path, "rb") as f:
+                uploads.append((os.path.basename(path), f.read()))
+        input_bytes = sum(len(data) for _, data in uploads)
+        converter = ImageConverter(base_media_dir=os.path.join(tmp, "media"))
+
+        def via_bytes():
+            out = 0
+            for _, data in uploads:
+                view, _ = converter.convert_bytes(data, quality=quality)
+                out += len(view)
+                view.release()
+            return out
+
+        def via_files():
+            out = 0
+            for name, data in uploads:
+                input_path = os.path.join(converter.input_dir, name)
+                with open(input_path, "wb") as f:
+                    f.write(data)
+                success, info = converter.convert_file(input_path, quality=quality)
+                if not success:
+                    raise RuntimeError("convert_file gagal: %s" % info)
+                with open(info, "rb") as f:
+                    out += len(f.read())
+                os.remove(os.path.join(converter.success_dir, name))
+                os.remove(info)
+            return out
+
+        paths_under_test = (("convert_bytes", via_bytes), ("convert_file", via_files))
+        timings = {name: [] for name, _ in paths_under_test}
+        output_sizes = {}
+        # bergantian supaya cache/warm-up tidak menguntungkan salah satu jalur
+        for _ in range(repeat):
+            for name, func in paths_under_test:
+                start = time.perf_counter()
+                output_sizes[name] = func()
+                timings[name].append(time.perf_counter() - start)
+        results = {}
+        for name, _ in paths_under_test:
+            best = min(timings[name])
+            overhead = best / len(uploads)
+            results[name] = {
+                "best_s": round(best, 4),
+                "files_per_s": round(len(uploads) / best, 2),
+                "mb_per_s": round(input_bytes / best / (1024 * 1024), 2),
+                "ms_per_file": round(1000 * overhead, 3),
+                "output_bytes": output_sizes[name],
+            }
+        results["speedup"] = round(results["convert_file"]["best_s"] / results["convert_bytes"]["best_s"], 3)
+        return {"benchmark": "bytes", "files": len(uploads), "input_bytes": input_bytes,
+                "results": results}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_dedupe(hashes=500000, dup_fraction=0.2, distance=DEFAULT_MAX_DISTANCE, brute_sample=2000,
+                 seed=1234):
+    """
+    Skala pengelompokan near-duplicate tanpa decode: hash 64-bit acak, sebagian
+    (dup_fraction) adalah salinan hash lain dengan 1..distance bit dibalik.
+    Multi-index vs perbandingan semua pasangan (diukur pada brute_sample hash,
+    diekstrapolasi n^2/2).
+    """
+    rng = random.Random(seed)
+    values = []
+    injected = 0
+    for i in range(hashes):
+        if values and rng.random() < dup_fraction:
+            value = rng.choice(values)
+            for bit in rng.sample(range(64), rng.randint(1, max(1, distance))):
+                value ^= 1 << bit
+            injected += 1
+        else:
+            value = rng.getrandbits(64)
+        values.append(value)
+    items = [("img%07d.jpg" % i, value, 0, 0) for i, value in enumerate(values)]
+
+    start = time.perf_counter()
+    representatives, duplicates = group_duplicates(items, distance)
+    index_s = time.perf_counter() - start
+
+    sample = values[:brute_sample]
+    start = time.perf_counter()
+    pairs = 0
+    for i, a in enumerate(sample):
+        for b in sample[i + 1:]:
+            if bin(a ^ b).count("1") <= distance:
+                pairs += 1
+    brute_s = time.perf_counter() - start
+    per_pair = brute_s / max(1, len(sample) * (len(sample) - 1) // 2)
+    brute_full_s = per_pair * hashes * (hashes - 1) / 2
+    return {"benchmark": "dedupe", "hashes": hashes, "distance": distance,
+            "injected_duplicates": injected, "found_duplicates": len(duplicates),
+            "groups": len(representatives),
+            "multi_index_s": round(index_s, 3),
+            "us_per_hash": round(1e6 * index_s / hashes, 2),
+            "brute_force_sample": len(sample), "brute_force_sample_s": round(brute_s, 3),
+            "brute_force_estimated_s": round(brute_full_s, 1),
+            "speedup_estimated": round(brute_full_s / index_s, 1) if index_s else None}
+
+
+def bench_journal(files=50000, flush_records=DEFAULT_FLUSH_RECORDS):
+    """
+    Overhead journal batch tanpa encode: record start + done per file, fsync per
+    record vs group commit (flush per flush_records record atau per detik).
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        names = ["event%03d/img%06d.jpg" % (i // 1000, i) for i in range(files)]
+        results = {}
+        for mode, kwargs in (("fsync_per_record", {"flush_records": 1, "flush_seconds": 0}),
+                             ("batched", {"flush_records": flush_records})):
+            path = os.path.join(tmp, mode + ".journal")
+            start = time.perf_counter()
+            journal = BatchJournal.create(path, tmp, names, {"quality": 80}, **kwargs)
+            for name in names:
+                journal.started(name)
+                journal.finished(name, True)
+            journal.close()
+            elapsed = time.perf_counter() - start
+            state = BatchJournal.load(path)
+            results[mode] = {"wall_s": round(elapsed, 4), "us_per_file": round(1e6 * elapsed / files, 2),
+                             "fsyncs": journal.fsyncs, "journal_bytes": os.path.getsize(path),
+                             "replayed_done": len(state.done)}
+        results["speedup"] = round(results["fsync_per_record"]["wall_s"] / results["batched"]["wall_s"], 1)
+        return {"benchmark": "journal", "files": files, "flush_records": flush_records,
+                "results": results}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+ANIMATION_MODES = ("save_all", "streaming")
+
+
+def make_animated_gif(path, frames=150, width=800, height=600, duration=40, seed=1234):
+    """
+    GIF animasi sintetis (bola bergerak di atas noise), ditulis frame demi frame.
+    """
+    rng = random.Random(seed)
+    background = Image.effect_noise((width, height), 30).convert("RGB")
+
+    def frame_iter():
+        for i in range(frames):
+            frame = background.copy()
+            x = int((width - 120) * i / max(1, frames - 1))
+            y = rng.randrange(0, height - 120)
+            frame.paste((rng.randrange(256), rng.randrange(256), rng.randrange(256)),
+                        (x, y, x + 120, y + 120))
+            yield frame.quantize(64)
+
+    it = frame_iter()
+    first = next(it)
+    first.save(path, save_all=True, append_images=it, duration=duration, loop=0)
+    return path
+
+
+def run_animation_mode(mode, gif_path, max_fps=None, quality=80):
+    """
+    Satu mode konversi GIF -> WebP animasi di subprocess sendiri (peak RSS bersih).
+    save_all: cara umum, semua frame dimuat ke list lalu Image.save(save_all=True).
+    streaming: ImageConverter.convert_file (frame di-decode dan di-encode satu per satu).
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        start = time.perf_counter()
+        if mode == "save_all":
+            src = Image.open(gif_path)
+            frames, durations = [], []
+            for index in range(src.n_frames):
+                src.seek(index)
+                frames.append(src.convert("RGBA"))
+                durations.append(src.info.get("duration", 100))
+            output = os.path.join(tmp, "out.webp")
+            # method=4 = preset "balanced" yang dipakai convert_file (default save_all: 0)
+            frames[0].save(output, "WEBP", save_all=True, append_images=frames[1:], duration=durations,
+                           loop=src.info.get("loop", 0), quality=quality, method=4)
+        elif mode == "streaming":
+            converter = ImageConverter(base_media_dir=os.path.join(tmp, "media"))
+            input_path = os.path.join(converter.input_dir, os.path.basename(gif_path))
+            shutil.copy(gif_path, input_path)
+            success, output = converter.convert_file(input_path, quality=quality, max_fps=max_fps)
+            if not success:
+                raise RuntimeError("convert_file gagal: %s" % output)
+        else:
+            raise ValueError("mode tidak dikenal: %s" % mode)
+        wall = time.perf_counter() - start
+        with Image.open(output) as out:
+            frames_out = out.n_frames
+        return {"wall_s": round(wall, 3), "peak_rss_mb": _peak_rss_mb(), "frames_out": frames_out,
+                "output_bytes": os.path.getsize(output)}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_animation(frames=150, width=800, height=600, max_fps=None, quality=80):
+    """
+    Peak RSS dan waktu GIF animasi -> WebP animasi: semua frame di memori vs streaming.
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        gif_path = make_animated_gif(os.path.join(tmp, "anim.gif"), frames, width, height)
+        results = {}
+        for mode in ANIMATION_MODES:
+            cmd = [sys.executable, os.path.abspath(__file__), "_animation", mode, gif_path,
+                   "--quality", str(quality)]
+            if max_fps and mode == "streaming":
+                cmd += ["--max-fps", str(max_fps)]
+            out = subprocess.run(cmd, cwd=tmp, check=True, capture_output=True, text=True).stdout
+            results[mode] = json.loads(out)
+        return {"benchmark": "animation", "frames": frames, "size": "%dx%d" % (width, height),
+                "gif_bytes": os.path.getsize(gif_path), "max_fps": max_fps,
+                "frame_mb": round(width * height * 4 / (1024 * 1024), 2), "results": results}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_coldstart(repeat=5):
+    """
+    Cold start cli.py di proses baru: --help, folder input kosong, dan satu
+    gambar kecil. wall_ms = waktu proses penuh (termasuk start interpreter),
+    first_result_ms = dari start modul cli sampai hasil konversi pertama.
+    """
+    cli_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    try:
+        empty_dir = os.path.join(tmp, "empty")
+        os.makedirs(empty_dir)
+        source = os.path.join(tmp, "small.png")
+        _synthetic_image(random.Random(1), 640, 480, "RGB").save(source)
+        cases = {
+            "help": ["--help"],
+            "empty_input": ["--input", empty_dir, "--quiet"],
+            "one_image": None,
+        }
+        results = {}
+        for name, extra in cases.items():
+            walls, firsts = [], []
+            for i in range(repeat):
+                run_dir = os.path.join(tmp, "%s_%d" % (name, i))
+                os.makedirs(run_dir)
+                if extra is None:
+                    input_dir = os.path.join(run_dir, "in")
+                    os.makedirs(input_dir)
+                    shutil.copy(source, input_dir)
+                    report_path = os.path.join(run_dir, "report.json")
+                    argv = ["--input", input_dir, "--quiet", "--report", report_path]
+                else:
+                    argv = extra
+                start = time.perf_counter()
+                subprocess.run([sys.executable, cli_path] + argv, cwd=run_dir, check=False,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                walls.append(time.perf_counter() - start)
+                if extra is None:
+                    startup = _load_json(report_path)["startup"]
+                    firsts.append(startup["first_result_s"])
+            results[name] = {"wall_ms_p50": round(1000 * _percentile(walls, 50), 1),
+                             "wall_ms_min": round(1000 * min(walls), 1)}
+            if firsts:
+                results[name]["first_result_ms_p50"] = round(1000 * _percentile(firsts, 50), 1)
+        return {"benchmark": "coldstart", "repeat": repeat, "results": results}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _log_batch_lines(log, files, file_level):
+    # pola log convert_file: 3 baris per file + satu agregat per batch
+    start = time.perf_counter()
+    for i in range(files):
+        name = "img_%06d.jpg" % i
+        log.log(file_level, "Start convert_file: %s (quality=%s)", name, 80)
+        log.log(file_level, "Encoded %s -> %s (preset=%s, %d bytes, %.3fs)", name, name + ".webp",
+                "balanced", 12345, 0.0123)
+        log.log(file_level, "Convert success: %s -> %s (moved to %s)", name, name + ".webp", "success")
+    log.info("Batch finished: files=%d ok=%d failed=%d", files, files, 0)
+    return time.perf_counter() - start
+
+
+def bench_logging(files=10000, max_bytes=1024 * 1024):
+    """
+    Overhead logging per batch: FileHandler sinkron (setup lama) vs antrian +
+    listener dengan rotasi gzip, per-file INFO vs hanya agregat (file_log_level=DEBUG).
+    caller_s = waktu di thread konversi, drain_s = sampai semua record tertulis.
+    """
+    tmp = tempfile.mkdtemp(prefix="konversi_bench_")
+    results = {}
+    try:
+        for name, use_queue, file_level in (("sync_file", False, logging.INFO),
+                                            ("queue_rotating", True, logging.INFO),
+                                            ("queue_aggregate", True, logging.DEBUG)):
+            log_path = os.path.join(tmp, name + ".log")
+            log = logging.getLogger("konversi_bench_log." + name)
+            log.propagate = False
+            log.setLevel(logging.INFO)
+            if use_queue:
+                handler = CompressingRotatingFileHandler(log_path, max_bytes=max_bytes)
+                log_queue = queue.SimpleQueue()
+                listener = QueueListener(log_queue, handler, respect_handler_level=True)
+                listener.start()
+                log.addHandler(QueueHandler(log_queue))
+            else:
+                handler = logging.FileHandler(log_path, encoding="utf-8")
+                listener = None
+                log.addHandler(handler)
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            start = time.perf_counter()
+            caller = _log_batch_lines(log, files, file_level)
+            if listener is not None:
+                listener.stop()
+            drain = time.perf_counter() - start
+            handler.close()
+            log.handlers.clear()
+            archives = [f for f in os.listdir(tmp) if f.startswith(name + ".log.") and f.endswith(".gz")]
+            results[name] = {
+                "caller_s": round(caller, 4),
+                "caller_us_per_file": round(1e6 * caller / files, 2),
+                "drain_s": round(drain, 4),
+                "log_bytes": os.path.getsize(log_path) if os.path.exists(log_path) else 0,
+                "archives": len(archives),
+            }
+        return {"benchmark": "logging", "files": files, "records_per_file": 3, "results": results}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ImageConverter")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="benchmark convert_all per mode pada korpus sintetis")
+    p_run.add_argument("--files", type=int, default=100)
+    p_run.add_argument("--seed", type=int, default=1234)
+    p_run.add_argument("--min-side", type=int, default=256)
+    p_run.add_argument("--max-side", type=int, default=2048)
+    p_run.add_argument("--modes", nargs="+", choices=RUN_MODES, default=list(RUN_MODES))
+    p_run.add_argument("--workers", type=int, default=None)
+    p_run.add_argument("--quality", type=int, default=80)
+    p_run.add_argument("--save", help="simpan report JSON ke file (mis. baseline)")
+    p_run.add_argument("--baseline", help="bandingkan dengan report baseline")
+    p_run.add_argument("--threshold", type=float, default=10.0)
+    p_compare = sub.add_parser("compare", help="bandingkan dua report JSON")
+    p_compare.add_argument("baseline")
+    p_compare.add_argument("current")
+    p_compare.add_argument("--threshold", type=float, default=10.0)
+    p_corpus = sub.add_parser("corpus", help="hanya buat korpus sintetis")
+    p_corpus.add_argument("directory")
+    p_corpus.add_argument("--files", type=int, default=100)
+    p_corpus.add_argument("--seed", type=int, default=1234)
+    p_corpus.add_argument("--min-side", type=int, default=256)
+    p_corpus.add_argument("--max-side", type=int, default=2048)
+    p_mode = sub.add_parser("_mode")  # internal: satu mode per subprocess
+    p_mode.add_argument("mode", choices=RUN_MODES)
+    p_mode.add_argument("--corpus", required=True)
+    p_mode.add_argument("--workers", type=int, default=None)
+    p_mode.add_argument("--quality", type=int, default=80)
+    p_resize = sub.add_parser("resize", help="resolusi penuh vs resize + JPEG draft")
+    p_resize.add_argument("--width", type=int, default=6000)
+    p_resize.add_argument("--height", type=int, default=4000)
+    p_resize.add_argument("--max-side", type=int, default=1920)
+    p_resize.add_argument("--repeat", type=int, default=3)
+    p_presets = sub.add_parser("presets", help="ukuran & waktu encode per preset encoder")
+    p_presets.add_argument("--width", type=int, default=3000)
+    p_presets.add_argument("--height", type=int, default=2000)
+    p_presets.add_argument("--formats", nargs="+", default=["webp"])
+    p_presets.add_argument("--quality", type=int, default=80)
+    p_logging = sub.add_parser("logging", help="overhead logging per batch (sinkron vs antrian)")
+    p_logging.add_argument("--files", type=int, default=10000)
+    p_logging.add_argument("--max-bytes", type=int, default=1024 * 1024)
+    p_target = sub.add_parser("target", help="jumlah encode untuk mode target ukuran")
+    p_target.add_argument("--files", type=int, default=20)
+    p_target.add_argument("--target-kb", type=float, default=150)
+    p_target.add_argument("--quality", type=int, default=95)
+    p_target.add_argument("--seed", type=int, default=1234)
+    p_auto = sub.add_parser("autoquality", help="auto quality (target SSIM) vs quality tetap")
+    p_auto.add_argument("--files", type=int, default=20)
+    p_auto.add_argument("--target-ssim", type=float, default=DEFAULT_TARGET_SSIM)
+    p_auto.add_argument("--quality", type=int, default=80)
+    p_auto.add_argument("--seed", type=int, default=1234)
+    p_schedule = sub.add_parser("schedule", help="makespan paralel per schedule pada korpus miring")
+    p_schedule.add_argument("--small", type=int, default=48)
+    p_schedule.add_argument("--large", type=int, default=2)
+    p_schedule.add_argument("--large-png", type=int, default=1)
+    p_schedule.add_argument("--workers", type=int, default=4)
+    p_schedule.add_argument("--quality", type=int, default=80)
+    p_schedule.add_argument("--seed", type=int, default=1234)
+    p_memory = sub.add_parser("memory", help="puncak RSS batch gambar besar dengan/tanpa memory budget")
+    p_memory.add_argument("--files", type=int, default=6)
+    p_memory.add_argument("--width", type=int, default=5000)
+    p_memory.add_argument("--height", type=int, default=4000)
+    p_memory.add_argument("--workers", type=int, default=3)
+    p_memory.add_argument("--budget-mb", type=int, default=200)
+    p_coldstart = sub.add_parser("coldstart", help="cold start cli.py sampai hasil pertama")
+    p_coldstart.add_argument("--repeat", type=int, default=5)
+    p_bytes = sub.add_parser("bytes", help="convert_bytes vs jalur file (tulis, convert, baca)")
+    p_bytes.add_argument("--files", type=int, default=50)
+    p_bytes.add_argument("--seed", type=int, default=1234)
+    p_bytes.add_argument("--min-side", type=int, default=256)
+    p_bytes.add_argument("--max-side", type=int, default=1024)
+    p_bytes.add_argument("--quality", type=int, default=80)
+    p_bytes.add_argument("--repeat", type=int, default=3)
+    p_dedupe = sub.add_parser("dedupe", help="skala index near-duplicate vs semua pasangan")
+    p_dedupe.add_argument("--hashes", type=int, default=500000)
+    p_dedupe.add_argument("--dup-fraction", type=float, default=0.2)
+    p_dedupe.add_argument("--distance", type=int, default=DEFAULT_MAX_DISTANCE)
+    p_dedupe.add_argument("--brute-sample", type=int, default=2000)
+    p_dedupe.add_argument("--seed", type=int, default=1234)
+    p_journal = sub.add_parser("journal", help="overhead journal batch: fsync per record vs batched")
+    p_journal.add_argument("--files", type=int, default=50000)
+    p_journal.add_argument("--flush-records", type=int, default=DEFAULT_FLUSH_RECORDS)
+    p_animation = sub.add_parser("animation", help="GIF animasi -> WebP: semua frame vs streaming")
+    p_animation.add_argument("--frames", type=int, default=150)
+    p_animation.add_argument("--width", type=int, default=800)
+    p_animation.add_argument("--height", type=int, default=600)
+    p_animation.add_argument("--max-fps", type=float, default=None)
+    p_animation.add_argument("--quality", type=int, default=80)
+    p_anim_mode = sub.add_parser("_animation")  # internal: satu mode per subprocess
+    p_anim_mode.add_argument("mode", choices=ANIMATION_MODES)
+    p_anim_mode.add_argument("gif")
+    p_anim_mode.add_argument("--max-fps", type=float, default=None)
+    p_anim_mode.add_argument("--quality", type=int, default=80)
+    args = parser.parse_args(argv)
+
+    exit_code = 0
+    if args.command == "run":
+        result = run_suite(args.files, args.seed, args.min_side, args.max_side, args.modes,
+                           args.workers, args.quality)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+        if args.baseline:
+            result["comparison"] = compare_reports(_load_json(args.baseline), result, args.threshold)
+            exit_code = 1 if result["comparison"]["regressions"] else 0
+    elif args.command == "compare":
+        result = compare_reports(_load_json(args.baseline), _load_json(args.current), args.threshold)
+        exit_code = 1 if result["regressions"] else 0
+    elif args.command == "corpus":
+        paths = generate_corpus(args.directory, args.files, args.seed, args.min_side, args.max_side)
+        result = {"directory": args.directory, "files": len(paths)}
+    elif args.command == "_mode":
+        result = run_mode(args.mode, args.corpus, args.workers, args.quality)
+    elif args.command == "resize":
+        result = bench_resize(args.width, args.height, args.max_side, args.repeat)
+    elif args.command == "presets":
+        result = bench_presets(args.width, args.height, tuple(args.formats), args.quality)
+    elif args.command == "bytes":
+        result = bench_bytes(args.files, args.seed, args.min_side, args.max_side, args.quality,
+                             args.repeat)
+    elif args.command == "animation":
+        result = bench_animation(args.frames, args.width, args.height, args.max_fps, args.quality)
+    elif args.command == "_animation":
+        result = run_animation_mode(args.mode, args.gif, args.max_fps, args.quality)
+    elif args.command == "journal":
+        result = bench_journal(args.files, args.flush_records)
+    elif args.command == "dedupe":
+        result = bench_dedupe(args.hashes, args.dup_fraction, args.distance, args.brute_sample,
+                              args.seed)
+    elif args.command == "coldstart":
+        result = bench_coldstart(args.repeat)
+    elif args.command == "memory":
+        result = bench_memory(args.files, args.width, args.height, args.workers, args.budget_mb)
+    elif args.command == "target":
+        result = bench_target(args.files, args.target_kb, args.quality, args.seed)
+    elif args.command == "schedule":
+        result = bench_schedule(args.small, args.large, args.large_png, args.workers, args.quality,
+                                args.seed)
+    elif args.command == "autoquality":
+        result = bench_autoquality(args.files, args.target_ssim, args.quality, args.seed)
+    elif args.command == "logging":
+        result = bench_logging(args.files, args.max_bytes)
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
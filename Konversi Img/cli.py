@@ -0,0 +1,310 @@
+"""
+Front-end command line untuk ImageConverter (tanpa tkinter).
+
+Contoh:
+    python cli.py
+    python cli.py --input /data/upload --output /data/webp --quality 75 --workers 4
+    python cli.py --recursive --ext .png .jpg --report report.json
+    python cli.py --target-kb 200 --max-width 1600 --report -
+    python cli.py --target-ssim 0.95 --report report.json   (quality per gambar)
+    python cli.py --journal --workers 4       (batch besar, bisa dilanjutkan)
+    python cli.py --workers 8 --schedule cost (file besar dikerjakan dulu)
+    python cli.py --resume --workers 4        (selesaikan batch --journal yang terhenti)
+
+Exit code:
+    0  semua file berhasil (atau tidak ada file untuk dikonversi)
+    1  sebagian/semua file gagal dikonversi
+    2  argumen tidak valid
+    3  error setup (folder input tidak ada, gagal membuat folder, dsb.)
+    130 dihentikan dengan Ctrl+C
+
+Pillow (dan converter) baru di-import setelah argumen valid dan ada minimal
+satu file input, jadi --help / folder kosong tetap cepat.
+"""
+import time
+
+# dicatat sebelum import lain: dasar pengukuran cold start sampai hasil pertama
+_STARTED = time.perf_counter()
+
+import os
+import sys
+import json
+import logging
+import argparse
+
+EXIT_OK = 0
+EXIT_FAILED_FILES = 1
+EXIT_USAGE = 2
+EXIT_SETUP = 3
+EXIT_INTERRUPTED = 130
+
+DEFAULT_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
+
+
+def _normalize_ext(values):
+    exts = []
+    for value in values:
+        for ext in value.split(","):
+            ext = ext.strip().lower()
+            if ext:
+                exts.append(ext if ext.startswith(".") else "." + ext)
+    return tuple(exts)
+
+
+def _has_work(folder, extensions, recursive):
+    """
+    True jika ada minimal satu file yang cocok (berhenti di file pertama).
+    """
+    stack = [folder]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file() and entry.name.lower().endswith(extensions):
+                            return True
+                        if recursive and entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return False
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Konversi gambar (png/jpg/jpeg, gif/apng animasi) ke WebP tanpa GUI.")
+    dirs = parser.add_argument_group("folder")
+    dirs.add_argument("--base", default="media", help="folder media dasar (default: media)")
+    dirs.add_argument("--img-folder", default="Img", help="subfolder di bawah --base (default: Img)")
+    dirs.add_argument("--input", help="folder input (default: <base>/<img-folder>/input)")
+    dirs.add_argument("--output", help="folder output")
+    dirs.add_argument("--success", help="folder tujuan file sumber yang berhasil")
+    dirs.add_argument("--fail", help="folder tujuan file sumber yang gagal")
+    dirs.add_argument("--recursive", action="store_true",
+                      help="proses subfolder input, struktur dicerminkan ke output/success/fail")
+
+    conv = parser.add_argument_group("konversi")
+    conv.add_argument("-q", "--quality", type=int, default=80, help="quality 0-100 (default: 80)")
+    conv.add_argument("-e", "--ext", nargs="+", default=list(DEFAULT_EXTENSIONS),
+                      help="ekstensi input, mis. --ext .png .jpg atau --ext png,jpg")
+    conv.add_argument("-f", "--format", nargs="+", default=["webp"], dest="formats",
+                      help="format output: webp jpeg png (default: webp)")
+    conv.add_argument("--preset", default=None, help="preset encoder: fast, balanced, smallest")
+    conv.add_argument("--lossless", action="store_true", help="WebP lossless")
+    conv.add_argument("--max-width", type=int, default=None)
+    conv.add_argument("--max-height", type=int, default=None)
+    conv.add_argument("--fit", choices=("contain", "cover"), default="contain")
+    conv.add_argument("--target-kb", type=float, default=None,
+                      help="target ukuran per file (KB); quality dicari per gambar")
+    conv.add_argument("--target-ssim", type=float, default=None,
+                      help="auto quality: output terkecil dengan SSIM >= nilai ini (mis. 0.95); "
+                           "--quality jadi pembanding untuk bytes yang dihemat")
+    conv.add_argument("--max-fps", type=float, default=None,
+                      help="batas frame rate WebP animasi (input GIF/APNG)")
+    conv.add_argument("--frame-policy", choices=("drop", "merge"), default="drop",
+                      help="frame di atas --max-fps dibuang (drop) atau dirata-rata (merge)")
+    conv.add_argument("--cache", action="store_true", help="pakai ulang output identik dari manifest")
+    conv.add_argument("--dedupe", action="store_true",
+                      help="encode satu file per grup near-duplicate (hash perseptual), "
+                           "duplikat di-link ke output-nya")
+    conv.add_argument("--dedupe-distance", type=int, default=4,
+                      help="jarak Hamming maksimal hash 64-bit untuk --dedupe (default: 4)")
+
+    run = parser.add_argument_group("eksekusi")
+    run.add_argument("-w", "--workers", type=int, default=1,
+                     help="jumlah proses (1 = serial, 0 = jumlah CPU)")
+    run.add_argument("--memory-budget-mb", type=int, default=None,
+                     help="batas perkiraan memori decode paralel (MB)")
+    run.add_argument("--schedule", choices=("input", "largest", "cost"), default="input",
+                     help="urutan file ke worker paralel: input (default), largest (ukuran "
+                          "file) atau cost (perkiraan dari header + ukuran file)")
+    run.add_argument("--journal", action="store_true",
+                     help="catat progres batch di journal supaya bisa dilanjutkan dengan --resume")
+    run.add_argument("--resume", action="store_true",
+                     help="lanjutkan batch --journal yang terhenti (setting konversi dari journal)")
+    run.add_argument("--report", help="tulis report JSON ke file ('-' = stdout)")
+    run.add_argument("--log-file", default="app.log", help="file log (default: app.log)")
+    run.add_argument("--log-per-file", action="store_true",
+                     help="log 3 baris per file (default: hanya error + agregat batch)")
+    run.add_argument("--quiet", action="store_true", help="jangan tampilkan progres per file")
+    return parser
+
+
+def _convert_options(args):
+    options = {
+        "max_width": args.max_width or None,
+        "max_height": args.max_height or None,
+        "fit": args.fit,
+        "formats": tuple(args.formats),
+        "lossless": args.lossless,
+    }
+    if args.preset:
+        options["preset"] = args.preset
+    if args.target_kb:
+        options["target_size"] = int(args.target_kb * 1024)
+    if args.target_ssim:
+        options["target_ssim"] = args.target_ssim
+    if args.max_fps:
+        options["max_fps"] = args.max_fps
+        options["frame_policy"] = args.frame_policy
+    return options
+
+
+def _write_report(path, report):
+    if path == "-":
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def run(args):
+    extensions = _normalize_ext(args.ext)
+    if not extensions:
+        print("error: --ext kosong", file=sys.stderr)
+        return EXIT_USAGE
+    if not 0 <= args.quality <= 100:
+        print("error: --quality harus 0-100", file=sys.stderr)
+        return EXIT_USAGE
+    if args.target_ssim is not None and not 0 < args.target_ssim < 1:
+        print("error: --target-ssim harus di antara 0 dan 1", file=sys.stderr)
+        return EXIT_USAGE
+    if args.target_ssim and args.target_kb:
+        print("error: --target-ssim dan --target-kb tidak bisa dipakai bersamaan", file=sys.stderr)
+        return EXIT_USAGE
+    if args.recursive and (args.dedupe or args.journal or args.resume):
+        print("error: --dedupe/--journal/--resume belum didukung bersama --recursive", file=sys.stderr)
+        return EXIT_USAGE
+    base_img = os.path.join(args.base, args.img_folder)
+    input_dir = os.path.abspath(args.input) if args.input else os.path.join(base_img, "input")
+    if args.input and not os.path.isdir(input_dir):
+        print("error: folder input tidak ada: %s" % input_dir, file=sys.stderr)
+        return EXIT_SETUP
+
+    report = {"input_dir": input_dir, "files": 0, "ok": 0, "failed": 0, "wall_s": 0.0,
+              "startup": {}, "results": []}
+    if (os.path.isdir(input_dir) and not args.resume
+            and not _has_work(input_dir, extensions, args.recursive)):
+        report["startup"]["no_work_s"] = round(time.perf_counter() - _STARTED, 4)
+        if not args.quiet:
+            print("Tidak ada file untuk dikonversi di %s" % input_dir, file=sys.stderr)
+        if args.report:
+            _write_report(args.report, report)
+        return EXIT_OK
+
+    # import berat (Pillow, converter) baru di sini
+    from logsetup import setup_logging
+    setup_logging("ImageConverter", os.path.abspath(args.log_file))
+    try:
+        from converter import ImageConverter, ENCODER_PRESETS, OUTPUT_FORMATS
+        import_s = time.perf_counter() - _STARTED
+        unknown = [fmt for fmt in args.formats if fmt.lower().lstrip(".") not in OUTPUT_FORMATS]
+        if unknown or (args.preset and args.preset not in ENCODER_PRESETS):
+            print("error: format/preset tidak dikenal: %s (format: %s, preset: %s)"
+                  % (", ".join(unknown) or args.preset, ", ".join(sorted(OUTPUT_FORMATS)),
+                     ", ".join(ENCODER_PRESETS)), file=sys.stderr)
+            return EXIT_USAGE
+        dir_names = {}
+        for key, value in (("input_dir_name", input_dir), ("output_dir_name", args.output),
+                           ("success_dir_name", args.success), ("fail_dir_name", args.fail)):
+            if value:
+                # path absolut: os.path.join di ImageConverter mengabaikan base
+                dir_names[key] = os.path.abspath(value)
+        summaries = []
+
+        def summary_hook(record):
+            # --target-ssim: summary run (bytes dihemat vs quality tetap) masuk report
+            if record.get("type") == "summary":
+                summaries.append(record)
+
+        converter = ImageConverter(base_media_dir=args.base, img_folder=args.img_folder,
+                                   file_log_level=logging.INFO if args.log_per_file else logging.DEBUG,
+                                   metrics_hook=summary_hook if args.target_ssim else None,
+                                   **dir_names)
+    except Exception as e:
+        print("error: setup gagal: %s" % e, file=sys.stderr)
+        return EXIT_SETUP
+
+    options = _convert_options(args)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    parallel = workers > 1
+    memory_budget = args.memory_budget_mb * 1024 * 1024 if args.memory_budget_mb else None
+    first_result = []
+    started = time.perf_counter()
+
+    def on_result(name, success, info):
+        if not first_result:
+            first_result.append(time.perf_counter() - _STARTED)
+        report["files"] += 1
+        report["ok" if success else "failed"] += 1
+        report["results"].append({"file": name, "success": bool(success), "info": info})
+        if not args.quiet:
+            print("%s %s -> %s" % ("OK  " if success else "FAIL", name, info), file=sys.stderr)
+
+    try:
+        if args.recursive:
+            tree = converter.convert_tree(extensions, args.quality, parallel, workers,
+                                          use_cache=args.cache, memory_budget=memory_budget,
+                                          on_result=on_result, schedule=args.schedule, **options)
+            report["subtrees"] = tree["subtrees"]
+        elif args.resume:
+            for name, success, info in converter.resume_batch(parallel, workers, memory_budget):
+                on_result(name, success, info)
+        elif args.dedupe or args.journal:
+            # pre-pass hash / rencana journal perlu daftar file lengkap, hasil keluar setelah batch
+            for name, success, info in converter.convert_all(extensions, args.quality, parallel,
+                                                             workers, use_cache=args.cache,
+                                                             memory_budget=memory_budget,
+                                                             dedupe=args.dedupe,
+                                                             dedupe_distance=args.dedupe_distance,
+                                                             journal=args.journal,
+                                                             schedule=args.schedule, **options):
+                on_result(name, success, info)
+        else:
+            for name, success, info in converter.convert_iter(extensions, args.quality, parallel,
+                                                              workers, use_cache=args.cache,
+                                                              memory_budget=memory_budget,
+                                                              schedule=args.schedule, **options):
+                on_result(name, success, info)
+    except KeyboardInterrupt:
+        print("Dihentikan.", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except RuntimeError as e:
+        # mis. batch --journal sebelumnya belum selesai
+        print("error: %s" % e, file=sys.stderr)
+        return EXIT_SETUP
+    finally:
+        report["wall_s"] = round(time.perf_counter() - started, 4)
+        report["startup"] = {"import_s": round(import_s, 4),
+                             "first_result_s": round(first_result[0], 4) if first_result else None}
+        if summaries:
+            report["auto_quality"] = summaries[-1].get("auto_quality")
+        if args.report:
+            _write_report(args.report, report)
+
+    if not args.quiet:
+        print("Selesai: %d file, %d ok, %d gagal, %.2fs (first result %.3fs setelah start)"
+              % (report["files"], report["ok"], report["failed"], report["wall_s"],
+                 report["startup"]["first_result_s"] or 0.0), file=sys.stderr)
+        auto = report.get("auto_quality")
+        if auto:
+            print("Auto quality: %d byte vs %d byte di quality %d (hemat %d byte, %.1f%%)"
+                  % (auto["bytes"], auto["fixed_quality_bytes"], args.quality,
+                     auto["bytes_saved_vs_fixed"], auto["saved_pct"]), file=sys.stderr)
+    return EXIT_FAILED_FILES if report["failed"] else EXIT_OK
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return run(args)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,168 @@
+import io
 import os
+import json
+import time
 import shutil
 import logging
+import threading
+from functools import partial
+from concurrent.futures import FIRST_COMPLETED, wait
 from PIL import Image
+# daftarkan encoder WebP langsung: tanpa ini save("WEBP") pertama memanggil Image.init()
+# yang meng-import semua plugin Pillow (~70 ms di cold start)
+from PIL import WebPImagePlugin  # noqa: F401
+from manifest import ConversionManifest, file_digest, reuse_output
+from metrics import NULL_TIMER, StageTimer, MetricsSummary
+from logsetup import setup_logging, worker_log_config
+from memory import LARGE_IMAGE_PIXELS, MemoryBudget, estimate_memory, trim_heap
+from sizing import (DEFAULT_MAX_PROBES, DEFAULT_MIN_QUALITY, search_quality,
+                    quality_hint_bucket)
+from dedupe import (DEFAULT_HASH_BATCH, DEFAULT_MAX_DISTANCE, confirm_duplicates, group_duplicates,
+                    hash_files)
+from journal import BatchJournal
+from animation import AnimatedWebPWriter, is_animated, iter_frames, source_loop
+from perceptual import SsimSearchResult, luma_plane, search_ssim
+from schedule import SCHEDULES, estimate_cost, order_paths
+
+# Setup logger: non-blocking (antrian + thread listener), rotasi + gzip, lihat logsetup.py
+logger = setup_logging("ImageConverter", os.path.join(os.path.abspath("."), "app.log"))
+
+_Resampling = getattr(Image, "Resampling", Image)
+RESAMPLE_FILTERS = {
+    "nearest": _Resampling.NEAREST,
+    "bilinear": _Resampling.BILINEAR,
+    "bicubic": _Resampling.BICUBIC,
+    "lanczos": _Resampling.LANCZOS,
+}
+FIT_MODES = ("contain", "cover")
+
+# Format output: nama -> (format Pillow, ekstensi file)
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", ".webp"),
+    "jpeg": ("JPEG", ".jpg"),
+    "jpg": ("JPEG", ".jpg"),
+    "png": ("PNG", ".png"),
+}
+
+# Preset encoder: tradeoff kecepatan vs ukuran, per format Pillow.
+# WebP "method" 0 (tercepat) .. 6 (terkecil); 4 adalah default Pillow.
+ENCODER_PRESETS = {
+    "fast": {
+        "WEBP": {"method": 0},
+        "JPEG": {"optimize": False, "progressive": True},
+        "PNG": {"compress_level": 1},
+    },
+    "balanced": {
+        "WEBP": {"method": 4},
+        "JPEG": {"optimize": True, "progressive": True},
+        "PNG": {"compress_level": 6},
+    },
+    "smallest": {
+        "WEBP": {"method": 6},
+        "JPEG": {"optimize": True, "progressive": True},
+        "PNG": {"optimize": True},
+    },
+}
+DEFAULT_PRESET = "balanced"
+# output ditulis ke <nama>.part dulu lalu di-rename (os.replace) setelah encode selesai
+PART_SUFFIX = ".part"
+
+
+def compute_target_size(width, height, max_width=None, max_height=None, fit="contain"):
+    """
+    Hitung ukuran hasil resize (hanya memperkecil, tidak pernah memperbesar).
+    fit="contain": gambar muat di dalam max_width x max_height, rasio tetap.
+    fit="cover": gambar menutupi kotak max_width x max_height lalu di-crop tengah.
+    Mengembalikan (resize_w, resize_h, crop_box_or_None).
+    """
+    if not max_width and not max_height:
+        return width, height, None
+    scale_w = (max_width / float(width)) if max_width else None
+    scale_h = (max_height / float(height)) if max_height else None
+    if fit == "cover" and scale_w and scale_h:
+        scale = max(scale_w, scale_h)
+    else:
+        scale = min(s for s in (scale_w, scale_h) if s)
+    scale = min(1.0, scale)
+    new_w = max(1, int(round(width * scale)))
+    new_h = max(1, int(round(height * scale)))
+    crop_box = None
+    if fit == "cover" and max_width and max_height and (new_w > max_width or new_h > max_height):
+        crop_w, crop_h = min(new_w, max_width), min(new_h, max_height)
+        left = (new_w - crop_w) // 2
+        top = (new_h - crop_h) // 2
+        crop_box = (left, top, left + crop_w, top + crop_h)
+    return new_w, new_h, crop_box
+
+
+class _BufferReader(io.RawIOBase):
+    """
+    File-like read-only di atas memoryview: Image.open() membaca langsung dari
+    buffer pemanggil (bytearray, memoryview, mmap, ...) tanpa menyalin seluruhnya.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, target):
+        chunk = self._view[self._pos:self._pos + len(target)]
+        n = len(chunk)
+        target[:n] = chunk
+        self._pos += n
+        return n
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else self._pos + size
+        chunk = self._view[self._pos:end].tobytes()
+        self._pos += len(chunk)
+        return chunk
+
+    def __len__(self):
+        return len(self._view)
+
+
+def _as_readable(data):
+    """
+    Sumber untuk Image.open() + ukurannya (byte): bytes -> BytesIO (CPython berbagi
+    buffer bytes, tanpa salinan), buffer lain -> _BufferReader, file-like seekable
+    dipakai apa adanya.
+    """
+    if isinstance(data, bytes):
+        return io.BytesIO(data), len(data)
+    if hasattr(data, "read"):
+        if not getattr(data, "seekable", lambda: False)():
+            # stream tidak bisa seek (mis. socket): Pillow butuh seek, baca sekali ke memori
+            data = data.read()
+            return io.BytesIO(data), len(data)
+        position = data.tell()
+        size = data.seek(0, io.SEEK_END) - position
+        data.seek(position)
+        return data, size
+    reader = _BufferReader(data)
+    return reader, len(reader)
 
-# Setup logger
-logger = logging.getLogger("ImageConverter")
-if not logger.handlers:
-    logger.setLevel(logging.INFO)
-    log_dir = os.path.abspath(".")
-    log_path = os.path.join(log_dir, "app.log")
-    fh = logging.FileHandler(log_path, encoding="utf-8")
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    fh.setFormatter(formatter)
-    logger.addHandler(fh)
 
 class ImageConverter:
-    # Default supported extensions (lowercase, with dot)
-    DEFAULT_SUPPORTED_EXT = (".png", ".jpg", ".jpeg")
+    # Default supported extensions (lowercase, with dot). GIF/APNG animasi -> WebP animasi.
+    DEFAULT_SUPPORTED_EXT = (".png", ".jpg", ".jpeg", ".gif", ".apng")
 
     def __init__(self,
                  base_media_dir="media",
@@ -24,13 +170,23 @@ class ImageConverter:
                  input_dir_name="input",
                  output_dir_name="output",
                  success_dir_name="success",
-                 fail_dir_name="fail"):
+                 fail_dir_name="fail",
+                 manifest_name="manifest.sqlite",
+                 metrics_hook=None,
+                 file_log_level=logging.INFO,
+                 journal_name="batch.journal"):
         """
         Struktur default:
         media/Img/input
         media/Img/output
         media/Img/success
         media/Img/fail
+
+        metrics_hook: callable opsional yang menerima dict metrics per file
+        (timing per stage + byte count) dan summary per run, mis. JsonLinesSink.
+        file_log_level: level log baris per file (start/encode/success). Untuk batch
+        besar pakai logging.DEBUG: yang tercatat hanya error per file dan agregat batch.
+        journal_name: file journal batch (convert_all(journal=True) / resume_batch).
         """
         self.base_media_dir = base_media_dir
         self.img_folder = img_folder
@@ -42,9 +198,33 @@ class ImageConverter:
         self.fail_dir = os.path.join(base_img_path, fail_dir_name)
 
         self._prepare_folders()
+        # cache hasil konversi berdasarkan hash isi file + setting
+        self.manifest = ConversionManifest(os.path.join(base_img_path, manifest_name), self.output_dir)
+        self.journal_path = os.path.join(base_img_path, journal_name)
+        self.metrics_hook = metrics_hook
+        # di proses worker metrics_hook tidak ikut (lihat __getstate__), cukup flag ini
+        self._metrics_enabled = False
+        self.file_log_level = file_log_level
+        # quality awal per kelompok gambar serupa (mode target_size), cache depan manifest
+        self._quality_hints = {}
+        self._hints_lock = threading.Lock()  # batch GUI & watcher memanggil dari thread lain
+        self._made_dirs = set()  # subfolder (relatif) yang sudah dibuat di output/success/fail
         logger.info("ImageConverter initialized. input=%s output=%s success=%s fail=%s",
                     self.input_dir, self.output_dir, self.success_dir, self.fail_dir)
 
+    def __getstate__(self):
+        # metrics_hook (closure, bound method GUI, ...) hanya dipanggil di proses utama;
+        # worker hanya perlu tahu apakah record metrics harus dikumpulkan
+        state = self.__dict__.copy()
+        state["_metrics_enabled"] = self.metrics_hook is not None or self._metrics_enabled
+        state["metrics_hook"] = None
+        state["_hints_lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._hints_lock = threading.Lock()
+
     def _prepare_folders(self):
         folders = [self.base_media_dir,
                    os.path.join(self.base_media_dir, self.img_folder),
@@ -67,63 +247,1240 @@ class ImageConverter:
         lower = filename.lower()
         return any(lower.endswith(ext) for ext in extensions)
 
-    def convert_file(self, input_path, quality=80):
+    def _relative_dir(self, input_path):
         """
-        Mengonversi satu file gambar (png/jpg/jpeg) ke WebP.
-        quality: integer 0-100 untuk WebP.
-        Mengembalikan (True, output_path) jika sukses,
+        Subfolder input_path relatif terhadap input_dir ("" untuk file di level atas
+        atau di luar input_dir).
+        """
+        parent = os.path.dirname(os.path.abspath(input_path))
+        try:
+            rel_dir = os.path.relpath(parent, os.path.abspath(self.input_dir))
+        except ValueError:  # Windows: beda drive
+            return ""
+        if rel_dir == os.curdir or rel_dir.startswith(os.pardir):
+            return ""
+        return rel_dir
+
+    def _relative_name(self, input_path):
+        rel_dir = self._relative_dir(input_path)
+        filename = os.path.basename(input_path)
+        return os.path.join(rel_dir, filename) if rel_dir else filename
+
+    def _mirror_dirs(self, rel_dir):
+        """
+        (output, success, fail) untuk subfolder rel_dir; folder dibuat sekali per run.
+        """
+        if not rel_dir:
+            return self.output_dir, self.success_dir, self.fail_dir
+        folders = (os.path.join(self.output_dir, rel_dir), os.path.join(self.success_dir, rel_dir),
+                   os.path.join(self.fail_dir, rel_dir))
+        if rel_dir not in self._made_dirs:
+            for folder in folders:
+                os.makedirs(folder, exist_ok=True)
+            self._made_dirs.add(rel_dir)
+        return folders
+
+    def _cache_settings_key(self, quality, fmt="webp", preset=DEFAULT_PRESET, lossless=False,
+                            max_width=None, max_height=None, fit="contain", resample="lanczos",
+                            target_size=None, max_fps=None, frame_policy="drop", target_ssim=None):
+        """
+        Bagian setting dari key manifest. Output hanya dipakai ulang jika
+        isi file DAN setting konversinya sama.
+        """
+        key = "%s;q=%d" % (OUTPUT_FORMATS[fmt][0].lower(), int(quality))
+        if preset != DEFAULT_PRESET or lossless:
+            key += ";preset=%s;lossless=%d" % (preset, int(bool(lossless)))
+        if max_width or max_height:
+            key += ";max=%sx%s;fit=%s;rs=%s" % (max_width or 0, max_height or 0, fit, resample)
+        if target_size:
+            key += ";target=%d" % int(target_size)
+        if max_fps:
+            key += ";fps=%g;%s" % (max_fps, frame_policy)
+        if target_ssim:
+            key += ";ssim=%g" % target_ssim
+        return key
+
+    @staticmethod
+    def _normalize_formats(formats):
+        if isinstance(formats, str):
+            formats = (formats,)
+        normalized = []
+        for fmt in formats:
+            fmt = fmt.lower().lstrip(".")
+            if fmt not in OUTPUT_FORMATS:
+                raise ValueError("format output tidak didukung: %s" % fmt)
+            if OUTPUT_FORMATS[fmt] not in [OUTPUT_FORMATS[f] for f in normalized]:
+                normalized.append(fmt)
+        if not normalized:
+            raise ValueError("minimal satu format output")
+        return tuple(normalized)
+
+    @staticmethod
+    def _encode_params(fmt, quality, preset=DEFAULT_PRESET, lossless=False):
+        """
+        Parameter img.save() untuk format + preset tertentu.
+        """
+        if preset not in ENCODER_PRESETS:
+            raise ValueError("preset harus salah satu dari %s" % (tuple(ENCODER_PRESETS),))
+        pil_format = OUTPUT_FORMATS[fmt][0]
+        params = dict(ENCODER_PRESETS[preset][pil_format])
+        if pil_format in ("WEBP", "JPEG"):
+            params["quality"] = int(quality)
+        if pil_format == "WEBP" and lossless:
+            params["lossless"] = True
+        return pil_format, params
+
+    @staticmethod
+    def _prepare_for_format(img, pil_format):
+        # JPEG tidak punya alpha: komposit ke latar putih
+        if pil_format == "JPEG" and img.mode != "RGB":
+            rgba = img.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return img
+
+    def _encode(self, img, fp, fmt, quality, preset=DEFAULT_PRESET, lossless=False):
+        pil_format, params = self._encode_params(fmt, quality, preset, lossless)
+        self._prepare_for_format(img, pil_format).save(fp, pil_format, **params)
+
+    def _quality_hint(self, bucket):
+        with self._hints_lock:
+            if bucket not in self._quality_hints:
+                self._quality_hints[bucket] = self.manifest.quality_hint(bucket)
+            return self._quality_hints[bucket]
+
+    def _remember_quality_hint(self, bucket, quality):
+        with self._hints_lock:
+            if self._quality_hints.get(bucket) == quality:
+                return
+            self._quality_hints[bucket] = quality
+        self.manifest.record_quality_hint(bucket, quality)
+
+    def _encode_to_target(self, img, path, fmt, max_quality, target_size, source_bytes,
+                          preset=DEFAULT_PRESET, min_quality=DEFAULT_MIN_QUALITY,
+                          max_probes=DEFAULT_MAX_PROBES):
+        """
+        Encode dengan quality tertinggi (<= max_quality) yang hasilnya <= target_size byte.
+        Probe di-encode ke BytesIO; hanya hasil terpilih yang ditulis ke disk.
+        Mengembalikan SizeSearchResult (quality, size, probes, fits).
+        """
+        result = self._search_target(img, fmt, max_quality, target_size, source_bytes, preset,
+                                     min_quality, max_probes)
+        with open(path, "wb") as f:
+            f.write(result.buffer.getbuffer())
+        if not result.fits:
+            logger.warning("Target size %d bytes not reached for %s: %d bytes at quality=%d",
+                           target_size, path, result.size, result.quality)
+        return result
+
+    def _search_target(self, img, fmt, max_quality, target_size, source_bytes,
+                       preset=DEFAULT_PRESET, min_quality=DEFAULT_MIN_QUALITY,
+                       max_probes=DEFAULT_MAX_PROBES):
+        """
+        Pencarian quality untuk target_size (di memori) + update hint gambar serupa.
+        """
+        pil_format = OUTPUT_FORMATS[fmt][0]
+        prepared = self._prepare_for_format(img, pil_format)
+        width, height = prepared.size
+        bucket = quality_hint_bucket(fmt, preset, target_size, width, height,
+                                     "A" in prepared.getbands(),
+                                     source_bytes * 8.0 / max(1, width * height))
+
+        def encode(quality):
+            _, params = self._encode_params(fmt, quality, preset)
+            buffer = io.BytesIO()
+            prepared.save(buffer, pil_format, **params)
+            return buffer
+
+        result = search_quality(encode, target_size, max_quality, min_quality,
+                                self._quality_hint(bucket), max_probes)
+        if result.fits:
+            self._remember_quality_hint(bucket, result.quality)
+        return result
+
+    def _encode_to_ssim(self, img, path, fmt, quality, target_ssim, digest=None, settings=None,
+                        preset=DEFAULT_PRESET, min_quality=DEFAULT_MIN_QUALITY,
+                        max_probes=DEFAULT_MAX_PROBES):
+        """
+        Encode probe terkecil yang SSIM-nya >= target_ssim (lihat perceptual.search_ssim).
+        Probe di-encode ke BytesIO; hanya hasil terpilih yang ditulis ke path.
+        """
+        result = self._search_ssim(img, fmt, quality, target_ssim, digest, settings, preset,
+                                   min_quality, max_probes)
+        with open(path, "wb") as f:
+            f.write(result.buffer.getbuffer()[:result.size])
+        if not result.fits:
+            logger.warning("Target SSIM %.4f not reached for %s: best %.4f at quality=%d",
+                           target_ssim, path, result.ssim, result.quality)
+        return result
+
+    def _search_ssim(self, img, fmt, quality, target_ssim, digest=None, settings=None,
+                     preset=DEFAULT_PRESET, min_quality=DEFAULT_MIN_QUALITY,
+                     max_probes=DEFAULT_MAX_PROBES):
+        """
+        Pencarian quality auto-tuning di memori. SSIM dihitung dengan NumPy pada plane
+        luma yang diperkecil; 'quality' adalah pembanding (fixed_size). Quality terpilih
+        disimpan di manifest per (digest isi file, settings), jadi file yang sama
+        berikutnya cukup satu kali encode (probes = 0).
+        """
+        pil_format = OUTPUT_FORMATS[fmt][0]
+        prepared = self._prepare_for_format(img, pil_format)
+
+        def encode(q):
+            _, params = self._encode_params(fmt, q, preset)
+            buffer = io.BytesIO()
+            prepared.save(buffer, pil_format, **params)
+            return buffer
+
+        cached = self.manifest.auto_quality(digest, settings) if digest is not None else None
+        if cached is not None:
+            chosen, score, fixed_size = cached
+            buffer = encode(chosen)
+            return SsimSearchResult(chosen, buffer, buffer.tell(), score, 0, score >= target_ssim,
+                                    fixed_size)
+        result = search_ssim(encode, luma_plane(prepared), target_ssim, quality, min_quality,
+                             max_probes=max_probes)
+        if digest is not None:
+            self.manifest.record_auto_quality(digest, settings, result.quality, result.ssim,
+                                              result.fixed_size)
+        return result
+
+    def _encode_animation(self, source, path, quality, preset=DEFAULT_PRESET, lossless=False,
+                          max_fps=None, frame_policy="drop", max_width=None, max_height=None,
+                          fit="contain", resample="lanczos"):
+        """
+        GIF/APNG animasi -> WebP animasi. Frame di-decode, di-resize dan di-encode
+        satu per satu, jadi memori mengikuti satu-dua frame, bukan seluruh animasi.
+        Mengembalikan jumlah frame output.
+        """
+        if fit not in FIT_MODES:
+            raise ValueError("fit harus salah satu dari %s" % (FIT_MODES,))
+        new_w, new_h, crop_box = compute_target_size(source.width, source.height, max_width,
+                                                     max_height, fit)
+        transform = None
+        size = (new_w, new_h)
+        if size != source.size or crop_box is not None:
+            def transform(frame):
+                if frame.size != (new_w, new_h):
+                    frame = frame.resize((new_w, new_h), RESAMPLE_FILTERS[resample])
+                return frame.crop(crop_box) if crop_box is not None else frame
+            if crop_box is not None:
+                size = (crop_box[2] - crop_box[0], crop_box[3] - crop_box[1])
+        _, params = self._encode_params("webp", quality, preset, lossless)
+        writer = AnimatedWebPWriter(size, source_loop(source), quality, lossless,
+                                    params.get("method", 4))
+        for frame, timestamp, duration in iter_frames(source, max_fps, frame_policy, transform):
+            writer.add(frame, timestamp, duration)
+        writer.finish(path)
+        return writer.frames
+
+    def _open_image(self, input_path, max_width=None, max_height=None, fit="contain",
+                    resample="lanczos", timer=NULL_TIMER):
+        """
+        Buka gambar dan (opsional) perkecil ke max_width/max_height.
+        Untuk JPEG dipakai draft mode: decoder langsung men-decode di skala
+        1/2, 1/4 atau 1/8 sehingga gambar besar tidak pernah di-decode penuh.
+        """
+        with timer.stage("open"):
+            img = Image.open(input_path)
+        return self._load_resized(img, max_width, max_height, fit, resample, timer)
+
+    def _load_resized(self, img, max_width=None, max_height=None, fit="contain", resample="lanczos",
+                      timer=NULL_TIMER):
+        """
+        Decode gambar yang sudah dibuka (lazy) dan perkecil jika perlu, lihat _open_image.
+        """
+        if not (max_width or max_height):
+            with timer.stage("decode"):
+                img.load()
+            return img
+        if fit not in FIT_MODES:
+            raise ValueError("fit harus salah satu dari %s" % (FIT_MODES,))
+        new_w, new_h, crop_box = compute_target_size(img.width, img.height, max_width, max_height, fit)
+        if (new_w, new_h) != img.size and img.format == "JPEG":
+            # draft memilih skala terkecil yang hasilnya masih >= ukuran target
+            img.draft(img.mode, (new_w, new_h))
+        with timer.stage("decode"):
+            img.load()
+        if (new_w, new_h) == img.size and crop_box is None:
+            return img
+        with timer.stage("resize"):
+            # draft JPEG bisa sudah tepat di ukuran target: tinggal crop (fit="cover")
+            if (new_w, new_h) != img.size:
+                # gambar sangat besar: reduce() integer dulu, buffer antara resize jauh lebih kecil
+                reducing_gap = 3.0 if img.width * img.height > LARGE_IMAGE_PIXELS else None
+                img = img.resize((new_w, new_h), RESAMPLE_FILTERS[resample], reducing_gap=reducing_gap)
+            if crop_box is not None:
+                img = img.crop(crop_box)
+        return img
+
+    def estimate_memory(self, input_path, max_width=None, max_height=None, fit="contain", **_):
+        """
+        Perkiraan memori (byte) untuk mengonversi input_path, hanya dari header
+        (tanpa decode). 0 jika header tidak bisa dibaca (file akan gagal di convert).
+        """
+        try:
+            with Image.open(input_path) as img:
+                width, height, mode, fmt = img.width, img.height, img.mode, img.format
+        except Exception:
+            return 0
+        out_w, out_h, _ = compute_target_size(width, height, max_width, max_height, fit)
+        return estimate_memory(width, height, mode, fmt, out_w, out_h)
+
+    def estimate_cost(self, input_path, max_width=None, max_height=None, fit="contain",
+                      formats=("webp",), **_):
+        """
+        Perkiraan waktu konversi input_path (detik) dari header dan ukuran file,
+        untuk schedule="cost". Header yang tidak terbaca: hanya dari ukuran file.
+        """
+        try:
+            file_bytes = os.path.getsize(input_path)
+        except OSError:
+            return 0.0
+        try:
+            with Image.open(input_path) as img:
+                width, height, fmt = img.width, img.height, img.format
+        except Exception:
+            return estimate_cost(0, 0, None, file_bytes, 0, 0)
+        out_w, out_h, _ = compute_target_size(width, height, max_width, max_height, fit)
+        outputs = 1 if isinstance(formats, str) else len(formats)
+        return estimate_cost(width, height, fmt, file_bytes, out_w, out_h, outputs)
+
+    def _new_timer(self):
+        return StageTimer() if self.metrics_hook is not None or self._metrics_enabled else NULL_TIMER
+
+    def _emit_metrics(self, record):
+        if record is None or self.metrics_hook is None:
+            return
+        try:
+            self.metrics_hook(record)
+        except Exception:
+            logger.exception("metrics hook failed")
+
+    def convert_file(self, input_path, quality=80, use_cache=False, **options):
+        """
+        Mengonversi satu file gambar (png/jpg/jpeg, gif/apng animasi) ke WebP.
+        quality: integer 0-100 untuk WebP/JPEG.
+        use_cache: jika True, cek manifest dulu; file dengan isi dan setting
+                   yang sama tidak di-encode ulang, output lama dipakai ulang.
+        max_width/max_height: batas ukuran output dalam pixel (None = tanpa batas).
+        fit: "contain" (muat di dalam kotak) atau "cover" (isi kotak lalu crop).
+        resample: filter resize, salah satu dari RESAMPLE_FILTERS.
+        preset: preset encoder dari ENCODER_PRESETS ("fast", "balanced", "smallest").
+        lossless: WebP lossless (quality dipakai sebagai effort).
+        formats: satu atau beberapa format output ("webp", "jpeg", "png"); semua
+                 di-encode dari satu kali decode. JPEG selalu progressive.
+        target_size: batas ukuran output (byte) untuk WebP/JPEG lossy. Quality dicari
+                     per gambar (maks. 'quality', min. min_quality, paling banyak
+                     max_probes encode di memori); quality yang berhasil diingat
+                     untuk gambar serupa berikutnya.
+        target_ssim: mode auto-quality untuk WebP/JPEG lossy, mis. 0.95: output terkecil
+                     (min. min_quality, paling banyak max_probes encode) yang SSIM-nya
+                     >= target, tidak pernah lebih besar dari probe 'quality' yang lolos. 'quality' jadi pembanding: selisih ukuran terhadap quality
+                     tetap masuk metrics (fixed_quality_bytes) dan summary run. Quality
+                     terpilih di-cache di manifest per hash isi file.
+        max_fps/frame_policy: input animasi (GIF/APNG) ke WebP: batas frame rate,
+                     frame berlebih di-"drop" atau di-"merge" (lihat animation.iter_frames).
+                     Frame di-stream satu per satu; durasi dan loop dipertahankan.
+                     Format lain (jpeg/png) tetap memakai frame pertama.
+        Mengembalikan (True, output_path) jika sukses (path format pertama),
         atau (False, error_message) jika gagal.
+        Jika metrics_hook aktif, timing per stage dikirim ke hook.
         """
+        timer = self._new_timer()
+        success, info = self._convert_file(input_path, timer, quality, use_cache, **options)
+        self._emit_metrics(timer.record(os.path.basename(input_path), success))
+        return success, info
+
+    def _convert_file(self, input_path, timer, quality=80, use_cache=False, max_width=None,
+                      max_height=None, fit="contain", resample="lanczos", preset=DEFAULT_PRESET,
+                      lossless=False, formats=("webp",), target_size=None,
+                      min_quality=DEFAULT_MIN_QUALITY, max_probes=DEFAULT_MAX_PROBES, max_fps=None,
+                      frame_policy="drop", target_ssim=None):
         filename = os.path.basename(input_path)
         name_wo_ext, _ = os.path.splitext(filename)
-        output_path = os.path.join(self.output_dir, name_wo_ext + ".webp")
-        logger.info("Start convert_file: %s (quality=%s)", input_path, quality)
+        resize = dict(max_width=max_width, max_height=max_height, fit=fit, resample=resample)
+        # file di subfolder input: struktur folder dicerminkan ke output/success/fail
+        output_dir, success_dir, fail_dir = self._mirror_dirs(self._relative_dir(input_path))
+        log_level = self.file_log_level
+        logger.log(log_level, "Start convert_file: %s (quality=%s)", input_path, quality)
 
+        source = None
         try:
-            img = Image.open(input_path)
-            # Pilih mode yang sesuai: JPG biasanya RGB, PNG bisa RGBA
-            if img.mode not in ("RGB", "RGBA"):
-                try:
-                    img = img.convert("RGBA")
-                except Exception:
-                    img = img.convert("RGB")
+            if target_size and target_ssim:
+                raise ValueError("target_size dan target_ssim tidak bisa dipakai bersamaan")
+            formats = self._normalize_formats(formats)
+            output_paths = [os.path.join(output_dir, name_wo_ext + OUTPUT_FORMATS[fmt][1])
+                            for fmt in formats]
+            output_path = output_paths[0]
+            input_bytes = os.path.getsize(input_path)
+            if timer.enabled:
+                timer.set(input_bytes=input_bytes, cache_hit=False)
+            digest = ssim_digest = None
+            if use_cache:
+                with timer.stage("hash"):
+                    digest = ssim_digest = file_digest(input_path)
+                settings = [self._cache_settings_key(quality, fmt, preset, lossless,
+                                                     target_size=target_size, max_fps=max_fps,
+                                                     frame_policy=frame_policy,
+                                                     target_ssim=target_ssim, **resize)
+                            for fmt in formats]
+                cached_paths = [self.manifest.lookup(digest, key) for key in settings]
+                if all(cached_paths):
+                    with timer.stage("encode"):
+                        for cached_path, path in zip(cached_paths, output_paths):
+                            reuse_output(cached_path, path)
+                    with timer.stage("move"):
+                        shutil.move(input_path, os.path.join(success_dir, filename))
+                    if timer.enabled:
+                        timer.set(cache_hit=True, output_bytes=sum(os.path.getsize(p) for p in output_paths))
+                    logger.log(log_level, "Cache hit: %s -> %s (reused %s)", input_path, output_path,
+                               cached_paths[0])
+                    return True, output_path
+            elif target_ssim:
+                # quality hasil auto-tuning di-cache per hash isi file (output tidak di-cache)
+                with timer.stage("hash"):
+                    ssim_digest = file_digest(input_path)
 
-            # Simpan sebagai WebP dengan quality
-            img.save(output_path, "WEBP", quality=int(quality))
+            with timer.stage("open"):
+                source = Image.open(input_path)
+            # GIF/APNG animasi: output WebP di-encode per frame langsung dari source
+            animated = is_animated(source) and any(OUTPUT_FORMATS[f][0] == "WEBP" for f in formats)
+            img = None
+            if not animated or any(OUTPUT_FORMATS[f][0] != "WEBP" for f in formats):
+                img = self._load_resized(source, timer=timer, **resize)
+                if animated and img is source:
+                    img = img.copy()  # source masih di-seek ke frame lain oleh encoder animasi
+                # Pilih mode yang sesuai: JPG biasanya RGB, PNG bisa RGBA
+                if img.mode not in ("RGB", "RGBA"):
+                    with timer.stage("convert"):
+                        try:
+                            img = img.convert("RGBA")
+                        except Exception:
+                            img = img.convert("RGB")
+
+            output_bytes = 0
+            fixed_bytes = auto_bytes = 0
+            for i, (fmt, path) in enumerate(zip(formats, output_paths)):
+                # Encode ke nama sementara lalu os.replace: proses yang mati di tengah
+                # encode tidak meninggalkan output setengah jadi, dan output lama yang
+                # berupa hard link (cache/duplikat) diganti tanpa menimpa inode bersama.
+                part_path = path + PART_SUFFIX
+                start = time.perf_counter()
+                try:
+                    if animated and OUTPUT_FORMATS[fmt][0] == "WEBP":
+                        frames = self._encode_animation(source, part_path, quality, preset, lossless,
+                                                        max_fps, frame_policy, **resize)
+                        timer.set(frames=frames)
+                        logger.log(log_level, "Animated %s: %d frame(s) (max_fps=%s)", filename,
+                                   frames, max_fps)
+                    elif target_size and not lossless and OUTPUT_FORMATS[fmt][0] in ("WEBP", "JPEG"):
+                        result = self._encode_to_target(img, part_path, fmt, quality, target_size,
+                                                        input_bytes, preset, min_quality, max_probes)
+                        timer.set(target_quality=result.quality, target_probes=result.probes,
+                                  target_fits=result.fits)
+                        logger.log(log_level, "Target size %d: %s quality=%d after %d probe(s)",
+                                   target_size, filename, result.quality, result.probes)
+                    elif target_ssim and not lossless and OUTPUT_FORMATS[fmt][0] in ("WEBP", "JPEG"):
+                        ssim_key = self._cache_settings_key(quality, fmt, preset, lossless,
+                                                            target_ssim=target_ssim, **resize)
+                        result = self._encode_to_ssim(img, part_path, fmt, quality, target_ssim,
+                                                      ssim_digest, ssim_key, preset, min_quality,
+                                                      max_probes)
+                        fixed_bytes += result.fixed_size
+                        auto_bytes += result.size
+                        timer.set(auto_quality=result.quality, ssim=round(result.ssim, 5),
+                                  ssim_probes=result.probes, ssim_fits=result.fits)
+                        logger.log(log_level, "Auto quality %s: quality=%d ssim=%.4f after %d probe(s), "
+                                   "%d bytes (quality=%d: %d bytes)", filename, result.quality,
+                                   result.ssim, result.probes, result.size, quality, result.fixed_size)
+                    else:
+                        self._encode(img, part_path, fmt, quality, preset, lossless)
+                    os.replace(part_path, path)
+                except BaseException:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                    raise
+                elapsed = time.perf_counter() - start
+                timer.add("encode", elapsed)
+                size = os.path.getsize(path)
+                output_bytes += size
+                logger.log(log_level, "Encoded %s -> %s (preset=%s, %d bytes, %.3fs)", filename, path,
+                           preset, size, elapsed)
+                if digest is not None:
+                    self.manifest.record(digest, settings[i], path)
+            timer.set(output_bytes=output_bytes)
+            if fixed_bytes:
+                timer.set(fixed_quality_bytes=fixed_bytes, auto_quality_bytes=auto_bytes)
+            # GIF/APNG multi-frame tetap membuka file sumber; tutup sebelum dipindah
+            source.close()
             # pindahkan file sumber ke folder success
-            shutil.move(input_path, os.path.join(self.success_dir, filename))
-            logger.info("Convert success: %s -> %s (moved to %s)", input_path, output_path, self.success_dir)
+            with timer.stage("move"):
+                shutil.move(input_path, os.path.join(success_dir, filename))
+            logger.log(log_level, "Convert success: %s -> %s (moved to %s)", input_path, output_path,
+                       success_dir)
             return True, output_path
         except Exception as e:
             logger.exception("Convert failed for %s: %s", input_path, e)
+            if source is not None:
+                # handle sumber (GIF/APNG animasi) masih terbuka: di Windows move akan gagal
+                source.close()
             try:
-                shutil.move(input_path, os.path.join(self.fail_dir, filename))
-                logger.info("Moved failed file to %s", self.fail_dir)
+                shutil.move(input_path, os.path.join(fail_dir, filename))
+                logger.info("Moved failed file to %s", fail_dir)
             except Exception as mv_e:
                 logger.exception("Failed to move failed file %s: %s", input_path, mv_e)
             return False, str(e)
 
-    def convert_all(self, extensions=None, quality=80):
+    def convert_bytes(self, data, quality=80, fmt="webp", preset=DEFAULT_PRESET, lossless=False,
+                      max_width=None, max_height=None, fit="contain", resample="lanczos",
+                      target_size=None, min_quality=DEFAULT_MIN_QUALITY,
+                      max_probes=DEFAULT_MAX_PROBES, target_ssim=None):
+        """
+        Konversi di memori untuk dipakai di server (upload handler): tidak ada file
+        yang ditulis, dibaca ulang atau dipindah.
+        data: bytes, bytearray, memoryview (atau objek buffer lain), atau file-like
+              (read/seek). bytes dan buffer lain dibaca tanpa salinan penuh.
+        Opsi lain sama seperti convert_file (satu format output).
+        Mengembalikan (memoryview hasil encode, dict metadata). memoryview menunjuk
+        langsung ke buffer output (tanpa salinan); pakai bytes(view) jika perlu bytes.
+        Gambar yang tidak valid menimbulkan exception (mis. PIL.UnidentifiedImageError).
+        """
+        timer = self._new_timer()
+        started = time.perf_counter()
+        source, input_bytes = _as_readable(data)
+        fmt = self._normalize_formats(fmt)[0]
+        pil_format, extension = OUTPUT_FORMATS[fmt]
+        timer.set(input_bytes=input_bytes, cache_hit=False)
+        with timer.stage("open"):
+            img = Image.open(source)
+        source_format, (source_width, source_height) = img.format, img.size
+        img = self._load_resized(img, max_width, max_height, fit, resample, timer=timer)
+        if img.mode not in ("RGB", "RGBA"):
+            with timer.stage("convert"):
+                try:
+                    img = img.convert("RGBA")
+                except Exception:
+                    img = img.convert("RGB")
+        meta = {"format": fmt, "mime": Image.MIME.get(pil_format, "application/octet-stream"),
+                "extension": extension, "width": img.width, "height": img.height,
+                "source_format": source_format, "source_width": source_width,
+                "source_height": source_height, "input_bytes": input_bytes, "quality": quality}
+        start = time.perf_counter()
+        if target_size and not lossless and pil_format in ("WEBP", "JPEG"):
+            result = self._search_target(img, fmt, quality, target_size, input_bytes, preset,
+                                         min_quality, max_probes)
+            output = result.buffer
+            meta.update(quality=result.quality, target_probes=result.probes, target_fits=result.fits)
+        elif target_ssim and not lossless and pil_format in ("WEBP", "JPEG"):
+            # tanpa cache manifest: data upload tidak punya path/digest yang stabil
+            result = self._search_ssim(img, fmt, quality, target_ssim, preset=preset,
+                                       min_quality=min_quality, max_probes=max_probes)
+            output = result.buffer
+            output.seek(result.size)
+            meta.update(quality=result.quality, ssim=round(result.ssim, 5), ssim_probes=result.probes,
+                        ssim_fits=result.fits, fixed_quality_bytes=result.fixed_size)
+        else:
+            output = io.BytesIO()
+            self._encode(img, output, fmt, quality, preset, lossless)
+        meta["encode_s"] = round(time.perf_counter() - start, 6)
+        timer.add("encode", meta["encode_s"])
+        view = output.getbuffer()[:output.tell()]
+        meta["output_bytes"] = len(view)
+        meta["total_s"] = round(time.perf_counter() - started, 6)
+        timer.set(output_bytes=len(view))
+        self._emit_metrics(timer.record("<bytes>", True))
+        return view, meta
+
+    def compare_presets(self, input_path, presets=None, formats=("webp",), quality=80,
+                        lossless=False, **resize):
+        """
+        Encode satu gambar dengan tiap preset (di memori, tanpa menulis/memindah file)
+        untuk memilih tradeoff kecepatan vs ukuran.
+        Mengembalikan list dict: preset, format, bytes, bytes_saved, saved_pct, encode_s.
+        """
+        if presets is None:
+            presets = tuple(ENCODER_PRESETS)
+        formats = self._normalize_formats(formats)
+        input_size = os.path.getsize(input_path)
+        img = self._open_image(input_path, **resize)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        img.load()
+        report = []
+        for preset in presets:
+            for fmt in formats:
+                buf = io.BytesIO()
+                start = time.perf_counter()
+                self._encode(img, buf, fmt, quality, preset, lossless)
+                elapsed = time.perf_counter() - start
+                size = buf.tell()
+                report.append({
+                    "preset": preset,
+                    "format": fmt,
+                    "bytes": size,
+                    "bytes_saved": input_size - size,
+                    "saved_pct": round(100.0 * (input_size - size) / input_size, 2) if input_size else 0.0,
+                    "encode_s": round(elapsed, 4),
+                })
+        return report
+
+    def _resolve_workers(self, workers=None):
+        """
+        Jumlah worker untuk mode paralel. None -> jumlah CPU.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        return max(1, int(workers))
+
+    def _convert_one(self, input_path, quality=80, use_cache=False, release_memory=False, **options):
+        """
+        Dipanggil di proses worker (mode paralel). Mengembalikan tuple
+        (filename, success_bool, info, metrics_record). Record metrics dikirim
+        balik ke proses utama supaya hook dan summary berjalan di sana.
+        release_memory: kembalikan heap ke OS setelah file selesai (mode memory_budget),
+                        supaya RSS worker mengikuti budget, bukan gambar terbesar terakhir.
+        """
+        filename = self._relative_name(input_path)
+        timer = self._new_timer()
+        success, info = self._convert_file(input_path, timer, quality, use_cache, **options)
+        if release_memory:
+            trim_heap()
+        return filename, success, info, timer.record(filename, success)
+
+    def convert_all(self, extensions=None, quality=80, parallel=False, workers=None, use_cache=False,
+                    memory_budget=None, dedupe=False, dedupe_distance=DEFAULT_MAX_DISTANCE,
+                    dedupe_method="dhash", journal=False, schedule="input", **options):
         """
         Mengonversi semua file di folder input yang cocok dengan 'extensions'.
         extensions: iterable ekstensi dengan dot, mis. ('.png', '.jpg').
                     Jika None, gunakan DEFAULT_SUPPORTED_EXT.
         quality: integer 0-100 untuk WebP.
+        parallel: jika True, file dikonversi di process pool.
+        workers: jumlah proses untuk mode paralel (default: jumlah CPU).
+        use_cache: lewati encode untuk file yang output identiknya sudah ada
+                   di manifest (lihat convert_file).
+        memory_budget: batas perkiraan memori (byte) semua file yang sedang
+                       di-decode sekaligus pada mode paralel (lihat convert_iter).
+        dedupe: jika True, pre-pass hash perseptual (lihat find_duplicates): hanya satu
+                representatif per grup near-duplicate yang di-encode; output duplikat
+                di-link ke output representatif dan pemetaannya dicatat di
+                output/duplicates.json.
+        dedupe_distance/dedupe_method: jarak Hamming maksimal dan "dhash"/"phash".
+        journal: catat rencana + progres batch di journal_path (lihat journal.BatchJournal).
+                 Jika proses mati di tengah batch, resume_batch() menyelesaikan sisanya.
+                 RuntimeError jika batch sebelumnya belum selesai.
+        schedule: (mode paralel) "input", "largest" atau "cost": urutan pengiriman file
+                  ke worker (lihat convert_iter). Hasil tetap dalam urutan nama.
+        options: diteruskan ke convert_file (max_width, max_height, fit, resample,
+                 preset, lossless, formats, target_size, target_ssim, min_quality,
+                 max_probes, max_fps, frame_policy).
         Mengembalikan list tuple: (filename, success_bool, info)
         """
+        if schedule not in SCHEDULES:
+            raise ValueError("schedule harus salah satu dari %s" % (SCHEDULES,))
         if extensions is None:
             extensions = self.DEFAULT_SUPPORTED_EXT
-        logger.info("Start convert_all in folder: %s with extensions=%s quality=%s",
-                    self.input_dir, extensions, quality)
-        results = []
+        logger.info("Start convert_all in folder: %s with extensions=%s quality=%s parallel=%s",
+                    self.input_dir, extensions, quality, parallel)
         try:
             filenames = sorted(os.listdir(self.input_dir))
         except FileNotFoundError:
             filenames = []
-        for filename in filenames:
-            if self._is_supported(filename, extensions):
-                input_path = os.path.join(self.input_dir, filename)
-                success, info = self.convert_file(input_path, quality=quality)
-                results.append((filename, success, info))
+        input_paths = [os.path.join(self.input_dir, f) for f in filenames
+                       if self._is_supported(f, extensions)]
+
+        workers = self._resolve_workers(workers) if parallel else 1
+        duplicates = {}
+        if dedupe and len(input_paths) > 1:
+            all_paths = input_paths
+            input_paths, duplicates = self.find_duplicates(input_paths, dedupe_distance,
+                                                           dedupe_method, workers)
+        if journal:
+            results = self._convert_journaled(input_paths, quality, parallel, workers, use_cache,
+                                              memory_budget, schedule, duplicates, **options)
+        elif workers > 1 and len(input_paths) > 1 and (memory_budget or schedule != "input"):
+            # admission / urutan per file lewat convert_iter, hasil diurutkan lagi sesuai input
+            order = {os.path.basename(p): i for i, p in enumerate(input_paths)}
+            results = sorted(self.convert_iter(quality=quality, parallel=True, workers=workers,
+                                               use_cache=use_cache, input_paths=input_paths,
+                                               memory_budget=memory_budget, schedule=schedule,
+                                               **options),
+                             key=lambda r: order[r[0]])
+        elif workers > 1 and len(input_paths) > 1:
+            results = self._convert_parallel(input_paths, quality, workers, use_cache, **options)
+        else:
+            results = list(self.convert_iter(quality=quality, use_cache=use_cache,
+                                             input_paths=input_paths, **options))
+        if duplicates:
+            if not journal:
+                results.extend(self._finish_duplicates(duplicates, results, quality, use_cache,
+                                                       **options))
+            order = {self._relative_name(p): i for i, p in enumerate(all_paths)}
+            results.sort(key=lambda r: order[r[0]])
         logger.info("convert_all finished. total_processed=%d", len(results))
         return results
+
+    def _convert_journaled(self, input_paths, quality, parallel, workers, use_cache, memory_budget,
+                           schedule="input", duplicates=None, **options):
+        """
+        convert_all dengan journal. Duplikat dari dedupe ikut di rencana beserta
+        representatifnya, jadi resume_batch bisa menyelesaikannya setelah crash.
+        """
+        names = [self._relative_name(p) for p in input_paths]
+        dup_names = {self._relative_name(dup): self._relative_name(rep)
+                     for dup, rep in (duplicates or {}).items()}
+        settings = {"quality": quality, "use_cache": use_cache, "schedule": schedule,
+                    "options": options}
+        journal = BatchJournal.create(self.journal_path, os.path.abspath(self.input_dir),
+                                      names + list(dup_names), settings, duplicates=dup_names)
+        logger.info("Batch journal %s: %d file planned (%d duplicate(s))", self.journal_path,
+                    len(names) + len(dup_names), len(dup_names))
+        try:
+            order = {name: i for i, name in enumerate(names)}
+            results = sorted(self.convert_iter(quality=quality, parallel=parallel, workers=workers,
+                                               use_cache=use_cache, input_paths=input_paths,
+                                               memory_budget=memory_budget, journal=journal,
+                                               schedule=schedule, **options),
+                             key=lambda r: order[r[0]])
+            if duplicates:
+                results.extend(self._finish_duplicates(duplicates, results, quality, use_cache,
+                                                       journal=journal, **options))
+        except BaseException:
+            journal.close()
+            raise
+        journal.complete()
+        return results
+
+    def resume_batch(self, parallel=False, workers=None, memory_budget=None):
+        """
+        Lanjutkan batch convert_all(journal=True) yang terhenti. Setting konversi
+        diambil dari journal. File yang belum tercatat selesai diverifikasi dulu:
+        - masih di input: sisa .part dihapus, file dikonversi ulang;
+        - sudah di success dan semua output bisa di-decode: dianggap selesai;
+        - sudah di success tapi output hilang/rusak: dikembalikan ke input lalu dikonversi ulang;
+        - sudah di fail: dianggap gagal.
+        Duplikat (dedupe) yang masih di input diselesaikan setelah representatifnya:
+        di-link jika representatif berhasil, selain itu dikonversi sendiri.
+        Mengembalikan list (filename, success_bool, info) untuk file yang belum
+        selesai saat crash (urutan rencana), atau [] jika tidak ada batch terbuka.
+        """
+        if not os.path.exists(self.journal_path):
+            logger.info("resume_batch: no journal at %s", self.journal_path)
+            return []
+        state = BatchJournal.load(self.journal_path)
+        if state.complete:
+            os.remove(self.journal_path)
+            return []
+        settings = state.settings
+        quality = settings.get("quality", 80)
+        use_cache = settings.get("use_cache", False)
+        schedule = settings.get("schedule", "input")
+        options = settings.get("options", {})
+        formats = self._normalize_formats(options.get("formats", ("webp",)))
+        input_dir = state.input_dir or self.input_dir
+        pending = state.pending
+        logger.info("resume_batch: planned=%d done=%d pending=%d", len(state.planned),
+                    len(state.done), len(pending))
+
+        journal = BatchJournal(self.journal_path)
+        try:
+            recovered = []
+            remaining = []
+            duplicates = {}
+            for name in pending:
+                input_path = os.path.join(input_dir, name)
+                verified = self._verify_pending(input_path, formats)
+                if verified is not None:
+                    journal.finished(name, verified[0])
+                    recovered.append((self._relative_name(input_path),) + verified)
+                elif name in state.duplicates:
+                    duplicates[input_path] = os.path.join(input_dir, state.duplicates[name])
+                else:
+                    remaining.append(input_path)
+            logger.info("resume_batch: recovered=%d to convert=%d duplicates=%d", len(recovered),
+                        len(remaining), len(duplicates))
+            order = {name: i for i, name in enumerate(pending)}
+            converted = list(self.convert_iter(
+                quality=quality, parallel=parallel, workers=workers, use_cache=use_cache,
+                input_paths=remaining, memory_budget=memory_budget, journal=journal,
+                schedule=schedule, **options))
+            if duplicates:
+                # hasil representatif: selesai sebelum crash, terverifikasi, atau baru dikonversi
+                known = [(name, ok, None) for name, ok in state.done.items()] + recovered + converted
+                converted.extend(self._finish_duplicates(duplicates, known, quality, use_cache,
+                                                         journal=journal, **options))
+            results = sorted(recovered + converted, key=lambda r: order.get(r[0], len(order)))
+        except BaseException:
+            journal.close()
+            raise
+        journal.complete()
+        return results
+
+    def _verify_pending(self, input_path, formats):
+        """
+        Status file yang belum tercatat selesai di journal: None jika harus
+        dikonversi (lagi), atau (success, info) jika ternyata sudah tuntas sebelum crash.
+        """
+        filename = os.path.basename(input_path)
+        _, success_dir, fail_dir = self._mirror_dirs(self._relative_dir(input_path))
+        output_paths = self._output_paths(input_path, formats)
+        for path in output_paths:
+            if os.path.exists(path + PART_SUFFIX):
+                os.remove(path + PART_SUFFIX)
+        if os.path.exists(input_path):
+            return None
+        moved = os.path.join(success_dir, filename)
+        if os.path.exists(moved):
+            if all(self._output_ok(path) for path in output_paths):
+                return True, output_paths[0]
+            logger.warning("Output of %s missing or corrupt, converting again", input_path)
+            shutil.move(moved, input_path)
+            return None
+        if os.path.exists(os.path.join(fail_dir, filename)):
+            return False, "gagal sebelum batch terhenti"
+        return False, "file input hilang"
+
+    @staticmethod
+    def _output_ok(path):
+        try:
+            with Image.open(path) as img:
+                img.load()
+            return True
+        except Exception:
+            return False
+
+    def find_duplicates(self, input_paths, max_distance=DEFAULT_MAX_DISTANCE, method="dhash",
+                        workers=1, batch_size=DEFAULT_HASH_BATCH):
+        """
+        Pre-pass near-duplicate: hash perseptual 64-bit (dHash/pHash) dari decode
+        kecil tiap file (NumPy, per batch; paralel jika workers > 1), lalu
+        dikelompokkan lewat multi-index hashing (lihat dedupe.MultiIndexHash), jadi
+        tidak ada perbandingan semua-ke-semua. Gambar yang terlalu polos tidak
+        dikelompokkan, dan tiap kandidat dicek ulang (rasio aspek + thumbnail RGB,
+        lihat dedupe.confirm_duplicates); yang gagal dikonversi sendiri.
+        Mengembalikan (representatives, duplicates): list path yang perlu di-encode
+        (urutan input) dan dict {path duplikat: path representatif}.
+        """
+        input_paths = list(input_paths)
+        started = time.perf_counter()
+        batches = [input_paths[i:i + batch_size] for i in range(0, len(input_paths), batch_size)]
+        hash_batch = partial(hash_files, method=method)
+        hashed = self._map_batches(hash_batch, batches, workers)
+        hash_s = time.perf_counter() - started
+        representatives, duplicates = group_duplicates(hashed, max_distance)
+        pairs = sorted(duplicates.items(), key=lambda pair: pair[1])  # thumbnail rep dipakai ulang
+        pair_batches = [pairs[i:i + batch_size] for i in range(0, len(pairs), batch_size)]
+        confirmed = self._map_batches(confirm_duplicates, pair_batches, workers)
+        rejected = {dup_path for (dup_path, _), ok in zip(pairs, confirmed) if not ok}
+        if rejected:
+            duplicates = {dup: rep for dup, rep in duplicates.items() if dup not in rejected}
+            keep = set(representatives) | rejected
+            representatives = [path for path in input_paths if path in keep]
+        report = {"type": "dedupe", "method": method, "max_distance": max_distance,
+                  "files": len(input_paths), "unique": len(representatives),
+                  "duplicates": len(duplicates), "rejected": len(rejected),
+                  "unhashed": sum(1 for row in hashed if row[1] is None),
+                  "hash_s": round(hash_s, 4),
+                  "group_s": round(time.perf_counter() - started - hash_s, 4)}
+        logger.info("Dedupe (%s, distance<=%d): files=%d unique=%d duplicates=%d rejected=%d "
+                    "hash=%.3fs group=%.3fs", method, max_distance, report["files"], report["unique"],
+                    report["duplicates"], report["rejected"], report["hash_s"], report["group_s"])
+        self._emit_metrics(report)
+        return representatives, duplicates
+
+    def _map_batches(self, func, batches, workers):
+        """
+        func per batch (di process pool jika workers > 1 dan batch > 1), hasil digabung.
+        """
+        if workers > 1 and len(batches) > 1:
+            with self._process_pool(min(workers, len(batches))) as executor:
+                return [row for rows in executor.map(func, batches) for row in rows]
+        return [row for batch in batches for row in func(batch)]
+
+    def _finish_duplicates(self, duplicates, results, quality=80, use_cache=False, journal=None,
+                           **options):
+        """
+        Selesaikan file duplikat tanpa encode: output representatif di-link (hard
+        link, fallback copy) ke nama output duplikat, file sumber dipindah ke success.
+        Jika representatif gagal, duplikat dikonversi sendiri.
+        Pemetaan duplikat -> representatif ditambahkan ke output/duplicates.json.
+        journal: BatchJournal opsional; start/done tiap duplikat dicatat.
+        """
+        outcome = {name: success for name, success, _ in results}
+        formats = self._normalize_formats(options.get("formats", ("webp",)))
+        finished = []
+        mapping = {}
+        for dup_path, rep_path in duplicates.items():
+            name = self._relative_name(dup_path)
+            rep_name = self._relative_name(rep_path)
+            if journal is not None:
+                journal.started(name)
+            if not outcome.get(rep_name):
+                filename, success, info, record = self._convert_one(dup_path, quality, use_cache,
+                                                                    **options)
+                self._emit_metrics(record)
+            else:
+                filename = name
+                success, info = self._link_duplicate(dup_path, rep_path, formats)
+                if success:
+                    mapping[name] = rep_name
+            if journal is not None:
+                journal.finished(filename, success)
+            finished.append((filename, success, info))
+        self._record_duplicates(mapping)
+        return finished
+
+    def _output_paths(self, input_path, formats):
+        name_wo_ext = os.path.splitext(os.path.basename(input_path))[0]
+        output_dir = self._mirror_dirs(self._relative_dir(input_path))[0]
+        return [os.path.join(output_dir, name_wo_ext + OUTPUT_FORMATS[fmt][1]) for fmt in formats]
+
+    def _link_duplicate(self, dup_path, rep_path, formats):
+        filename = os.path.basename(dup_path)
+        _, success_dir, fail_dir = self._mirror_dirs(self._relative_dir(dup_path))
+        try:
+            output_paths = self._output_paths(dup_path, formats)
+            for rep_output, output_path in zip(self._output_paths(rep_path, formats), output_paths):
+                reuse_output(rep_output, output_path)
+            shutil.move(dup_path, os.path.join(success_dir, filename))
+            logger.log(self.file_log_level, "Duplicate: %s -> %s (same as %s)", dup_path,
+                       output_paths[0], rep_path)
+            return True, output_paths[0]
+        except Exception as e:
+            logger.exception("Duplicate link failed for %s: %s", dup_path, e)
+            try:
+                shutil.move(dup_path, os.path.join(fail_dir, filename))
+            except Exception as mv_e:
+                logger.exception("Failed to move failed file %s: %s", dup_path, mv_e)
+            return False, str(e)
+
+    def _record_duplicates(self, mapping):
+        """
+        Gabungkan pemetaan {duplikat: representatif} (nama relatif) ke output/duplicates.json.
+        """
+        if not mapping:
+            return
+        path = os.path.join(self.output_dir, "duplicates.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                recorded = json.load(f)
+        except (OSError, ValueError):
+            recorded = {}
+        recorded.update(mapping)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(recorded, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def _iter_input_paths(self, extensions):
+        """
+        Stream path file input yang cocok tanpa membuat list penuh (os.scandir).
+        """
+        try:
+            with os.scandir(self.input_dir) as it:
+                for entry in it:
+                    if entry.is_file() and self._is_supported(entry.name, extensions):
+                        yield entry.path
+        except FileNotFoundError:
+            return
+
+    def _iter_tree_entries(self, extensions):
+        """
+        Stream DirEntry file yang cocok di seluruh pohon input_dir (os.scandir,
+        DFS dengan stack, subfolder diurutkan). Symlink folder tidak diikuti dan
+        folder output/success/fail yang kebetulan ada di dalam input dilewati.
+        """
+        skip = {os.path.abspath(d) for d in (self.output_dir, self.success_dir, self.fail_dir)}
+        stack = [self.input_dir]
+        while stack:
+            folder = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if os.path.abspath(entry.path) not in skip:
+                                    subdirs.append(entry.path)
+                            elif entry.is_file() and self._is_supported(entry.name, extensions):
+                                yield entry
+                        except OSError:
+                            continue
+            except (FileNotFoundError, NotADirectoryError, PermissionError) as e:
+                logger.warning("Skipping folder %s: %s", folder, e)
+                continue
+            stack.extend(sorted(subdirs, reverse=True))
+
+    def _subtree_key(self, rel_name, depth):
+        parts = rel_name.replace(os.sep, "/").split("/")[:-1]
+        return "/".join(parts[:depth]) if parts and depth > 0 else "."
+
+    def convert_tree(self, extensions=None, quality=80, parallel=False, workers=None,
+                     use_cache=False, memory_budget=None, report_depth=1, on_result=None, **options):
+        """
+        Konversi rekursif semua file di pohon input_dir. Struktur folder relatif
+        dicerminkan ke output, success dan fail. Path di-stream ke convert_iter
+        (tidak ada daftar file penuh di memori).
+        report_depth: kedalaman folder untuk pengelompokan laporan throughput
+                      (1 = per folder level pertama, mis. per event).
+        on_result: callback opsional (relative_name, success, info) per file.
+        options/parallel/workers/memory_budget/schedule: sama seperti convert_iter.
+        Mengembalikan dict laporan: total + per subtree (files, ok, failed, byte,
+        wall_s, files_per_s, mb_per_s). Laporan juga dikirim ke metrics_hook (type "tree").
+        """
+        if extensions is None:
+            extensions = self.DEFAULT_SUPPORTED_EXT
+        logger.info("Start convert_tree in folder: %s with extensions=%s quality=%s parallel=%s",
+                    self.input_dir, extensions, quality, parallel)
+        started = time.perf_counter()
+        subtrees = {}
+
+        def stats(key):
+            entry = subtrees.get(key)
+            if entry is None:
+                entry = subtrees[key] = {"files": 0, "ok": 0, "failed": 0, "input_bytes": 0,
+                                         "output_bytes": 0, "started": time.perf_counter(),
+                                         "finished": None}
+            return entry
+
+        def paths():
+            for entry in self._iter_tree_entries(extensions):
+                key = self._subtree_key(self._relative_name(entry.path), report_depth)
+                try:
+                    stats(key)["input_bytes"] += entry.stat().st_size
+                except OSError:
+                    stats(key)
+                yield entry.path
+
+        for name, success, info in self.convert_iter(extensions, quality, parallel, workers,
+                                                     use_cache=use_cache, input_paths=paths(),
+                                                     memory_budget=memory_budget, **options):
+            entry = stats(self._subtree_key(name, report_depth))
+            entry["files"] += 1
+            if success:
+                entry["ok"] += 1
+                try:
+                    entry["output_bytes"] += os.path.getsize(info)
+                except OSError:
+                    pass
+            else:
+                entry["failed"] += 1
+            entry["finished"] = time.perf_counter()
+            if on_result is not None:
+                on_result(name, success, info)
+
+        report = {"type": "tree", "files": 0, "ok": 0, "failed": 0,
+                  "wall_s": round(time.perf_counter() - started, 4), "subtrees": {}}
+        for key in sorted(subtrees):
+            entry = subtrees[key]
+            wall = max((entry["finished"] or entry["started"]) - entry["started"], 1e-9)
+            for field in ("files", "ok", "failed"):
+                report[field] += entry[field]
+            report["subtrees"][key] = {
+                "files": entry["files"], "ok": entry["ok"], "failed": entry["failed"],
+                "input_bytes": entry["input_bytes"], "output_bytes": entry["output_bytes"],
+                "wall_s": round(wall, 4),
+                "files_per_s": round(entry["files"] / wall, 2),
+                "mb_per_s": round(entry["input_bytes"] / wall / (1024 * 1024), 2),
+            }
+            logger.info("Subtree %s: files=%d ok=%d failed=%d wall=%.3fs (%.1f files/s)", key,
+                        entry["files"], entry["ok"], entry["failed"], wall, entry["files"] / wall)
+        self._emit_metrics(report)
+        logger.info("convert_tree finished. files=%d ok=%d failed=%d wall=%.3fs", report["files"],
+                    report["ok"], report["failed"], report["wall_s"])
+        return report
+
+    def convert_iter(self, extensions=None, quality=80, parallel=False, workers=None,
+                     max_inflight=None, use_cache=False, input_paths=None, memory_budget=None,
+                     journal=None, schedule="input", **options):
+        """
+        Generator: yield (filename, success_bool, info) segera setelah tiap file
+        selesai, jadi caller (progress bar, web endpoint) bisa memproses hasil awal.
+        parallel/workers: sama seperti convert_all. Pada mode paralel urutan hasil
+                          mengikuti urutan selesai (as-completed), bukan urutan nama.
+        max_inflight: batas jumlah file yang sedang dikerjakan sekaligus
+                      (default: 2 x workers). Memori tetap datar berapapun jumlah file.
+        input_paths: iterable path opsional; default stream dari input_dir.
+        memory_budget: (mode paralel) batas byte perkiraan memori decode semua file
+                       yang sedang dikerjakan. Header dibaca dulu (estimate_memory);
+                       file baru dikirim ke worker hanya jika masih muat. File yang
+                       sendirian melebihi budget dikerjakan sendiri.
+        journal: BatchJournal opsional; start/done tiap file dicatat (lihat convert_all).
+        schedule: (mode paralel) urutan pengiriman ke worker, salah satu dari SCHEDULES:
+                  "input" (default), "largest" (ukuran file) atau "cost" (perkiraan
+                  waktu dari header + ukuran file, lihat estimate_cost). Selain "input",
+                  semua path dikumpulkan dan diurutkan terbesar dulu sebelum file pertama
+                  dikirim. File dikirim satu per satu saat ada worker yang selesai
+                  (bukan dibagi per chunk di awal), jadi worker selesai hampir bersamaan.
+        options: diteruskan ke convert_file.
+        Jika metrics_hook aktif, summary run dikirim ke hook setelah file terakhir.
+        """
+        if schedule not in SCHEDULES:
+            raise ValueError("schedule harus salah satu dari %s" % (SCHEDULES,))
+        if extensions is None:
+            extensions = self.DEFAULT_SUPPORTED_EXT
+        if input_paths is None:
+            input_paths = self._iter_input_paths(extensions)
+
+        summary = MetricsSummary() if self.metrics_hook is not None else None
+        counts = [0, 0]  # [sukses, gagal] untuk log agregat batch
+        started = time.perf_counter()
+        workers = self._resolve_workers(workers) if parallel else 1
+        if workers > 1 and schedule != "input":
+            input_paths = order_paths(input_paths, schedule, partial(self.estimate_cost, **options))
+        input_paths = iter(input_paths)
+        if workers <= 1:
+            for input_path in input_paths:
+                if journal is not None:
+                    journal.started(self._relative_name(input_path))
+                filename, success, info, record = self._convert_one(input_path, quality, use_cache,
+                                                                    **options)
+                if journal is not None:
+                    journal.finished(filename, success)
+                self._collect_metrics(record, summary)
+                counts[0 if success else 1] += 1
+                yield filename, success, info
+            self._emit_summary(summary)
+            self._log_batch(counts, started)
+            return
+
+        if max_inflight is None:
+            max_inflight = workers * 2
+        max_inflight = max(1, int(max_inflight))
+        budget = MemoryBudget(memory_budget) if memory_budget else None
+        logger.info("convert_iter parallel: workers=%d max_inflight=%d memory_budget=%s",
+                    workers, max_inflight, memory_budget)
+        executor = self._process_pool(workers)
+        try:
+            inflight = set()
+            costs = {}
+            waiting = None  # (path, cost) yang belum muat di budget
+            exhausted = False
+            while True:
+                while len(inflight) < max_inflight:
+                    if waiting is None:
+                        input_path = None if exhausted else next(input_paths, None)
+                        if input_path is None:
+                            exhausted = True
+                            break
+                        cost = self.estimate_memory(input_path, **options) if budget else 0
+                        waiting = (input_path, cost)
+                    input_path, cost = waiting
+                    if budget is not None:
+                        if not budget.try_acquire(cost):
+                            break
+                        if cost > budget.limit:
+                            logger.warning("%s needs ~%d MB (> memory budget), running alone",
+                                           input_path, cost // (1024 * 1024))
+                    if journal is not None:
+                        journal.started(self._relative_name(input_path))
+                    future = executor.submit(self._convert_one, input_path, quality, use_cache,
+                                             release_memory=budget is not None, **options)
+                    inflight.add(future)
+                    costs[future] = cost
+                    waiting = None
+                if not inflight:
+                    break
+                done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    cost = costs.pop(future)
+                    if budget is not None:
+                        budget.release(cost)
+                    filename, success, info, record = future.result()
+                    if journal is not None:
+                        journal.finished(filename, success)
+                    self._collect_metrics(record, summary)
+                    counts[0 if success else 1] += 1
+                    yield filename, success, info
+            self._emit_summary(summary)
+            self._log_batch(counts, started)
+            if budget is not None:
+                logger.info("Memory budget %d MB: peak estimated %d MB",
+                            budget.limit // (1024 * 1024), budget.peak // (1024 * 1024))
+        finally:
+            # caller berhenti lebih awal: batalkan yang belum jalan
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _process_pool(workers):
+        # import lokal: concurrent.futures.process (+ multiprocessing) hanya perlu di mode
+        # paralel, jadi start-up CLI / konversi serial tidak membayar import-nya
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=workers, **worker_log_config())
+
+    def _convert_parallel(self, input_paths, quality, workers, use_cache=False, **options):
+        """
+        Sebar convert_file ke process pool. Urutan hasil sama dengan urutan input,
+        dan pemindahan ke success/fail tetap dilakukan oleh convert_file di worker.
+        """
+        workers = min(workers, len(input_paths))
+        # chunk kecil supaya overhead IPC rendah tapi beban tetap merata
+        chunksize = max(1, len(input_paths) // (workers * 4))
+        logger.info("convert_all parallel: workers=%d chunksize=%d files=%d",
+                    workers, chunksize, len(input_paths))
+        convert_one = partial(self._convert_one, quality=quality, use_cache=use_cache, **options)
+        summary = MetricsSummary() if self.metrics_hook is not None else None
+        started = time.perf_counter()
+        results = []
+        with self._process_pool(workers) as executor:
+            for filename, success, info, record in executor.map(convert_one, input_paths,
+                                                                 chunksize=chunksize):
+                self._collect_metrics(record, summary)
+                results.append((filename, success, info))
+        self._emit_summary(summary)
+        ok = sum(1 for _, success, _ in results if success)
+        self._log_batch([ok, len(results) - ok], started)
+        return results
+
+    def _log_batch(self, counts, started):
+        """
+        Satu baris agregat per batch, selalu di level INFO, terlepas dari file_log_level.
+        """
+        ok, failed = counts
+        wall = time.perf_counter() - started
+        logger.info("Batch finished: files=%d ok=%d failed=%d wall=%.3fs (%.1f files/s)",
+                    ok + failed, ok, failed, wall, (ok + failed) / wall if wall > 0 else 0.0)
+
+    def _collect_metrics(self, record, summary):
+        if record is None:
+            return
+        self._emit_metrics(record)
+        if summary is not None:
+            summary.add(record)
+
+    def _emit_summary(self, summary):
+        if summary is None:
+            return
+        data = summary.as_dict()
+        logger.info("Metrics summary: files=%d failed=%d cache_hits=%d in=%d out=%d wall=%.3fs",
+                    data["files"], data["failed"], data["cache_hits"], data["input_bytes"],
+                    data["output_bytes"], data["wall_s"])
+        auto = data.get("auto_quality")
+        if auto:
+            logger.info("Auto quality: %d file(s) %d bytes vs %d at fixed quality (saved %d, %.1f%%)",
+                        auto["files"], auto["bytes"], auto["fixed_quality_bytes"],
+                        auto["bytes_saved_vs_fixed"], auto["saved_pct"])
+        self._emit_metrics(data)
+
+    def watch(self, extensions=None, quality=80, use_cache=False, block=True, convert_options=None,
+              **kwargs):
+        """
+        Mode hot-folder: konversi file segera setelah selesai ditulis ke input_dir.
+        Pakai inotify jika tersedia, fallback ke polling berbasis stat.
+        block=True: jalan terus sampai Ctrl+C. block=False: kembalikan watcher
+        yang sudah berjalan (panggil .stop() untuk berhenti).
+        convert_options: dict opsional untuk convert_file (max_width, max_height, ...).
+        kwargs diteruskan ke HotFolderWatcher (settle_time, queue_size, workers,
+        memory_budget, ...).
+        """
+        if extensions is None:
+            extensions = self.DEFAULT_SUPPORTED_EXT
+        from watcher import HotFolderWatcher
+        watcher = HotFolderWatcher(self, extensions=extensions, quality=quality,
+                                   use_cache=use_cache, convert_options=convert_options, **kwargs)
+        if block:
+            watcher.run_forever()
+            return watcher
+        return watcher.start()
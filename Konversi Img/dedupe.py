@@ -0,0 +1,310 @@
+import os
+import logging
+from PIL import Image
+
+logger = logging.getLogger("ImageConverter")
+
+HASH_METHODS = ("dhash", "phash")
+HASH_BITS = 64
+# jarak Hamming maksimal (dari 64 bit) agar dua gambar dianggap re-save yang sama
+DEFAULT_MAX_DISTANCE = 4
+# format sumber tanpa kompresi lossy: diutamakan sebagai representatif grup
+LOSSLESS_EXT = (".png", ".bmp", ".tif", ".tiff")
+# path per task ke worker: hash per gambar sangat murah, overhead IPC per file tidak
+DEFAULT_HASH_BATCH = 256
+_PHASH_SIDE = 32
+# hash dari gambar polos / minim detail (warna rata, teks kecil di latar putih) hampir
+# semua bitnya hasil pembulatan, jadi gambar yang berbeda dapat hash yang sama. Bit
+# dihitung informatif jika selisih di baliknya >= ~2 level abu-abu (dHash: selisih pixel
+# tetangga; pHash: jarak koefisien DCT 32 x 32 ke median). Kurang dari
+# MIN_INFORMATIVE_BITS -> tidak di-hash (tidak pernah dikelompokkan).
+MIN_INFORMATIVE_BITS = 8
+_DHASH_MARGIN = 2
+_PHASH_MARGIN = 32
+# cek kedua sebelum duplikat di-link: rasio aspek dan thumbnail RGB kecil
+THUMB_SIDE = 16
+MAX_ASPECT_DIFF = 0.02
+MAX_THUMB_DIFF = 12
+
+if hasattr(int, "bit_count"):  # Python 3.10+
+    _popcount = int.bit_count
+else:
+    def _popcount(value):
+        return bin(value).count("1")
+_dct_matrix = None
+
+
+def _np():
+    import numpy
+    return numpy
+
+
+def _small_gray(path, width, height):
+    """
+    Decode kecil grayscale: JPEG memakai draft (decode 1/2..1/8 di libjpeg),
+    lalu BOX resize ke width x height. Mengembalikan (pixels, ukuran asli).
+    """
+    with Image.open(path) as img:
+        size = img.size
+        img.draft("L", (width * 4, height * 4))
+        gray = img.convert("L").resize((width, height), getattr(Image, "Resampling", Image).BOX)
+    return gray, size
+
+
+def _pack_bits(bits):
+    """
+    (n, 64) bool -> list int 64-bit (bit pertama = MSB).
+    """
+    np = _np()
+    packed = np.packbits(bits.reshape(len(bits), -1), axis=1)
+    return [int(v) for v in packed.view(">u8").ravel()]
+
+
+def dhash_pixels(pixels):
+    """
+    dHash untuk batch array (n, 8, 9): bit = pixel kiri < pixel kanan, 8 x 8 = 64 bit.
+    """
+    return _pack_bits(pixels[:, :, 1:] > pixels[:, :, :-1])
+
+
+def _dhash_informative(pixels):
+    np = _np()
+    diff = np.abs(np.diff(pixels.astype(np.int16), axis=2))
+    return (diff >= _DHASH_MARGIN).reshape(len(pixels), -1).sum(axis=1)
+
+
+def _dct(side):
+    global _dct_matrix
+    if _dct_matrix is None or _dct_matrix.shape[0] != side:
+        np = _np()
+        k = np.arange(side)[:, None]
+        n = np.arange(side)[None, :]
+        matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * side)) * np.sqrt(2.0 / side)
+        matrix[0] /= np.sqrt(2.0)
+        _dct_matrix = matrix.astype(np.float32)
+    return _dct_matrix
+
+
+def phash_pixels(pixels):
+    """
+    pHash untuk batch array (n, 32, 32): DCT 2D (C @ X @ C.T, satu matmul untuk
+    semua gambar), ambil 8 x 8 frekuensi terendah, bit = koefisien > median
+    (median tanpa komponen DC).
+    """
+    low, median = _phash_low(pixels)
+    return _pack_bits(low > median[:, None])
+
+
+def _phash_low(pixels):
+    np = _np()
+    matrix = _dct(pixels.shape[-1])
+    coeffs = matrix @ pixels.astype(np.float32) @ matrix.T
+    low = coeffs[:, :8, :8].reshape(len(pixels), 64)
+    return low, np.median(low[:, 1:], axis=1)
+
+
+def _phash_informative(pixels):
+    np = _np()
+    low, median = _phash_low(pixels)
+    return (np.abs(low[:, 1:] - median[:, None]) >= _PHASH_MARGIN).sum(axis=1)
+
+
+def hash_files(paths, method="dhash"):
+    """
+    Hash perseptual untuk sekumpulan file. Decode per file, perhitungan bit
+    satu kali untuk seluruh batch. Dipanggil di proses worker.
+    Mengembalikan list (path, hash atau None, pixel, byte); None jika file tidak bisa
+    dibaca atau gambarnya terlalu polos untuk di-hash (lihat MIN_INFORMATIVE_BITS).
+    """
+    if method not in HASH_METHODS:
+        raise ValueError("hash method tidak dikenal: %s (pilih: %s)" % (method, ", ".join(HASH_METHODS)))
+    np = _np()
+    width, height = (9, 8) if method == "dhash" else (_PHASH_SIDE, _PHASH_SIDE)
+    rows = []
+    arrays = []
+    for path in paths:
+        try:
+            gray, (w, h) = _small_gray(path, width, height)
+            arrays.append(np.asarray(gray, dtype=np.uint8))
+            rows.append((path, w * h, os.path.getsize(path)))
+        except Exception as e:
+            logger.warning("Perceptual hash failed for %s: %s", path, e)
+            rows.append((path, 0, 0))
+            arrays.append(None)
+    valid = [a for a in arrays if a is not None]
+    hashes = iter([])
+    if valid:
+        stacked = np.stack(valid)
+        if method == "dhash":
+            values, informative = dhash_pixels(stacked), _dhash_informative(stacked)
+        else:
+            values, informative = phash_pixels(stacked), _phash_informative(stacked)
+        hashes = iter(value if bits >= MIN_INFORMATIVE_BITS else None
+                      for value, bits in zip(values, informative.tolist()))
+    result = []
+    for (path, pixels, size), array in zip(rows, arrays):
+        value = next(hashes) if array is not None else None
+        if array is not None and value is None:
+            logger.debug("Perceptual hash skipped for %s: too little detail", path)
+        result.append((path, value, pixels, size))
+    return result
+
+
+def _thumbnail(path):
+    """
+    (rasio aspek, thumbnail RGB THUMB_SIDE x THUMB_SIDE int16) untuk cek kedua.
+    """
+    np = _np()
+    with Image.open(path) as img:
+        width, height = img.size
+        img.draft("RGB", (THUMB_SIDE * 4, THUMB_SIDE * 4))
+        thumb = img.convert("RGB").resize((THUMB_SIDE, THUMB_SIDE),
+                                          getattr(Image, "Resampling", Image).BOX)
+    return width / float(height), np.asarray(thumb, dtype=np.int16)
+
+
+def confirm_duplicates(pairs):
+    """
+    Cek kedua untuk pasangan (duplikat, representatif) dari hash: rasio aspek
+    berbeda <= MAX_ASPECT_DIFF dan rata-rata selisih thumbnail RGB <= MAX_THUMB_DIFF
+    (menolak warna / isi berbeda yang kebetulan hash-nya dekat). Thumbnail
+    representatif dihitung sekali per batch. Dipanggil di proses worker.
+    Mengembalikan list bool sejajar dengan pairs; False juga jika file tidak bisa dibaca.
+    """
+    cache = {}
+
+    def thumb(path):
+        if path not in cache:
+            cache[path] = _thumbnail(path)
+        return cache[path]
+
+    confirmed = []
+    for dup_path, rep_path in pairs:
+        try:
+            (dup_aspect, dup_thumb), (rep_aspect, rep_thumb) = thumb(dup_path), thumb(rep_path)
+            ok = (abs(dup_aspect - rep_aspect) <= MAX_ASPECT_DIFF * rep_aspect
+                  and float(abs(dup_thumb - rep_thumb).mean()) <= MAX_THUMB_DIFF)
+        except Exception as e:
+            logger.warning("Duplicate check failed for %s: %s", dup_path, e)
+            ok = False
+        if not ok:
+            logger.debug("Not a duplicate after thumbnail check: %s vs %s", dup_path, rep_path)
+        confirmed.append(ok)
+    return confirmed
+
+
+class MultiIndexHash:
+    """
+    Index Hamming untuk hash 64-bit (multi-index hashing). Hash dipecah jadi
+    m = max_distance // 2 + 1 potongan; dua hash dengan jarak <= max_distance
+    pasti punya satu potongan yang berbeda paling banyak 1 bit (pigeonhole).
+    Query cukup mencari potongan yang sama persis + semua varian 1-bit di tiap
+    tabel, lalu verifikasi kandidat dengan popcount. Tidak ada perbandingan
+    semua-ke-semua: biaya query tergantung isi bucket, bukan jumlah hash.
+    """
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE, bits=HASH_BITS):
+        if max_distance < 0:
+            raise ValueError("max_distance harus >= 0")
+        self.max_distance = int(max_distance)
+        self.bits = bits
+        chunks = min(bits, self.max_distance // 2 + 1)
+        # radius per potongan: 0 jika potongan sebanyak jarak + 1, selain itu 1
+        self._radius = 0 if chunks > self.max_distance else 1
+        step, extra = divmod(bits, chunks)
+        self._chunks = []  # (shift, mask, XOR yang di-probe: 0 + semua flip 1-bit jika radius 1)
+        shift = bits
+        for i in range(chunks):
+            width = step + (1 if i < extra else 0)
+            shift -= width
+            flips = [0] + ([1 << b for b in range(width)] if self._radius else [])
+            self._chunks.append((shift, (1 << width) - 1, flips))
+        self._tables = [{} for _ in self._chunks]
+        self._hashes = []
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def add(self, value):
+        """
+        Tambah hash, mengembalikan id (urutan penambahan).
+        """
+        item_id = len(self._hashes)
+        self._hashes.append(value)
+        for table, (shift, mask, _) in zip(self._tables, self._chunks):
+            table.setdefault((value >> shift) & mask, []).append(item_id)
+        return item_id
+
+    def query(self, value):
+        """
+        id semua hash dengan jarak Hamming <= max_distance dari value.
+        """
+        seen = set()
+        found = []
+        hashes = self._hashes
+        limit = self.max_distance
+        for table, (shift, mask, flips) in zip(self._tables, self._chunks):
+            key = (value >> shift) & mask
+            for flip in flips:
+                bucket = table.get(key ^ flip)
+                if bucket is None:
+                    continue
+                for item_id in bucket:
+                    if item_id not in seen:
+                        seen.add(item_id)
+                        if _popcount(hashes[item_id] ^ value) <= limit:
+                            found.append(item_id)
+        return found
+
+
+def group_duplicates(items, max_distance=DEFAULT_MAX_DISTANCE):
+    """
+    Kelompokkan item (path, hash, pixel, byte) yang hash-nya berdekatan
+    (union-find; item yang hash-nya None selalu sendiri). Representatif tiap
+    grup: resolusi terbesar, lalu sumber lossless (png), lalu file terbesar
+    (re-save paling sedikit), lalu nama.
+    Mengembalikan (representatives, duplicates): list path representatif +
+    file tanpa hash (urutan input), dan dict {path duplikat: path representatif}.
+    """
+    index = MultiIndexHash(max_distance)
+    indexed = []  # id di index -> posisi di rows
+    parent = []
+    rows = []
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for row in items:
+        position = len(rows)
+        rows.append(row)
+        parent.append(position)
+        if row[1] is None:
+            continue
+        for other in index.query(row[1]):
+            root, own = find(indexed[other]), find(position)
+            if root != own:
+                parent[own] = root
+        index.add(row[1])
+        indexed.append(position)
+    return _representatives(rows, find)
+
+
+def _representatives(rows, find):
+    best = {}
+    for i, (path, _, pixels, size) in enumerate(rows):
+        root = find(i)
+        key = (pixels, path.lower().endswith(LOSSLESS_EXT), size, os.path.basename(path))
+        if root not in best or key > best[root][0]:
+            best[root] = (key, i)
+    representatives = []
+    duplicates = {}
+    for i, row in enumerate(rows):
+        rep = best[find(i)][1]
+        if rep == i:
+            representatives.append(row[0])
+        else:
+            duplicates[row[0]] = rows[rep][0]
+    return representatives, duplicates
@@ -2,10 +2,16 @@
 import os
 import sys
 import json
+import time
+import queue
+import threading
 import subprocess
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-from converter import ImageConverter, logger
+from tkinter import ttk, messagebox
+from converter import ImageConverter, ENCODER_PRESETS, DEFAULT_PRESET, logger
+from thumbnails import ThumbnailCache, ThumbnailPrefetcher
+from listing import DirectorySnapshot
+from logviewer import LogViewerWindow
 
 CONFIG_PATH = "config.json"
 
@@ -47,22 +53,55 @@ class ConverterApp:
         self.config = load_config()
         self.sash_pos = self.config.get("sash_pos", 980)
         self.quality_default = self.config.get("quality", 80)
-        exts = self.config.get("exts", [".png", ".jpg", ".jpeg"])
+        exts = self.config.get("exts", [".png", ".jpg", ".jpeg", ".gif"])
 
         # converter
         self.converter = ImageConverter()
 
+        # thumbnail cache untuk preview (di disk, LRU dengan batas ukuran)
+        thumb_dir = os.path.join(self.converter.base_media_dir, self.converter.img_folder, ".thumbnails")
+        thumb_budget = int(self.config.get("thumb_cache_mb", 200)) * 1024 * 1024
+        self.thumb_cache = ThumbnailCache(thumb_dir, max_bytes=thumb_budget)
+        self.thumb_prefetcher = ThumbnailPrefetcher(self.thumb_cache)
+        self._preview_photo = None
+        self._preview_path = None
+        self._prefetch_after_id = None
+
+        # snapshot folder input/success/fail di memori (dipakai refresh, search, filter, batch)
+        self._snapshots = {}
+
         # options
         self.ext_png_var = tk.BooleanVar(value=(".png" in exts))
         self.ext_jpg_var = tk.BooleanVar(value=(".jpg" in exts))
         self.ext_jpeg_var = tk.BooleanVar(value=(".jpeg" in exts))
+        self.ext_gif_var = tk.BooleanVar(value=(".gif" in exts))
         self.quality_var = tk.IntVar(value=self.quality_default)
+        # resize (0 = tanpa batas)
+        self.max_width_var = tk.IntVar(value=self.config.get("max_width", 0))
+        self.max_height_var = tk.IntVar(value=self.config.get("max_height", 0))
+        self.fit_var = tk.StringVar(value=self.config.get("fit", "contain"))
+        self.preset_var = tk.StringVar(value=self.config.get("preset", DEFAULT_PRESET))
+        # target ukuran output per file (KB, 0 = pakai quality tetap)
+        self.target_kb_var = tk.IntVar(value=self.config.get("target_kb", 0))
 
         # arrange guards
         self._arrange_after_id = None
         self._arranging = False
         self._last_right_height = 0
 
+        # background batch state (worker thread -> queue -> root.after poll)
+        self._batch_thread = None
+        self._batch_queue = queue.Queue()
+        self._batch_resume = threading.Event()
+        self._batch_cancel = threading.Event()
+        # row model: list [No, Nama File, Ukuran, Path, Status]; Treeview diisi bertahap
+        self._rows = []
+        self._row_by_name = {}
+        self._iid_by_name = {}
+        self._render_generation = 0
+        self._render_after_id = None
+        self._sort_keys = {}
+
         # header
         header = tk.Label(root, text="Image Converter", font=("Arial", 18, "bold"))
         header.pack(pady=8)
@@ -86,7 +125,7 @@ class ConverterApp:
         self.btn_options = tk.Button(options_frame, text=self._options_button_text(), command=self.open_options_dialog)
         self.btn_options.pack(anchor="e")
 
-        # paned window: left tree, right actions (preview removed)
+        # paned window: left tree, right preview + actions
         paned = tk.PanedWindow(root, orient=tk.HORIZONTAL)
         paned.pack(fill="both", expand=True, padx=12, pady=6)
         self.paned = paned
@@ -101,7 +140,8 @@ class ConverterApp:
         self.tree = ttk.Treeview(left_inner, columns=columns, show="headings")
         scroll_y = ttk.Scrollbar(left_inner, orient="vertical", command=self.tree.yview)
         scroll_x = ttk.Scrollbar(left_inner, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+        self.scroll_y = scroll_y
+        self.tree.configure(yscrollcommand=self._on_tree_yscroll, xscrollcommand=scroll_x.set)
 
         for col in columns:
             self.tree.heading(col, text=col, command=lambda _col=col: self.treeview_sort_column(_col, False))
@@ -121,11 +161,17 @@ class ConverterApp:
         self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
         self.tree.bind("<Button-3>", self.on_tree_right_click)
 
-        # right: actions only (preview removed)
+        # right: preview + actions
         right_frame = tk.LabelFrame(paned, text="Preview & Aksi", padx=8, pady=8)
         paned.add(right_frame, minsize=300)
         self.right_frame = right_frame
 
+        self.preview_frame = tk.Frame(right_frame, width=300, height=230)
+        self.preview_frame.pack_propagate(False)
+        self.preview_frame.pack(fill="x")
+        self.preview_label = tk.Label(self.preview_frame, text="(Tidak ada preview)", fg="gray")
+        self.preview_label.pack(fill="both", expand=True)
+
         # context menu
         self.context_menu = tk.Menu(self.root, tearoff=0)
         self.context_menu.add_command(label="Buka File", command=self.context_open_file)
@@ -145,7 +191,7 @@ class ConverterApp:
             return btn
 
         # MAIN PRIORITY BUTTONS (always prioritized)
-        self.btn_refresh = add_action("🔄 Refresh List", self.refresh_list, 0)
+        self.btn_refresh = add_action("🔄 Refresh List", lambda: self.refresh_list(force=True), 0)
         self.btn_convert_selected = add_action("✅ Konversi File Terpilih", self.convert_selected, 1)
         self.btn_batch = add_action("⚙️ Konversi Semua ", self.convert_batch, 2)
         self.btn_show_all = add_action("📂 Kembali ke Tampilan Input", self.refresh_list, 3)
@@ -171,6 +217,12 @@ class ConverterApp:
         self.progress.pack(side="left", padx=(0,8), fill="x", expand=True)
         self.progress_label = tk.Label(progress_frame, text="0%")
         self.progress_label.pack(side="left")
+        self.btn_cancel_batch = tk.Button(progress_frame, text="⛔ Batalkan", width=12,
+                                          command=self.cancel_batch, state="disabled")
+        self.btn_cancel_batch.pack(side="right", padx=(8,0))
+        self.btn_pause_batch = tk.Button(progress_frame, text="⏸ Jeda", width=12,
+                                         command=self.toggle_pause_batch, state="disabled")
+        self.btn_pause_batch.pack(side="right", padx=(8,0))
 
         self.status_path = tk.Label(root, text=f"Input folder: {self.converter.input_dir}", anchor="w", fg="blue")
         self.status_path.pack(fill="x", padx=12)
@@ -191,6 +243,7 @@ class ConverterApp:
 
         # initial populate
         self.refresh_list()
+        self.root.after(100, self._poll_thumbnails)
 
     # sash restore & save
     def _restore_sash(self):
@@ -201,6 +254,9 @@ class ConverterApp:
         self._on_right_frame_configure()
 
     def _on_close(self):
+        self._batch_cancel.set()
+        self._batch_resume.set()
+        self.thumb_prefetcher.stop()
         try:
             x = self.paned.sash_coord(0)[0]
             self.config["sash_pos"] = int(x)
@@ -211,7 +267,13 @@ class ConverterApp:
         if self.ext_png_var.get(): exts.append(".png")
         if self.ext_jpg_var.get(): exts.append(".jpg")
         if self.ext_jpeg_var.get(): exts.append(".jpeg")
+        if self.ext_gif_var.get(): exts.append(".gif")
         self.config["exts"] = exts
+        self.config["max_width"] = self._safe_int(self.max_width_var)
+        self.config["max_height"] = self._safe_int(self.max_height_var)
+        self.config["fit"] = self.fit_var.get()
+        self.config["preset"] = self.preset_var.get()
+        self.config["target_kb"] = self._safe_int(self.target_kb_var)
         save_config(self.config)
         try:
             self.root.destroy()
@@ -220,6 +282,8 @@ class ConverterApp:
 
     def on_close(self):
         try:
+            self._batch_cancel.set()
+            self._batch_resume.set()
             self._on_close()
         except Exception:
             try:
@@ -266,8 +330,10 @@ class ConverterApp:
                 pass
 
             total_h = max(0, self.right_frame.winfo_height())
-            # preview removed => preview_h = 0
-            preview_h = 0
+            try:
+                preview_h = self.preview_frame.winfo_height()
+            except Exception:
+                preview_h = 0
             padding = 20
             available_h = max(0, total_h - preview_h - padding)
 
@@ -354,9 +420,36 @@ class ConverterApp:
             exts.append(".jpg")
         if getattr(self, "ext_jpeg_var", None) and self.ext_jpeg_var.get():
             exts.append(".jpeg")
+        if getattr(self, "ext_gif_var", None) and self.ext_gif_var.get():
+            exts.append(".gif")
         q = getattr(self, "quality_var", None).get() if getattr(self, "quality_var", None) else 80
         exts_text = ",".join(exts) if exts else "none"
-        return f"Pengaturan ({exts_text}) Q={q}"
+        text = f"Pengaturan ({exts_text}) Q={q}"
+        if getattr(self, "max_width_var", None) is not None:
+            w = self._safe_int(self.max_width_var)
+            h = self._safe_int(self.max_height_var)
+            if w or h:
+                text += f" Max={w or '-'}x{h or '-'}"
+        if getattr(self, "target_kb_var", None) is not None and self._safe_int(self.target_kb_var):
+            text += f" <={self._safe_int(self.target_kb_var)}KB"
+        return text
+
+    @staticmethod
+    def _safe_int(var):
+        try:
+            return max(0, int(var.get()))
+        except (tk.TclError, ValueError):
+            return 0
+
+    def _convert_options(self):
+        # opsi tambahan untuk converter.convert_file
+        return {
+            "max_width": self._safe_int(self.max_width_var) or None,
+            "max_height": self._safe_int(self.max_height_var) or None,
+            "fit": self.fit_var.get() or "contain",
+            "preset": self.preset_var.get() or DEFAULT_PRESET,
+            "target_size": self._safe_int(self.target_kb_var) * 1024 or None,
+        }
 
     def _center_popup(self, win, w, h):
         root_x = self.root.winfo_rootx()
@@ -379,7 +472,7 @@ class ConverterApp:
         dlg.title("Pengaturan Konversi")
         dlg.transient(self.root)
         dlg.resizable(False, False)
-        self._center_popup(dlg, 420, 260)
+        self._center_popup(dlg, 420, 495)
         dlg.grab_set()
 
         frame = tk.Frame(dlg, padx=12, pady=12)
@@ -389,23 +482,54 @@ class ConverterApp:
         cb_png = tk.Checkbutton(frame, text=".png", variable=self.ext_png_var)
         cb_jpg = tk.Checkbutton(frame, text=".jpg", variable=self.ext_jpg_var)
         cb_jpeg = tk.Checkbutton(frame, text=".jpeg", variable=self.ext_jpeg_var)
+        cb_gif = tk.Checkbutton(frame, text=".gif (animasi -> WebP animasi)", variable=self.ext_gif_var)
         cb_png.pack(anchor="w", pady=2)
         cb_jpg.pack(anchor="w", pady=2)
         cb_jpeg.pack(anchor="w", pady=2)
+        cb_gif.pack(anchor="w", pady=2)
 
         tk.Label(frame, text="Kualitas WebP (0-100):").pack(anchor="w", pady=(8,0))
         quality_scale = tk.Scale(frame, from_=0, to=100, orient="horizontal", variable=self.quality_var, length=360)
         quality_scale.pack(anchor="w", pady=4)
 
+        tk.Label(frame, text="Ukuran maksimum (px, 0 = tanpa batas):").pack(anchor="w", pady=(8,0))
+        size_frame = tk.Frame(frame)
+        size_frame.pack(anchor="w", pady=4)
+        tk.Label(size_frame, text="Lebar").pack(side="left")
+        tk.Spinbox(size_frame, from_=0, to=20000, increment=10, width=7,
+                   textvariable=self.max_width_var).pack(side="left", padx=(4,12))
+        tk.Label(size_frame, text="Tinggi").pack(side="left")
+        tk.Spinbox(size_frame, from_=0, to=20000, increment=10, width=7,
+                   textvariable=self.max_height_var).pack(side="left", padx=(4,12))
+        tk.Label(size_frame, text="Fit").pack(side="left")
+        ttk.Combobox(size_frame, textvariable=self.fit_var, values=("contain", "cover"),
+                     state="readonly", width=8).pack(side="left", padx=4)
+
+        preset_frame = tk.Frame(frame)
+        preset_frame.pack(anchor="w", pady=(8,0))
+        tk.Label(preset_frame, text="Preset encoder:").pack(side="left")
+        ttk.Combobox(preset_frame, textvariable=self.preset_var, values=tuple(ENCODER_PRESETS),
+                     state="readonly", width=10).pack(side="left", padx=6)
+
+        target_frame = tk.Frame(frame)
+        target_frame.pack(anchor="w", pady=(8,0))
+        tk.Label(target_frame, text="Target ukuran per file (KB, 0 = nonaktif):").pack(side="left")
+        tk.Spinbox(target_frame, from_=0, to=100000, increment=10, width=7,
+                   textvariable=self.target_kb_var).pack(side="left", padx=6)
+
         btn_frame = tk.Frame(frame)
         btn_frame.pack(fill="x", pady=(12,0))
         def on_ok():
-            if not (self.ext_png_var.get() or self.ext_jpg_var.get() or self.ext_jpeg_var.get()):
+            if not (self.ext_png_var.get() or self.ext_jpg_var.get() or self.ext_jpeg_var.get()
+                    or self.ext_gif_var.get()):
                 messagebox.showwarning("Peringatan", "Pilih minimal satu ekstensi untuk dikonversi.", parent=dlg)
                 return
             self.btn_options.config(text=self._options_button_text())
-            logger.info("Options updated: png=%s jpg=%s jpeg=%s quality=%s",
-                        self.ext_png_var.get(), self.ext_jpg_var.get(), self.ext_jpeg_var.get(), self.quality_var.get())
+            logger.info("Options updated: png=%s jpg=%s jpeg=%s gif=%s quality=%s max=%sx%s fit=%s preset=%s target_kb=%s",
+                        self.ext_png_var.get(), self.ext_jpg_var.get(), self.ext_jpeg_var.get(),
+                        self.ext_gif_var.get(), self.quality_var.get(),
+                        self._safe_int(self.max_width_var), self._safe_int(self.max_height_var), self.fit_var.get(),
+                        self.preset_var.get(), self._safe_int(self.target_kb_var))
             dlg.destroy()
             self._on_right_frame_configure()
 
@@ -420,12 +544,13 @@ class ConverterApp:
         dlg.wait_window()
 
     # file listing & refresh
-    def refresh_list(self):
-        logger.info("Action: refresh_list")
+    def refresh_list(self, force=False):
+        # force: tombol Refresh, stat ulang semua file (mis. file diganti isinya di tempat)
+        logger.info("Action: refresh_list force=%s", force)
         self.view_mode = "all"
         self.search_keyword = ""
-        self._populate_from_input()
-        count = len(self.tree.get_children())
+        self._populate_from_input(force)
+        count = len(self._rows)
         self.status.config(text=f"{count} file ditemukan di folder input")
         self.status_path.config(text=f"Input folder: {self.converter.input_dir}")
         self.progress["value"] = 0
@@ -433,27 +558,136 @@ class ConverterApp:
         self.btn_options.config(text=self._options_button_text())
         self._on_right_frame_configure()
 
-    def _populate_from_input(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        try:
-            files = [f for f in os.listdir(self.converter.input_dir) if f.lower().endswith(self.converter.DEFAULT_SUPPORTED_EXT)]
-        except FileNotFoundError:
-            files = []
-        for i, filename in enumerate(sorted(files), start=1):
-            file_path = os.path.join(self.converter.input_dir, filename)
-            size_kb = max(1, os.path.getsize(file_path) // 1024) if os.path.exists(file_path) else 0
-            self.tree.insert("", "end", values=(i, filename, size_kb, file_path, "Belum"))
-
-    # selection (preview removed)
+    def _snapshot(self, folder, force=False):
+        """
+        Snapshot untuk folder (dibuat saat pertama dipakai) yang sudah disinkronkan;
+        scan ulang hanya terjadi jika mtime folder berubah (atau force).
+        """
+        snap = self._snapshots.get(folder)
+        if snap is None:
+            snap = DirectorySnapshot(folder, self.converter.DEFAULT_SUPPORTED_EXT)
+            self._snapshots[folder] = snap
+        snap.refresh(force=force)
+        return snap
+
+    def _populate_from_input(self, force=False):
+        entries = self._snapshot(self.converter.input_dir, force).entries()
+        self._set_rows(self._make_rows(entries, "Belum"))
+
+    @staticmethod
+    def _make_rows(entries, status_label):
+        return [[i, e.name, max(1, e.size // 1024), e.path, status_label]
+                for i, e in enumerate(entries, start=1)]
+
+    def _set_rows(self, rows):
+        """
+        Ganti isi Treeview dengan 'rows'. Baris pertama langsung tampil, sisanya
+        di-insert bertahap lewat after() supaya UI tetap responsif di folder besar.
+        """
+        self._rows = rows
+        self._row_by_name = {row[1]: row for row in rows}
+        self._sort_keys = {}
+        self._render_rows()
+
+    def _render_rows(self):
+        self._iid_by_name = {}
+        self._render_generation += 1
+        if self._render_after_id:
+            try:
+                self.root.after_cancel(self._render_after_id)
+            except Exception:
+                pass
+            self._render_after_id = None
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self._render_chunk(self._render_generation, 0)
+        self._schedule_prefetch()
+
+    def _render_chunk(self, generation, start, budget_s=0.015):
+        if generation != self._render_generation:
+            return
+        rows = self._rows
+        deadline = time.perf_counter() + budget_s
+        i = start
+        while i < len(rows):
+            row = rows[i]
+            self._iid_by_name[row[1]] = self.tree.insert("", "end", values=row)
+            i += 1
+            if i % 64 == 0 and time.perf_counter() > deadline:
+                break
+        if i < len(rows):
+            self._render_after_id = self.root.after(1, self._render_chunk, generation, i)
+        else:
+            self._render_after_id = None
+
+    # selection + preview
     def on_tree_select(self, event):
         sel = self.tree.selection()
         if not sel:
             self.status.config(text="Ready")
+            self._show_preview(None)
             return
         item = self.tree.item(sel[0])
         filename = item["values"][1] if len(item["values"]) > 1 else ""
         self.status.config(text=f"File terpilih: {filename}")
+        path = item["values"][3] if len(item["values"]) > 3 else None
+        self._preview_path = path
+        thumb = self.thumb_cache.lookup(path) if path else None
+        if thumb:
+            self._show_preview(thumb)
+        elif path:
+            self.preview_label.config(image="", text="Memuat preview...")
+            self.thumb_prefetcher.request(path)
+
+    def _show_preview(self, thumb_path):
+        if not thumb_path:
+            self._preview_photo = None
+            self.preview_label.config(image="", text="(Tidak ada preview)")
+            return
+        try:
+            self._preview_photo = tk.PhotoImage(file=thumb_path)
+            self.preview_label.config(image=self._preview_photo, text="")
+        except tk.TclError as e:
+            logger.warning("Failed to show preview %s: %s", thumb_path, e)
+            self._show_preview(None)
+
+    def _poll_thumbnails(self):
+        for path, thumb in self.thumb_prefetcher.poll_results():
+            if path == self._preview_path:
+                self._show_preview(thumb)
+        try:
+            self.root.after(100, self._poll_thumbnails)
+        except tk.TclError:
+            pass
+
+    def _on_tree_yscroll(self, first, last):
+        self.scroll_y.set(first, last)
+        self._schedule_prefetch()
+
+    def _schedule_prefetch(self):
+        # debounce: buat thumbnail untuk baris yang terlihat setelah scroll berhenti
+        if self._prefetch_after_id:
+            try:
+                self.root.after_cancel(self._prefetch_after_id)
+            except Exception:
+                pass
+        self._prefetch_after_id = self.root.after(150, self._prefetch_visible)
+
+    def _prefetch_visible(self):
+        self._prefetch_after_id = None
+        children = self.tree.get_children()
+        if not children:
+            return
+        first, last = self.tree.yview()
+        start = max(0, int(first * len(children)))
+        end = min(len(children), int(last * len(children)) + 1)
+        paths = []
+        for iid in children[start:end]:
+            values = self.tree.item(iid)["values"]
+            if len(values) > 3:
+                paths.append(values[3])
+        self.thumb_prefetcher.prefetch(paths)
 
     # context menu handlers
     def on_tree_right_click(self, event):
@@ -550,6 +784,8 @@ class ConverterApp:
             exts.append(".jpg")
         if self.ext_jpeg_var.get():
             exts.append(".jpeg")
+        if self.ext_gif_var.get():
+            exts.append(".gif")
         return tuple(exts) if exts else None
 
     def convert_selected(self):
@@ -577,7 +813,7 @@ class ConverterApp:
             logger.warning("convert_selected: file not found %s", input_path)
             return
 
-        success, info = self.converter.convert_file(input_path, quality=quality)
+        success, info = self.converter.convert_file(input_path, quality=quality, **self._convert_options())
         if success:
             messagebox.showinfo("Sukses", f"File berhasil dikonversi ke:\n{info}")
             self.update_status(filename, "Berhasil")
@@ -594,17 +830,20 @@ class ConverterApp:
 
     def convert_batch(self):
         logger.info("Action: convert_batch started")
+        if self._batch_thread is not None and self._batch_thread.is_alive():
+            messagebox.showinfo("Info", "Batch konversi masih berjalan.")
+            return
         selected_exts = self._selected_extensions()
         if selected_exts is None:
             messagebox.showwarning("Peringatan", "Pilih minimal satu ekstensi untuk dikonversi (Pengaturan).")
             return
         quality = int(self.quality_var.get())
 
-        try:
-            files = [f for f in os.listdir(self.converter.input_dir) if f.lower().endswith(selected_exts)]
-        except FileNotFoundError:
-            files = []
-        files = sorted(files)
+        # urutan nama (sama dengan daftar di Treeview). Opsi schedule ("largest"/"cost")
+        # sengaja tidak dipakai: batch GUI serial (satu convert_file per waktu), jadi total
+        # waktu = jumlah waktu per file apa pun urutannya; seperti convert_all dengan
+        # workers=1, mengurutkan ulang hanya membuat progress melompat-lompat di daftar.
+        files = [e.name for e in self._snapshot(self.converter.input_dir).entries(selected_exts)]
         total = len(files)
         if total == 0:
             messagebox.showinfo("Info", "Tidak ada file yang cocok dengan ekstensi terpilih di folder input.")
@@ -614,36 +853,131 @@ class ConverterApp:
         self.progress["maximum"] = total
         self.progress["value"] = 0
         self.progress_label.config(text="0%")
-        sukses, gagal = 0, 0
 
         if self.view_mode != "all":
             self._populate_from_input()
             self.view_mode = "all"
 
+        # reset kontrol batch lalu jalankan worker di background
+        self._batch_cancel.clear()
+        self._batch_resume.set()
+        self._batch_queue = queue.Queue()
+        self._set_batch_controls(running=True)
+        self.status.config(text=f"Batch berjalan: 0/{total}")
+        self._batch_thread = threading.Thread(target=self._batch_worker,
+                                              args=(files, quality, self._batch_queue,
+                                                    self._convert_options()),
+                                              daemon=True)
+        self._batch_thread.start()
+        self.root.after(50, self._poll_batch_queue, total)
+
+    def _batch_worker(self, files, quality, out_queue, options):
+        """
+        Jalan di thread background: tidak boleh menyentuh widget Tk.
+        Semua hasil dikirim ke UI lewat out_queue.
+        """
+        sukses, gagal = 0, 0
+        cancelled = False
         for i, filename in enumerate(files, start=1):
+            self._batch_resume.wait()
+            if self._batch_cancel.is_set():
+                cancelled = True
+                break
             input_path = os.path.join(self.converter.input_dir, filename)
             try:
-                success, _ = self.converter.convert_file(input_path, quality=quality)
+                success, _ = self.converter.convert_file(input_path, quality=quality, **options)
             except Exception:
                 success = False
-
             if success:
                 sukses += 1
-                self.update_status(filename, "Berhasil")
             else:
                 gagal += 1
-                self.update_status(filename, "Gagal")
+            out_queue.put(("file", i, filename, success))
+        out_queue.put(("done", sukses, gagal, cancelled))
+
+    def _poll_batch_queue(self, total, max_messages=500):
+        # batasi jumlah pesan per tick supaya event loop Tk tetap responsif
+        done_msg = None
+        last_i = None
+        try:
+            for _ in range(max_messages):
+                msg = self._batch_queue.get_nowait()
+                if msg[0] == "file":
+                    _, last_i, filename, success = msg
+                    self.update_status(filename, "Berhasil" if success else "Gagal")
+                    # file sudah dipindah dari input ke success/fail; snapshot tidak perlu
+                    # menunggu scan ulang (scan berikutnya memakai entri ini tanpa stat lagi)
+                    input_snap = self._snapshots.get(self.converter.input_dir)
+                    if input_snap is not None:
+                        input_snap.note_removed(filename)
+                    dest = self.converter.success_dir if success else self.converter.fail_dir
+                    dest_snap = self._snapshots.get(dest)
+                    if dest_snap is not None:
+                        dest_snap.note_added(os.path.join(dest, filename))
+                elif msg[0] == "done":
+                    done_msg = msg
+                    break
+        except queue.Empty:
+            pass
 
-            self.progress["value"] = i
-            percent = int((i / total) * 100)
+        if last_i is not None:
+            self.progress["value"] = last_i
+            percent = int((last_i / total) * 100)
             self.progress_label.config(text=f"{percent}%")
-            self.root.update_idletasks()
+            if not self._batch_cancel.is_set():
+                state = "dijeda" if not self._batch_resume.is_set() else "berjalan"
+                self.status.config(text=f"Batch {state}: {last_i}/{total}")
 
-        logger.info("Action: convert_batch finished. success=%d fail=%d", sukses, gagal)
-        messagebox.showinfo("Hasil Batch", f"Berhasil: {sukses}\nGagal: {gagal}")
-        self.status.config(text=f"Batch selesai: {sukses} berhasil, {gagal} gagal")
+        if done_msg is None:
+            self.root.after(50, self._poll_batch_queue, total)
+            return
+        self._finish_batch(*done_msg[1:])
+
+    def _finish_batch(self, sukses, gagal, cancelled):
+        self._set_batch_controls(running=False)
+        if cancelled:
+            logger.info("Action: convert_batch cancelled. success=%d fail=%d", sukses, gagal)
+            messagebox.showinfo("Batch Dibatalkan", f"Berhasil: {sukses}\nGagal: {gagal}")
+            self.status.config(text=f"Batch dibatalkan: {sukses} berhasil, {gagal} gagal")
+        else:
+            logger.info("Action: convert_batch finished. success=%d fail=%d", sukses, gagal)
+            messagebox.showinfo("Hasil Batch", f"Berhasil: {sukses}\nGagal: {gagal}")
+            self.status.config(text=f"Batch selesai: {sukses} berhasil, {gagal} gagal")
         self._populate_from_input()
 
+    def _set_batch_controls(self, running):
+        busy = "disabled" if running else "normal"
+        idle = "normal" if running else "disabled"
+        self.btn_batch.config(state=busy)
+        self.btn_convert_selected.config(state=busy)
+        self.btn_pause_batch.config(state=idle, text="⏸ Jeda")
+        self.btn_cancel_batch.config(state=idle)
+
+    def toggle_pause_batch(self):
+        if self._batch_thread is None or not self._batch_thread.is_alive():
+            return
+        if self._batch_resume.is_set():
+            self._batch_resume.clear()
+            self.btn_pause_batch.config(text="▶ Lanjut")
+            self.status.config(text="Batch dijeda")
+            logger.info("Action: convert_batch paused")
+        else:
+            self._batch_resume.set()
+            self.btn_pause_batch.config(text="⏸ Jeda")
+            self.status.config(text="Batch dilanjutkan")
+            logger.info("Action: convert_batch resumed")
+
+    def cancel_batch(self):
+        if self._batch_thread is None or not self._batch_thread.is_alive():
+            return
+        logger.info("Action: convert_batch cancel requested")
+        self._batch_cancel.set()
+        # bangunkan worker kalau sedang dijeda
+        self._batch_resume.set()
+        self.btn_pause_batch.config(state="disabled")
+        self.btn_cancel_batch.config(state="disabled")
+        self.status.config(text="Membatalkan batch...")
+
     # filters, search, sort, log
     def show_success(self):
         logger.info("Action: show_success")
@@ -656,16 +990,11 @@ class ConverterApp:
         self._filter_by_status_folder(self.converter.fail_dir, "Gagal")
 
     def _filter_by_status_folder(self, folder, status_label):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
         if not os.path.exists(folder):
             os.makedirs(folder, exist_ok=True)
-        files = [f for f in os.listdir(folder) if f.lower().endswith(self.converter.DEFAULT_SUPPORTED_EXT)]
-        for i, filename in enumerate(sorted(files), start=1):
-            file_path = os.path.join(folder, filename)
-            size_kb = max(1, os.path.getsize(file_path) // 1024)
-            self.tree.insert("", "end", values=(i, filename, size_kb, file_path, status_label))
-        self.status.config(text=f"Menampilkan {len(files)} file dengan status {status_label}")
+        entries = self._snapshot(folder).entries()
+        self._set_rows(self._make_rows(entries, status_label))
+        self.status.config(text=f"Menampilkan {len(entries)} file dengan status {status_label}")
         self.status_path.config(text=f"Folder: {folder}")
         self.progress["value"] = 0
         self.progress_label.config(text="0%")
@@ -678,56 +1007,51 @@ class ConverterApp:
             return
         self.view_mode = "search"
         self.search_keyword = keyword
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        try:
-            files = [f for f in os.listdir(self.converter.input_dir) if f.lower().endswith(self.converter.DEFAULT_SUPPORTED_EXT)]
-        except FileNotFoundError:
-            files = []
-        matched = [f for f in files if keyword in f.lower()]
-        for i, filename in enumerate(sorted(matched), start=1):
-            file_path = os.path.join(self.converter.input_dir, filename)
-            size_kb = max(1, os.path.getsize(file_path) // 1024)
-            self.tree.insert("", "end", values=(i, filename, size_kb, file_path, "Belum"))
+        snap = self._snapshot(self.converter.input_dir)
+        # "awalan*": cari berdasarkan awal nama (index prefix), selain itu substring
+        if keyword.endswith("*") and "*" not in keyword[:-1]:
+            matched = snap.prefix_search(keyword[:-1])
+        else:
+            matched = snap.search(keyword)
+        self._set_rows(self._make_rows(matched, "Belum"))
         self.status.config(text=f"{len(matched)} hasil pencarian untuk '{self.search_var.get()}'")
         self.status_path.config(text=f"Input folder: {self.converter.input_dir}")
         self.progress["value"] = 0
         self.progress_label.config(text="0%")
 
+    # index kolom di row model + apakah kolom numerik
+    _COLUMN_INDEX = {"No": (0, True), "Nama File": (1, False), "Ukuran": (2, True),
+                     "Path": (3, False), "Status": (4, False)}
+
+    def _column_sort_keys(self, col):
+        """
+        Key sort per baris (dihitung sekali per kolom per listing): int untuk
+        kolom angka, string lowercase untuk kolom teks. Di-key dengan nama file.
+        """
+        keys = self._sort_keys.get(col)
+        if keys is None:
+            idx, numeric = self._COLUMN_INDEX[col]
+            if numeric:
+                keys = {row[1]: row[idx] for row in self._rows}
+            else:
+                keys = {row[1]: str(row[idx]).lower() for row in self._rows}
+            # status bisa berubah selama batch, jadi jangan di-cache
+            if col != "Status":
+                self._sort_keys[col] = keys
+        return keys
+
     def treeview_sort_column(self, col, reverse):
         logger.debug("Sorting column: %s reverse=%s", col, reverse)
-        data_list = [(self.tree.set(k, col), k) for k in self.tree.get_children('')]
-        if col in ("No", "Ukuran"):
-            def try_num(x):
-                try:
-                    return int(x)
-                except Exception:
-                    try:
-                        return float(x)
-                    except Exception:
-                        return 0
-            data_list.sort(key=lambda t: try_num(t[0]), reverse=reverse)
-        else:
-            data_list.sort(key=lambda t: t[0].lower(), reverse=reverse)
-        for index, (val, k) in enumerate(data_list):
-            self.tree.move(k, '', index)
+        keys = self._column_sort_keys(col)
+        self._rows.sort(key=lambda row: keys[row[1]], reverse=reverse)
+        self._render_rows()
         self.tree.heading(col, command=lambda: self.treeview_sort_column(col, not reverse))
 
     def open_log_window(self):
         logger.info("Action: open_log_window")
         log_path = os.path.join(os.path.abspath("."), "app.log")
-        win = tk.Toplevel(self.root)
-        win.title("Log Viewer")
-        win.geometry("900x600")
-        txt = scrolledtext.ScrolledText(win, wrap=tk.WORD, state="normal")
-        txt.pack(fill="both", expand=True)
-        try:
-            with open(log_path, "r", encoding="utf-8") as f:
-                content = f.read()
-        except FileNotFoundError:
-            content = "Log file tidak ditemukan."
-        txt.insert("1.0", content)
-        txt.configure(state="disabled")
+        # hanya halaman terakhir yang dibaca; sisanya lewat navigasi halaman/filter
+        LogViewerWindow(self.root, log_path)
 
     def clear_log(self):
         if not messagebox.askyesno("Hapus Log", "Yakin ingin mengosongkan file log?"):
@@ -746,8 +1070,11 @@ class ConverterApp:
 
     # update status cell
     def update_status(self, filename, status_text):
-        for item in self.tree.get_children():
-            values = self.tree.item(item)["values"]
-            if len(values) >= 2 and values[1] == filename:
-                self.tree.item(item, values=(values[0], values[1], values[2], values[3], status_text))
-                break
+        # update model dulu; baris yang belum ter-insert akan memakai status baru
+        row = self._row_by_name.get(filename)
+        if row is None:
+            return
+        row[4] = status_text
+        iid = self._iid_by_name.get(filename)
+        if iid is not None and self.tree.exists(iid):
+            self.tree.set(iid, "Status", status_text)
@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import logging
+
+logger = logging.getLogger("ImageConverter")
+
+# record di-buffer lalu ditulis + fsync sekali per kelompok (group commit)
+DEFAULT_FLUSH_RECORDS = 256
+DEFAULT_FLUSH_SECONDS = 1.0
+
+
+class JournalState:
+    """
+    Isi journal setelah di-replay: settings batch, daftar file terencana (urutan
+    asli), pemetaan duplikat -> representatif (dedupe), file yang sudah mulai
+    dikerjakan, dan hasil file yang sudah selesai.
+    """
+    __slots__ = ("input_dir", "settings", "planned", "duplicates", "started", "done", "complete")
+
+    def __init__(self):
+        self.input_dir = None
+        self.settings = {}
+        self.planned = []
+        self.duplicates = {}
+        self.started = set()
+        self.done = {}
+        self.complete = False
+
+    @property
+    def pending(self):
+        return [name for name in self.planned if name not in self.done]
+
+
+class BatchJournal:
+    """
+    Write-ahead journal batch convert_all (JSON lines, append-only):
+    plan (semua file + settings, langsung di-fsync sebelum file pertama dikerjakan),
+    start/done per file, dan end saat batch selesai.
+    Record start/done di-buffer dan di-fsync per flush_records record atau
+    flush_seconds detik, jadi journal bukan fsync per file. Record yang hilang
+    saat crash tidak berbahaya: output ditulis ke nama sementara lalu di-rename,
+    dan resume memverifikasi ulang semua file yang belum tercatat selesai.
+    """
+
+    def __init__(self, path, flush_records=DEFAULT_FLUSH_RECORDS, flush_seconds=DEFAULT_FLUSH_SECONDS):
+        self.path = path
+        self.flush_records = max(1, int(flush_records))
+        self.flush_seconds = flush_seconds
+        self.fsyncs = 0
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def create(cls, path, input_dir, names, settings, duplicates=None, **kwargs):
+        """
+        Journal baru berisi rencana batch. Gagal jika masih ada batch yang belum selesai.
+        duplicates: {nama duplikat: nama representatif} dari dedupe; duplikat ikut
+        di names dan diselesaikan setelah representatifnya.
+        """
+        if os.path.exists(path) and not cls.load(path).complete:
+            raise RuntimeError("Batch sebelumnya belum selesai (%s): jalankan resume_batch() dulu" % path)
+        plan = {"op": "plan", "input_dir": input_dir, "settings": settings, "items": list(names)}
+        if duplicates:
+            plan["duplicates"] = dict(duplicates)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(plan, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return cls(path, **kwargs)
+
+    @staticmethod
+    def load(path):
+        """
+        Replay journal. Baris terakhir yang terpotong (crash saat menulis) diabaikan.
+        """
+        state = JournalState()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping torn journal line in %s", path)
+                    continue
+                op = record.get("op")
+                if op == "plan":
+                    state.input_dir = record.get("input_dir")
+                    state.settings = record.get("settings", {})
+                    state.planned = record.get("items", [])
+                    state.duplicates = record.get("duplicates", {})
+                elif op == "start":
+                    state.started.add(record["file"])
+                elif op == "done":
+                    state.done[record["file"]] = record.get("ok", False)
+                elif op == "end":
+                    state.complete = True
+        return state
+
+    def started(self, name):
+        self._append({"op": "start", "file": name})
+
+    def finished(self, name, success):
+        self._append({"op": "done", "file": name, "ok": bool(success)})
+
+    def _append(self, record):
+        self._buffer.append(json.dumps(record, separators=(",", ":")) + "\n")
+        if (len(self._buffer) >= self.flush_records
+                or time.monotonic() - self._last_flush >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write("".join(self._buffer))
+            self._buffer = []
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.fsyncs += 1
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def complete(self):
+        """
+        Tandai batch selesai lalu hapus journal.
+        """
+        self._append({"op": "end"})
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            logger.exception("Failed to remove journal %s", self.path)
@@ -0,0 +1,218 @@
+import os
+import bisect
+import threading
+from collections import namedtuple
+
+# Satu entri file hasil scan folder
+FileEntry = namedtuple("FileEntry", ("name", "size", "path", "ext"))
+
+
+def _entry_from_dirent(entry):
+    return FileEntry(entry.name, entry.stat().st_size, entry.path,
+                     os.path.splitext(entry.name)[1].lower())
+
+
+if os.name == "nt":
+    # Windows: DirEntry.stat() sudah terisi dari FindNextFile (tanpa syscall tambahan)
+    def _dirent_stamp(entry):
+        st = entry.stat()
+        return st.st_size, st.st_mtime_ns
+
+    def _stat_stamp(st):
+        return st.st_size, st.st_mtime_ns
+else:
+    # POSIX: inode ikut dari readdir, jadi file yang diganti (nama sama, inode baru)
+    # terdeteksi tanpa stat per file
+    def _dirent_stamp(entry):
+        return entry.inode()
+
+    def _stat_stamp(st):
+        return st.st_ino
+
+
+def _trigrams(name):
+    return {name[i:i + 3] for i in range(len(name) - 2)}
+
+
+class DirectorySnapshot:
+    """
+    Snapshot isi satu folder di memori (nama, ukuran, ekstensi per file).
+
+    refresh() hanya men-scan ulang jika mtime folder berubah. Saat scan ulang entri
+    yang sudah dikenal dipakai ulang tanpa stat selama identitasnya sama (inode di
+    POSIX, ukuran + mtime di Windows, keduanya gratis dari scandir); file yang
+    diganti dengan nama sama dibaca ulang. refresh(force=True) men-stat semua file.
+    note_added() / note_removed() dipakai untuk hasil batch GUI (file pindah dari
+    input ke success/fail) tanpa menunggu scan. Index pencarian di memori:
+    - prefix: bisect pada daftar nama lowercase terurut
+    - substring: inverted index trigram -> nama (irisan posting list, lalu
+      verifikasi). Dibangun saat search() pertama, lalu diperbarui per file oleh
+      refresh/note_added/note_removed. Keyword < 3 karakter disaring langsung.
+    """
+
+    def __init__(self, folder, extensions):
+        self.folder = folder
+        self.extensions = tuple(extensions)
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._stamps = {}
+        self._dir_mtime = None
+        self._index_dirty = True
+        self._sorted = []
+        self._lower_names = []
+        self._prefix_keys = []
+        self._prefix_ids = []
+        self._grams = None
+
+    def refresh(self, force=False):
+        """
+        Sinkronkan snapshot dengan folder. Mengembalikan True jika ada scan ulang.
+        """
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except FileNotFoundError:
+            with self._lock:
+                changed = bool(self._entries)
+                self._entries = {}
+                self._stamps = {}
+                self._grams = None
+                self._dir_mtime = None
+                self._index_dirty = self._index_dirty or changed
+            return changed
+        with self._lock:
+            if not force and mtime == self._dir_mtime:
+                return False
+            known, known_stamps = self._entries, self._stamps
+            fresh, stamps = {}, {}
+            with os.scandir(self.folder) as it:
+                for entry in it:
+                    name = entry.name
+                    if not name.lower().endswith(self.extensions):
+                        continue
+                    try:
+                        stamp = _dirent_stamp(entry)
+                        old = known.get(name)
+                        if old is not None and not force and known_stamps.get(name) == stamp:
+                            fresh[name] = old
+                        elif entry.is_file():
+                            fresh[name] = _entry_from_dirent(entry)
+                        else:
+                            continue
+                        stamps[name] = stamp
+                    except OSError:
+                        continue
+            if self._grams is not None:
+                for name in known.keys() - fresh.keys():
+                    self._drop_grams(name)
+                for name in fresh.keys() - known.keys():
+                    self._add_grams(name)
+            self._entries = fresh
+            self._stamps = stamps
+            self._dir_mtime = mtime
+            self._index_dirty = True
+            return True
+
+    def note_added(self, path):
+        name = os.path.basename(path)
+        if not name.lower().endswith(self.extensions):
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._grams is not None and name not in self._entries:
+                self._add_grams(name)
+            self._entries[name] = FileEntry(name, st.st_size, os.path.join(self.folder, name),
+                                            os.path.splitext(name)[1].lower())
+            self._stamps[name] = _stat_stamp(st)
+            self._index_dirty = True
+
+    def note_removed(self, name):
+        with self._lock:
+            self._stamps.pop(name, None)
+            if self._entries.pop(name, None) is not None:
+                self._index_dirty = True
+                if self._grams is not None:
+                    self._drop_grams(name)
+
+    def _ensure_index(self):
+        if not self._index_dirty:
+            return
+        self._sorted = sorted(self._entries.values(), key=lambda e: e.name)
+        self._lower_names = [e.name.lower() for e in self._sorted]
+        # urutan nama lowercase bisa beda dengan urutan nama asli (huruf besar dulu)
+        order = sorted(range(len(self._lower_names)), key=self._lower_names.__getitem__)
+        self._prefix_keys = [self._lower_names[i] for i in order]
+        self._prefix_ids = order
+        self._index_dirty = False
+
+    def _add_grams(self, name):
+        for gram in _trigrams(name.lower()):
+            self._grams.setdefault(gram, set()).add(name)
+
+    def _drop_grams(self, name):
+        for gram in _trigrams(name.lower()):
+            posting = self._grams.get(gram)
+            if posting is not None:
+                posting.discard(name)
+                if not posting:
+                    del self._grams[gram]
+
+    def _gram_index(self):
+        if self._grams is None:
+            self._grams = {}
+            for name in self._entries:
+                self._add_grams(name)
+        return self._grams
+
+    @staticmethod
+    def _filter_ext(entries, extensions):
+        if extensions is None:
+            return list(entries)
+        extensions = tuple(ext.lower() for ext in extensions)
+        return [e for e in entries if e.ext in extensions]
+
+    def entries(self, extensions=None):
+        """
+        Semua entri (terurut nama), opsional difilter ekstensi.
+        """
+        with self._lock:
+            self._ensure_index()
+            return self._filter_ext(self._sorted, extensions)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def prefix_search(self, prefix, extensions=None):
+        """
+        Entri yang namanya diawali 'prefix' (case-insensitive), terurut nama.
+        """
+        prefix = prefix.lower()
+        with self._lock:
+            self._ensure_index()
+            lo = bisect.bisect_left(self._prefix_keys, prefix)
+            hi = bisect.bisect_left(self._prefix_keys, prefix + "\uffff")
+            ids = sorted(self._prefix_ids[lo:hi])
+            return self._filter_ext([self._sorted[i] for i in ids], extensions)
+
+    def search(self, keyword, extensions=None):
+        """
+        Entri yang namanya mengandung 'keyword' (case-insensitive), terurut nama.
+        """
+        keyword = keyword.lower()
+        with self._lock:
+            if len(keyword) < 3:
+                self._ensure_index()
+                return self._filter_ext([e for e, name in zip(self._sorted, self._lower_names)
+                                         if keyword in name], extensions)
+            grams = self._gram_index()
+            postings = sorted((grams.get(gram, ()) for gram in _trigrams(keyword)), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    break
+            matched = sorted(name for name in candidates if keyword in name.lower())
+            return self._filter_ext([self._entries[name] for name in matched], extensions)
@@ -0,0 +1,148 @@
+import os
+import sys
+import gzip
+import time
+import queue
+import atexit
+import shutil
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_ROTATE_SECONDS = 24 * 60 * 60
+DEFAULT_BACKUP_COUNT = 7
+
+_lock = threading.Lock()
+_state = {"logger": None, "queue_handler": None, "listener": None, "handler": None,
+          "worker_queue": None, "worker_listener": None}
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotasi berdasarkan ukuran (max_bytes) dan/atau umur file (rotate_seconds).
+    Arsip dikompres gzip: app.log.1.gz, app.log.2.gz, ...
+    Dipakai di thread listener, jadi kompresi tidak memblok thread yang me-log.
+    """
+
+    def __init__(self, filename, max_bytes=DEFAULT_MAX_BYTES, rotate_seconds=DEFAULT_ROTATE_SECONDS,
+                 backup_count=DEFAULT_BACKUP_COUNT, encoding="utf-8"):
+        super().__init__(filename, maxBytes=max_bytes or 0, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.rotate_seconds = rotate_seconds or 0
+        try:
+            opened = os.path.getmtime(self.baseFilename) if os.path.getsize(self.baseFilename) else time.time()
+        except OSError:
+            opened = time.time()
+        self._rollover_at = opened + self.rotate_seconds if self.rotate_seconds else None
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._compress
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, "rb") as src, gzip.open(dest, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.remove(source)
+
+    def shouldRollover(self, record):
+        if self._rollover_at is not None and time.time() >= self._rollover_at:
+            if self.stream is None:
+                self.stream = self._open()
+            # file kosong tidak perlu diarsipkan
+            return self.stream.tell() > 0
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        if self.rotate_seconds:
+            self._rollover_at = time.time() + self.rotate_seconds
+
+
+def setup_logging(logger_name="ImageConverter", log_path="app.log", level=logging.INFO,
+                  max_bytes=DEFAULT_MAX_BYTES, rotate_seconds=DEFAULT_ROTATE_SECONDS,
+                  backup_count=DEFAULT_BACKUP_COUNT):
+    """
+    Logger non-blocking: logger hanya menaruh record di antrian (QueueHandler),
+    thread listener yang menulis ke file dengan rotasi + kompresi.
+    Idempotent; mengembalikan logger. Di proses worker tidak membuat file handler
+    (worker mengirim record lewat worker_log_config(), lihat init_worker_logging).
+    """
+    logger = logging.getLogger(logger_name)
+    with _lock:
+        if logger.handlers:
+            return logger
+        logger.setLevel(level)
+        # multiprocessing hanya dicek jika sudah di-load (selalu begitu di proses worker spawn),
+        # supaya start-up proses utama tidak ikut meng-import-nya
+        mp = sys.modules.get("multiprocessing")
+        if mp is not None and mp.parent_process() is not None:
+            # proses worker (spawn) sebelum initializer jalan: jangan buka app.log
+            logger.addHandler(logging.NullHandler())
+            return logger
+        handler = CompressingRotatingFileHandler(os.path.abspath(log_path), max_bytes, rotate_seconds,
+                                                 backup_count)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        logger.addHandler(queue_handler)
+        listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        listener.start()
+        _state["listener"] = listener
+        _state["handler"] = handler
+        _state["logger"] = logger
+        _state["queue_handler"] = queue_handler
+        atexit.register(shutdown_logging)
+    return logger
+
+
+def worker_log_config(logger_name="ImageConverter"):
+    """
+    kwargs initializer untuk ProcessPoolExecutor supaya log worker ikut masuk
+    ke listener proses utama. Dict kosong jika logging antrian belum aktif.
+    """
+    with _lock:
+        handler = _state["handler"]
+        if handler is None:
+            return {}
+        if _state["worker_queue"] is None:
+            import multiprocessing
+            worker_queue = multiprocessing.Queue(-1)
+            listener = QueueListener(worker_queue, handler, respect_handler_level=True)
+            listener.start()
+            _state["worker_queue"] = worker_queue
+            _state["worker_listener"] = listener
+        level = logging.getLogger(logger_name).level
+        return {"initializer": init_worker_logging,
+                "initargs": (_state["worker_queue"], logger_name, level)}
+
+
+def init_worker_logging(log_queue, logger_name, level):
+    """
+    Initializer proses worker: ganti handler warisan (fork) atau NullHandler (spawn)
+    dengan QueueHandler ke antrian multiprocessing milik proses utama.
+    """
+    logger = logging.getLogger(logger_name)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+
+
+def shutdown_logging():
+    """
+    Hentikan listener (flush semua record di antrian) dan tutup file log.
+    """
+    with _lock:
+        if _state["logger"] is not None:
+            _state["logger"].removeHandler(_state["queue_handler"])
+            _state["logger"] = _state["queue_handler"] = None
+        for key in ("worker_listener", "listener"):
+            listener = _state[key]
+            if listener is not None:
+                listener.stop()
+                _state[key] = None
+        if _state["handler"] is not None:
+            _state["handler"].close()
+            _state["handler"] = None
+        _state["worker_queue"] = None
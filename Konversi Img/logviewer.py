@@ -0,0 +1,412 @@
+import os
+import re
+import mmap
+import logging
+import tkinter as tk
+from tkinter import ttk
+from contextlib import contextmanager
+
+logger = logging.getLogger("ImageConverter")
+
+SCAN_CHUNK = 4 * 1024 * 1024
+LEVELS = ("ALL", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+
+class LogFilter:
+    """
+    Filter level + keyword. Pencarian memakai regex langsung di atas mmap
+    (kode C), bukan loop Python per baris.
+    """
+
+    def __init__(self, level=None, keyword=None):
+        self.level_token = None
+        if level and level != "ALL":
+            self.level_token = (" - %s - " % level).encode("ascii")
+        keyword = (keyword or "").strip()
+        self.keyword_re = re.compile(re.escape(keyword.encode("utf-8")), re.I) if keyword else None
+        if self.keyword_re is not None:
+            self._primary = self.keyword_re
+        elif self.level_token is not None:
+            self._primary = re.compile(re.escape(self.level_token))
+        else:
+            self._primary = None
+
+    @property
+    def active(self):
+        return self._primary is not None
+
+    def accept(self, line):
+        if self.level_token is not None and self.level_token not in line:
+            return False
+        if self.keyword_re is not None and not self.keyword_re.search(line):
+            return False
+        return True
+
+    def iter_matches(self, mm, start, end):
+        """
+        (line_start, line_end) untuk tiap baris cocok di [start, end).
+        'start' harus awal baris dan 'end' harus akhir baris (setelah newline) atau EOF.
+        """
+        pos = start
+        while pos < end:
+            m = self._primary.search(mm, pos, end)
+            if m is None:
+                return
+            nl = mm.rfind(b"\n", start, m.start())
+            line_start = start if nl == -1 else nl + 1
+            line_end = mm.find(b"\n", m.start(), end)
+            if line_end == -1:
+                line_end = end
+            if self.accept(mm[line_start:line_end]):
+                yield line_start, line_end
+            pos = line_end + 1
+
+
+class LogFile:
+    """
+    Akses baris log lewat mmap tanpa membaca seluruh file. File di-map per
+    operasi (bukan terus-menerus) supaya file tetap bisa dikosongkan/dirotasi.
+    Hanya baris lengkap (diakhiri newline) yang dikembalikan.
+    """
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    @contextmanager
+    def _mapped(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            yield None, 0
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                yield None, 0
+                return
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mm, size
+            finally:
+                mm.close()
+
+    def _decode(self, raw):
+        return raw.rstrip(b"\r").decode(self.encoding, "replace")
+
+    def _complete_end(self, mm, size):
+        # abaikan baris terakhir yang belum selesai ditulis
+        if mm[size - 1:size] == b"\n":
+            return size
+        return mm.rfind(b"\n", 0, size) + 1
+
+    def read_forward(self, offset, max_lines):
+        """
+        Maksimal max_lines baris lengkap mulai dari 'offset' (awal baris).
+        Mengembalikan (list (offset, text), offset_berikutnya).
+        """
+        lines = []
+        with self._mapped() as (mm, size):
+            if mm is None:
+                return lines, 0
+            end = self._complete_end(mm, size)
+            pos = offset
+            while pos < end and len(lines) < max_lines:
+                nl = mm.find(b"\n", pos, end)
+                if nl == -1:
+                    break
+                lines.append((pos, self._decode(mm[pos:nl])))
+                pos = nl + 1
+            return lines, pos
+
+    def read_backward(self, offset, max_lines):
+        """
+        Maksimal max_lines baris lengkap sebelum 'offset', urutan file.
+        offset=None berarti dari akhir file. Mengembalikan (lines, offset_awal, offset_akhir).
+        """
+        lines = []
+        with self._mapped() as (mm, size):
+            if mm is None:
+                return lines, 0, 0
+            end = self._complete_end(mm, size)
+            stop = end if offset is None else min(offset, end)
+            pos = stop
+            while pos > 0 and len(lines) < max_lines:
+                nl = mm.rfind(b"\n", 0, pos - 1)
+                start = nl + 1
+                lines.append((start, self._decode(mm[start:pos - 1])))
+                pos = start
+            lines.reverse()
+            return lines, pos, stop
+
+    def scan_forward(self, offset, log_filter, chunk=SCAN_CHUNK):
+        """
+        Satu langkah scan terfilter: cari baris cocok di sekitar 'chunk' byte
+        mulai dari 'offset'. Mengembalikan (matches, offset_berikutnya, eof).
+        """
+        matches = []
+        with self._mapped() as (mm, size):
+            if mm is None:
+                return matches, 0, True
+            end = self._complete_end(mm, size)
+            if offset >= end:
+                return matches, end, True
+            stop = min(end, offset + chunk)
+            if stop < end:
+                nl = mm.rfind(b"\n", offset, stop)
+                stop = (nl + 1) if nl != -1 else (mm.find(b"\n", stop, end) + 1)
+            for line_start, line_end in log_filter.iter_matches(mm, offset, stop):
+                matches.append((line_start, self._decode(mm[line_start:line_end])))
+            return matches, stop, stop >= end
+
+    def scan_backward(self, offset, log_filter, chunk=SCAN_CHUNK):
+        """
+        Seperti scan_forward tapi untuk blok sebelum 'offset' (None = akhir file).
+        Mengembalikan (matches urutan file, offset_awal_blok, bof).
+        """
+        matches = []
+        with self._mapped() as (mm, size):
+            if mm is None:
+                return matches, 0, True
+            end = self._complete_end(mm, size)
+            stop = end if offset is None else min(offset, end)
+            if stop <= 0:
+                return matches, 0, True
+            start = max(0, stop - chunk)
+            if start > 0:
+                nl = mm.rfind(b"\n", 0, start)
+                start = nl + 1
+            for line_start, line_end in log_filter.iter_matches(mm, start, stop):
+                matches.append((line_start, self._decode(mm[line_start:line_end])))
+            return matches, start, start <= 0
+
+
+class LogViewerWindow:
+    """
+    Jendela log ber-halaman: buka di akhir file (waktu konstan), navigasi
+    halaman maju/mundur, filter level/keyword yang di-scan per chunk lewat
+    after(), dan mode ikuti (tail -f).
+    """
+
+    def __init__(self, master, log_path, page_lines=500, follow_interval_ms=1000):
+        self.log = LogFile(log_path)
+        self.page_lines = page_lines
+        self.follow_interval_ms = follow_interval_ms
+        self.filter = LogFilter()
+        self._offsets = []      # offset awal tiap baris yang tampil
+        self._bottom = 0        # offset setelah baris terakhir yang tampil
+        self._at_tail = True
+        self._scan_job = None
+        self._scan_token = 0
+
+        self.win = tk.Toplevel(master)
+        self.win.title("Log Viewer")
+        self.win.geometry("900x600")
+
+        toolbar = tk.Frame(self.win)
+        toolbar.pack(fill="x", padx=6, pady=4)
+        tk.Label(toolbar, text="Level:").pack(side="left")
+        self.level_var = tk.StringVar(value="ALL")
+        ttk.Combobox(toolbar, textvariable=self.level_var, values=LEVELS, state="readonly",
+                     width=9).pack(side="left", padx=4)
+        tk.Label(toolbar, text="Cari:").pack(side="left", padx=(8, 0))
+        self.keyword_var = tk.StringVar()
+        entry = tk.Entry(toolbar, textvariable=self.keyword_var, width=24)
+        entry.pack(side="left", padx=4)
+        entry.bind("<Return>", lambda e: self.apply_filter())
+        tk.Button(toolbar, text="Terapkan", command=self.apply_filter).pack(side="left", padx=4)
+        self.follow_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(toolbar, text="Ikuti (live)", variable=self.follow_var).pack(side="left", padx=8)
+
+        tk.Button(toolbar, text="⏭ Akhir", command=self.last_page).pack(side="right", padx=2)
+        tk.Button(toolbar, text="Berikutnya ▶", command=self.next_page).pack(side="right", padx=2)
+        tk.Button(toolbar, text="◀ Sebelumnya", command=self.prev_page).pack(side="right", padx=2)
+        tk.Button(toolbar, text="⏮ Awal", command=self.first_page).pack(side="right", padx=2)
+
+        text_frame = tk.Frame(self.win)
+        text_frame.pack(fill="both", expand=True)
+        self.text = tk.Text(text_frame, wrap=tk.NONE, state="disabled")
+        scroll_y = ttk.Scrollbar(text_frame, orient="vertical", command=self.text.yview)
+        self.text.configure(yscrollcommand=scroll_y.set)
+        self.text.pack(side="left", fill="both", expand=True)
+        scroll_y.pack(side="right", fill="y")
+
+        self.status = tk.Label(self.win, text="", anchor="w")
+        self.status.pack(fill="x", padx=6)
+
+        self.last_page()
+        self.win.after(self.follow_interval_ms, self._follow_tick)
+
+    # rendering
+    def _show(self, lines, bottom, at_tail):
+        self._offsets = [offset for offset, _ in lines]
+        self._bottom = bottom
+        self._at_tail = at_tail
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        if lines:
+            self.text.insert("1.0", "\n".join(text for _, text in lines) + "\n")
+        elif self.log.size() == 0:
+            self.text.insert("1.0", "Log file kosong atau tidak ditemukan.")
+        self.text.configure(state="disabled")
+        if at_tail:
+            self.text.see("end")
+        else:
+            self.text.see("1.0")
+        self._update_status()
+
+    def _append(self, lines, bottom):
+        if not lines:
+            self._bottom = bottom
+            return
+        self.text.configure(state="normal")
+        self.text.insert("end", "\n".join(text for _, text in lines) + "\n")
+        self._offsets.extend(offset for offset, _ in lines)
+        overflow = len(self._offsets) - self.page_lines
+        if overflow > 0:
+            self.text.delete("1.0", "%d.0" % (overflow + 1))
+            del self._offsets[:overflow]
+        self.text.configure(state="disabled")
+        self.text.see("end")
+        self._bottom = bottom
+        self._update_status()
+
+    def _update_status(self, extra=""):
+        size = self.log.size()
+        pct = int(100 * self._bottom / size) if size else 100
+        text = "%d baris ditampilkan | posisi %d%% dari %.1f MB" % (len(self._offsets), pct, size / 1e6)
+        if self.filter.active:
+            text += " | filter aktif"
+        if extra:
+            text += " | " + extra
+        self.status.config(text=text)
+
+    # navigasi
+    def _cancel_scan(self):
+        self._scan_token += 1
+        if self._scan_job is not None:
+            try:
+                self.win.after_cancel(self._scan_job)
+            except tk.TclError:
+                pass
+            self._scan_job = None
+
+    def first_page(self):
+        self._cancel_scan()
+        if self.filter.active:
+            self._scan(forward=True, anchor=0)
+            return
+        lines, bottom = self.log.read_forward(0, self.page_lines)
+        self._show(lines, bottom, at_tail=False)
+
+    def last_page(self):
+        self._cancel_scan()
+        if self.filter.active:
+            self._scan(forward=False, anchor=None)
+            return
+        lines, _, bottom = self.log.read_backward(None, self.page_lines)
+        self._show(lines, bottom, at_tail=True)
+
+    def prev_page(self):
+        if not self._offsets:
+            return self.last_page()
+        self._cancel_scan()
+        top = self._offsets[0]
+        if self.filter.active:
+            self._scan(forward=False, anchor=top)
+            return
+        lines, _, bottom = self.log.read_backward(top, self.page_lines)
+        if lines:
+            self._show(lines, bottom, at_tail=False)
+
+    def next_page(self):
+        self._cancel_scan()
+        if self.filter.active:
+            self._scan(forward=True, anchor=self._bottom)
+            return
+        lines, bottom = self.log.read_forward(self._bottom, self.page_lines)
+        if lines:
+            self._show(lines, bottom, at_tail=bottom >= self.log.size())
+
+    def apply_filter(self):
+        self.filter = LogFilter(self.level_var.get(), self.keyword_var.get())
+        logger.info("Log viewer filter: level=%s keyword=%s", self.level_var.get(), self.keyword_var.get())
+        self.last_page()
+
+    # scan terfilter per chunk (tidak memblok event loop)
+    def _scan(self, forward, anchor):
+        self._scan_token += 1
+        token = self._scan_token
+        found = []
+        state = {"pos": anchor, "bottom": anchor}
+
+        def step():
+            if token != self._scan_token:
+                return
+            if forward:
+                matches, nxt, done = self.log.scan_forward(state["pos"], self.filter)
+                found.extend(matches)
+                state["pos"] = nxt
+                state["bottom"] = nxt if len(found) < self.page_lines else None
+            else:
+                matches, start, done = self.log.scan_backward(state["pos"], self.filter)
+                if state["bottom"] is None:
+                    state["bottom"] = self.log.size() if anchor is None else anchor
+                found[:0] = matches
+                state["pos"] = start
+            full = len(found) >= self.page_lines
+            if done or full:
+                self._scan_job = None
+                if forward:
+                    lines = found[:self.page_lines]
+                    if full:
+                        # lanjut berikutnya tepat setelah baris terakhir yang ditampilkan
+                        bottom = found[self.page_lines][0] if len(found) > self.page_lines else state["pos"]
+                    else:
+                        bottom = state["pos"]
+                    if lines or anchor == 0:
+                        self._show(lines, bottom, at_tail=done and not full)
+                    else:
+                        self._update_status("tidak ada baris cocok berikutnya")
+                else:
+                    lines = found[-self.page_lines:]
+                    if lines or anchor is None:
+                        self._show(lines, state["bottom"], at_tail=anchor is None)
+                    else:
+                        self._update_status("tidak ada baris cocok sebelumnya")
+                return
+            pos = state["pos"] or 0
+            size = self.log.size() or 1
+            self._update_status("mencari... %d%%" % (100 * pos / size if forward else 100 - 100 * pos / size))
+            self._scan_job = self.win.after(1, step)
+
+        step()
+
+    # follow
+    def _follow_tick(self):
+        try:
+            if not self.win.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        try:
+            size = self.log.size()
+            if size < self._bottom:
+                # file dikosongkan atau dirotasi
+                self.last_page()
+            elif self.follow_var.get() and self._at_tail and self._scan_job is None and size > self._bottom:
+                if self.filter.active:
+                    matches, nxt, _ = self.log.scan_forward(self._bottom, self.filter)
+                    self._append(matches, nxt)
+                else:
+                    lines, bottom = self.log.read_forward(self._bottom, self.page_lines)
+                    self._append(lines, bottom)
+        except Exception:
+            logger.exception("Log viewer follow failed")
+        self.win.after(self.follow_interval_ms, self._follow_tick)
@@ -0,0 +1,188 @@
+import os
+import shutil
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger("ImageConverter")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path):
+    """
+    Hash isi file (blake2b 16 byte). Dibaca per chunk supaya file besar
+    tidak dimuat sekaligus ke memori.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+class ConversionManifest:
+    """
+    Manifest persisten: (hash isi file, setting konversi) -> file output.
+    Disimpan di SQLite (tabel WITHOUT ROWID dengan primary key komposit),
+    jadi lookup lewat index dan ukuran per entri kecil (digest 16 byte +
+    nama file output relatif terhadap output_dir).
+    Aman dipakai dari beberapa thread (watcher, batch GUI): satu koneksi per
+    proses, semua akses lewat satu lock.
+    """
+
+    def __init__(self, db_path, output_dir):
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self._conn = None
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        # koneksi SQLite dan lock tidak bisa di-pickle; tiap proses worker buka sendiri
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def _connect(self):
+        # dipanggil dengan self._lock dipegang
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outputs (
+                    digest BLOB NOT NULL,
+                    settings TEXT NOT NULL,
+                    output_name TEXT NOT NULL,
+                    output_size INTEGER NOT NULL,
+                    output_ino INTEGER NOT NULL,
+                    output_mtime_ns INTEGER NOT NULL,
+                    PRIMARY KEY (digest, settings)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS quality_hints (
+                    bucket TEXT PRIMARY KEY,
+                    quality INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS auto_quality (
+                    digest BLOB NOT NULL,
+                    settings TEXT NOT NULL,
+                    quality INTEGER NOT NULL,
+                    ssim REAL NOT NULL,
+                    fixed_size INTEGER NOT NULL,
+                    PRIMARY KEY (digest, settings)
+                ) WITHOUT ROWID
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, digest, settings):
+        """
+        Cari output untuk (digest, settings). Mengembalikan path output jika
+        entri ada dan file output masih file yang sama saat dicatat (ukuran, inode
+        dan mtime sama), selain itu None. Output yang diganti lewat os.replace oleh
+        konversi lain dengan nama sama punya inode baru, jadi tidak dipakai ulang
+        walaupun ukurannya kebetulan sama.
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT output_name, output_size, output_ino, output_mtime_ns FROM outputs "
+                "WHERE digest=? AND settings=?", (digest, settings)).fetchone()
+        if row is None:
+            return None
+        output_path = os.path.join(self.output_dir, row[0])
+        try:
+            st = os.stat(output_path)
+        except OSError:
+            return None
+        if (st.st_size, st.st_ino, st.st_mtime_ns) != tuple(row[1:]):
+            return None
+        return output_path
+
+    def record(self, digest, settings, output_path):
+        try:
+            st = os.stat(output_path)
+        except OSError:
+            return
+        output_name = os.path.relpath(output_path, self.output_dir)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO outputs (digest, settings, output_name, output_size, output_ino, "
+                "output_mtime_ns) VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, settings, output_name, st.st_size, st.st_ino, st.st_mtime_ns))
+            conn.commit()
+
+    def quality_hint(self, bucket):
+        """
+        Quality awal untuk mode target ukuran (lihat sizing.quality_hint_bucket), atau None.
+        """
+        with self._lock:
+            row = self._connect().execute("SELECT quality FROM quality_hints WHERE bucket=?",
+                                          (bucket,)).fetchone()
+        return row[0] if row else None
+
+    def record_quality_hint(self, bucket, quality):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO quality_hints (bucket, quality) VALUES (?, ?)",
+                         (bucket, int(quality)))
+            conn.commit()
+
+    def auto_quality(self, digest, settings):
+        """
+        Hasil mode target SSIM untuk (digest, settings): (quality, ssim, ukuran di
+        quality tetap), atau None.
+        """
+        with self._lock:
+            return self._connect().execute(
+                "SELECT quality, ssim, fixed_size FROM auto_quality WHERE digest=? AND settings=?",
+                (digest, settings)).fetchone()
+
+    def record_auto_quality(self, digest, settings, quality, ssim, fixed_size):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO auto_quality (digest, settings, quality, ssim, fixed_size) "
+                         "VALUES (?, ?, ?, ?, ?)", (digest, settings, int(quality), float(ssim), int(fixed_size)))
+            conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM outputs").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    logger.exception("Failed to close manifest %s", self.db_path)
+                self._conn = None
+
+
+def reuse_output(existing_path, output_path):
+    """
+    Pakai ulang output yang sudah ada untuk output_path: hard link jika
+    memungkinkan, fallback ke copy. Tidak melakukan apa-apa jika path sama.
+    """
+    if os.path.abspath(existing_path) == os.path.abspath(output_path):
+        return output_path
+    tmp_path = output_path + ".tmp"
+    try:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        os.link(existing_path, tmp_path)
+    except OSError:
+        shutil.copy2(existing_path, tmp_path)
+    os.replace(tmp_path, output_path)
+    return output_path
@@ -0,0 +1,98 @@
+import sys
+import ctypes
+import ctypes.util
+import threading
+
+# byte per pixel buffer decode Pillow: mode multi-band (RGB, LA, ...) disimpan 4 byte/pixel
+BYTES_PER_PIXEL = {"1": 1, "L": 1, "P": 1, "I;16": 2, "I;16B": 2, "I;16L": 2, "I;16N": 2}
+# di atas ini resize memakai reduce() dulu (reducing_gap) supaya buffer antara kecil
+LARGE_IMAGE_PIXELS = 50 * 1000 * 1000
+# perkiraan kasar memori kerja encoder per pixel output (YUV + buffer internal)
+ENCODER_BYTES_PER_PIXEL = 2
+
+
+def jpeg_draft_scale(width, height, target_width, target_height):
+    """
+    Skala draft JPEG (1, 2, 4, 8) yang dipilih Pillow untuk ukuran target.
+    """
+    scale = 1
+    for candidate in (2, 4, 8):
+        if width // candidate >= target_width and height // candidate >= target_height:
+            scale = candidate
+    return scale
+
+
+def estimate_memory(width, height, mode, fmt, out_width=None, out_height=None):
+    """
+    Perkiraan puncak memori (byte) untuk konversi satu gambar, hanya dari header:
+    buffer decode (setelah draft JPEG) + buffer hasil resize/konversi RGBA + encoder.
+    """
+    out_width = out_width or width
+    out_height = out_height or height
+    decoded_w, decoded_h = width, height
+    if fmt == "JPEG" and (out_width, out_height) != (width, height):
+        scale = jpeg_draft_scale(width, height, out_width, out_height)
+        decoded_w, decoded_h = -(-width // scale), -(-height // scale)
+    decoded = decoded_w * decoded_h * BYTES_PER_PIXEL.get(mode, 4)
+    out_pixels = out_width * out_height
+    working = 0
+    if (out_width, out_height) != (decoded_w, decoded_h) or mode not in ("RGB", "RGBA"):
+        working = out_pixels * 4
+    return decoded + working + out_pixels * ENCODER_BYTES_PER_PIXEL
+
+
+_malloc_trim = None
+
+
+def trim_heap():
+    """
+    Kembalikan heap yang sudah bebas ke OS (glibc malloc_trim). Tanpa ini proses
+    worker tetap memegang memori gambar besar terakhir. No-op selain glibc.
+    """
+    global _malloc_trim
+    if _malloc_trim is None:
+        _malloc_trim = False
+        if sys.platform.startswith("linux"):
+            try:
+                _malloc_trim = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6").malloc_trim
+            except (OSError, AttributeError):
+                pass
+    if _malloc_trim:
+        _malloc_trim(0)
+
+
+class MemoryBudget:
+    """
+    Admission control berdasarkan perkiraan memori. try_acquire() gagal jika
+    pekerjaan baru membuat total melewati limit, kecuali belum ada pekerjaan
+    sama sekali: gambar yang sendirian sudah melebihi limit tetap jalan, tapi sendiri.
+    """
+
+    def __init__(self, limit_bytes):
+        self.limit = int(limit_bytes)
+        self.used = 0
+        self.active = 0
+        self.peak = 0
+        self._cond = threading.Condition()
+
+    def try_acquire(self, cost):
+        with self._cond:
+            return self._admit(cost)
+
+    def acquire(self, cost, timeout=None):
+        with self._cond:
+            return self._cond.wait_for(lambda: self._admit(cost), timeout)
+
+    def _admit(self, cost):
+        if self.active and self.used + cost > self.limit:
+            return False
+        self.used += cost
+        self.active += 1
+        self.peak = max(self.peak, self.used)
+        return True
+
+    def release(self, cost):
+        with self._cond:
+            self.used -= cost
+            self.active -= 1
+            self._cond.notify_all()
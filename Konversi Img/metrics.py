@@ -0,0 +1,189 @@
+import json
+import time
+import threading
+import logging
+
+logger = logging.getLogger("ImageConverter")
+
+STAGES = ("hash", "open", "decode", "resize", "convert", "encode", "move")
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _NullTimer:
+    """
+    Dipakai saat metrics hook tidak aktif: semua operasi no-op, tanpa perf_counter.
+    """
+    enabled = False
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+    def set(self, **fields):
+        pass
+
+    def add(self, name, value):
+        pass
+
+    def record(self, filename, success):
+        return None
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _Stage:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageTimer:
+    """
+    Kumpulkan durasi per stage (detik) dan field tambahan untuk satu file.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.fields = {}
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def add(self, name, value):
+        self.stages[name] = self.stages.get(name, 0.0) + value
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def record(self, filename, success):
+        record = {
+            "type": "file",
+            "file": filename,
+            "success": bool(success),
+            "total_s": round(time.perf_counter() - self.started, 6),
+            "stages": {name: round(value, 6) for name, value in self.stages.items()},
+        }
+        record.update(self.fields)
+        return record
+
+
+class MetricsSummary:
+    """
+    Agregat record per file untuk satu run convert_all/convert_iter.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.files = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.auto_quality_files = 0
+        self.auto_quality_bytes = 0
+        self.fixed_quality_bytes = 0
+        self._stage_values = {}
+        self._totals = []
+
+    def add(self, record):
+        if record is None:
+            return
+        self.files += 1
+        if not record.get("success"):
+            self.failed += 1
+        if record.get("cache_hit"):
+            self.cache_hits += 1
+        self.input_bytes += record.get("input_bytes", 0)
+        self.output_bytes += record.get("output_bytes", 0)
+        if "fixed_quality_bytes" in record:
+            self.auto_quality_files += 1
+            self.auto_quality_bytes += record["auto_quality_bytes"]
+            self.fixed_quality_bytes += record["fixed_quality_bytes"]
+        self._totals.append(record.get("total_s", 0.0))
+        for name, value in record.get("stages", {}).items():
+            self._stage_values.setdefault(name, []).append(value)
+
+    @staticmethod
+    def _p95(values):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def as_dict(self):
+        wall = time.perf_counter() - self.started
+        stages = {}
+        for name in sorted(self._stage_values, key=lambda n: STAGES.index(n) if n in STAGES else len(STAGES)):
+            values = self._stage_values[name]
+            stages[name] = {
+                "total_s": round(sum(values), 4),
+                "mean_ms": round(1000.0 * sum(values) / len(values), 3),
+                "p95_ms": round(1000.0 * self._p95(values), 3),
+            }
+        data = {
+            "type": "summary",
+            "files": self.files,
+            "failed": self.failed,
+            "cache_hits": self.cache_hits,
+            "input_bytes": self.input_bytes,
+            "output_bytes": self.output_bytes,
+            "wall_s": round(wall, 4),
+            "file_total_p95_ms": round(1000.0 * self._p95(self._totals), 3) if self._totals else None,
+            "stages": stages,
+        }
+        if self.auto_quality_files:
+            saved = self.fixed_quality_bytes - self.auto_quality_bytes
+            data["auto_quality"] = {
+                "files": self.auto_quality_files,
+                "bytes": self.auto_quality_bytes,
+                "fixed_quality_bytes": self.fixed_quality_bytes,
+                "bytes_saved_vs_fixed": saved,
+                "saved_pct": round(100.0 * saved / self.fixed_quality_bytes, 2),
+            }
+        return data
+
+
+class JsonLinesSink:
+    """
+    Metrics hook bawaan: tulis tiap record sebagai satu baris JSON (append).
+    Aman dipakai dari beberapa thread; file dibuka lazily.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.path, "a", encoding="utf-8")
+            self._fh.write(line)
+            self._fh.flush()
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
@@ -0,0 +1,140 @@
+from PIL import Image
+
+# SSIM dihitung pada mosaik tile resolusi asli, maksimal SSIM_SAMPLE_SIDE^2 pixel
+SSIM_SAMPLE_SIDE = 512
+SSIM_TILE = 128
+SSIM_WINDOW = 8
+DEFAULT_TARGET_SSIM = 0.95
+DEFAULT_SSIM_PROBES = 7
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+
+
+def _np():
+    import numpy
+    return numpy
+
+
+def _tile_ranges(length, count, tile):
+    # count potongan selebar tile tersebar merata, awal di kelipatan 16 (blok codec)
+    if length <= count * tile:
+        return [(0, length)]
+    starts = [(i * (length - tile) // (count - 1)) // 16 * 16 for i in range(count)]
+    return [(start, start + tile) for start in starts]
+
+
+def luma_plane(img, sample_side=SSIM_SAMPLE_SIDE, tile=SSIM_TILE):
+    """
+    Plane luma (uint8) untuk SSIM. Gambar besar diwakili mosaik tile resolusi
+    asli yang tersebar merata (grid sample_side / tile per sumbu), jadi biaya
+    tetap ~sample_side^2 pixel berapapun ukuran gambar. Tidak di-resize: rata-rata
+    blok pada plane yang diperkecil menyamarkan artefak kompresi dan membuat SSIM
+    terlalu optimis. Posisi tile hanya bergantung pada ukuran, jadi referensi dan
+    hasil decode diambil dari tempat yang sama.
+    """
+    np = _np()
+    count = max(1, sample_side // tile)
+    rows = _tile_ranges(img.height, count, tile)
+    cols = _tile_ranges(img.width, count, tile)
+    if len(rows) == 1 and len(cols) == 1:
+        return np.asarray(img.convert("L"))
+    return np.block([[np.asarray(img.crop((left, top, right, bottom)).convert("L"))
+                      for left, right in cols] for top, bottom in rows])
+
+
+def _sum_blocks(planes, size):
+    # jumlah blok size x size di dua sumbu terakhir; slice berlangkah lebih cepat dari reshape().sum()
+    cols = planes[..., 0::size].copy()
+    for k in range(1, size):
+        cols += planes[..., k::size]
+    blocks = cols[..., 0::size, :].copy()
+    for k in range(1, size):
+        blocks += cols[..., k::size, :]
+    return blocks
+
+
+def ssim(reference, test, window=SSIM_WINDOW):
+    """
+    Mean SSIM dua plane luma berukuran sama. Jendela kotak window x window dengan
+    langkah window / 2 (jumlah 2 x 2 blok setengah jendela), dihitung sekaligus
+    untuk kelima statistik dalam satu array float32. 1.0 = identik.
+    """
+    np = _np()
+    if reference.shape != test.shape:
+        raise ValueError("ukuran plane berbeda: %s vs %s" % (reference.shape, test.shape))
+    half = max(1, min(window, *reference.shape) // 2)
+    height = reference.shape[0] // half * half
+    width = reference.shape[1] // half * half
+    a = reference[:height, :width].astype(np.float32)
+    b = test[:height, :width].astype(np.float32)
+    blocks = _sum_blocks(np.stack([a, b, a * a, b * b, a * b]), half)
+    if blocks.shape[1] > 1 and blocks.shape[2] > 1:
+        blocks = blocks[:, :-1, :-1] + blocks[:, 1:, :-1] + blocks[:, :-1, 1:] + blocks[:, 1:, 1:]
+        blocks /= float(4 * half * half)
+    else:
+        blocks /= float(half * half)
+    mu_a, mu_b, sq_a, sq_b, prod = blocks
+    var_a = sq_a - mu_a * mu_a
+    var_b = sq_b - mu_b * mu_b
+    cov = prod - mu_a * mu_b
+    score = (((2 * mu_a * mu_b + _C1) * (2 * cov + _C2))
+             / ((mu_a * mu_a + mu_b * mu_b + _C1) * (var_a + var_b + _C2)))
+    return float(score.mean())
+
+
+class SsimSearchResult:
+    __slots__ = ("quality", "buffer", "size", "ssim", "probes", "fits", "fixed_size")
+
+    def __init__(self, quality, buffer, size, ssim, probes, fits, fixed_size):
+        self.quality = quality
+        self.buffer = buffer
+        self.size = size
+        self.ssim = ssim
+        self.probes = probes
+        self.fits = fits
+        self.fixed_size = fixed_size
+
+
+def search_ssim(encode, reference, target_ssim=DEFAULT_TARGET_SSIM, fixed_quality=80, min_quality=10,
+                max_quality=100, max_probes=DEFAULT_SSIM_PROBES, sample_side=SSIM_SAMPLE_SIDE):
+    """
+    Cari quality terendah yang hasil decode-nya punya SSIM >= target_ssim terhadap
+    reference (plane luma, lihat luma_plane). encode(quality) mengembalikan io.BytesIO.
+    Probe pertama di fixed_quality (ukuran pembanding untuk laporan), lalu binary
+    search (SSIM naik monoton terhadap quality), paling banyak max_probes encode.
+    Yang dikembalikan adalah probe lolos dengan byte terkecil: ukuran tidak selalu
+    turun bersama quality (gambar polos / kecil), jadi probe fixed_quality bisa
+    lebih kecil dari quality terendah yang lolos.
+    Jika tidak ada yang mencapai target, dikembalikan probe dengan SSIM tertinggi (fits=False).
+    """
+    min_quality = max(0, int(min_quality))
+    max_quality = min(100, max(min_quality, int(max_quality)))
+    probes = {}
+
+    def probe(quality):
+        buffer = encode(quality)
+        size = buffer.tell()
+        buffer.seek(0)
+        with Image.open(buffer) as decoded:
+            score = ssim(reference, luma_plane(decoded, sample_side))
+        probes[quality] = (buffer, size, score)
+        return score
+
+    fixed_quality = max(min_quality, min(max_quality, int(fixed_quality)))
+    low, high = min_quality, max_quality
+    quality = fixed_quality
+    while low <= high and len(probes) < max(1, max_probes):
+        if probe(quality) >= target_ssim:
+            high = quality - 1
+        else:
+            low = quality + 1
+        quality = (low + high) // 2
+    passing = [q for q in probes if probes[q][2] >= target_ssim]
+    if passing:
+        best = min(passing, key=lambda q: (probes[q][1], q))
+    else:
+        best = max(probes, key=lambda q: (probes[q][2], q))
+    buffer, size, score = probes[best]
+    return SsimSearchResult(best, buffer, size, score, len(probes), score >= target_ssim,
+                            probes[fixed_quality][1])
+
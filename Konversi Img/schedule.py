@@ -0,0 +1,59 @@
+import os
+import logging
+from memory import jpeg_draft_scale
+
+logger = logging.getLogger("ImageConverter")
+
+# "input": urutan input apa adanya, "largest": file terbesar dulu,
+# "cost": perkiraan waktu konversi terbesar dulu (header + ukuran file)
+SCHEDULES = ("input", "largest", "cost")
+# bobot model biaya (nanodetik, diukur pada Pillow 12 / libwebp method 4): decode per
+# pixel sumber + per byte terkompresi (entropy decode / zlib), encode per pixel output.
+# Angka absolutnya kasar; yang dipakai untuk penjadwalan hanya urutannya.
+DECODE_NS_PER_PIXEL = 10
+DECODE_NS_PER_BYTE = 40
+ENCODE_NS_PER_PIXEL = 170
+
+
+def estimate_cost(width, height, fmt, file_bytes, out_width=None, out_height=None, outputs=1):
+    """
+    Perkiraan waktu konversi satu gambar (detik) dari header dan ukuran file:
+    decode (setelah draft JPEG) + encode tiap format output.
+    """
+    out_width = out_width or width
+    out_height = out_height or height
+    decoded_pixels = width * height
+    if fmt == "JPEG" and (out_width, out_height) != (width, height):
+        scale = jpeg_draft_scale(width, height, out_width, out_height)
+        decoded_pixels = -(-width // scale) * -(-height // scale)
+    ns = (decoded_pixels * DECODE_NS_PER_PIXEL + file_bytes * DECODE_NS_PER_BYTE
+          + out_width * out_height * ENCODE_NS_PER_PIXEL * max(1, outputs))
+    return ns / 1e9
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def order_paths(input_paths, schedule="input", cost=None):
+    """
+    Urutkan path untuk dikirim ke worker. "largest"/"cost": terbesar dulu
+    (longest processing time first), jadi file besar tidak tersisa di akhir batch
+    saat worker lain sudah menganggur; file dengan nilai sama tetap urutan input.
+    cost: callable path -> perkiraan detik untuk "cost" (mis. ImageConverter.estimate_cost).
+    Mengembalikan list path.
+    """
+    if schedule not in SCHEDULES:
+        raise ValueError("schedule harus salah satu dari %s" % (SCHEDULES,))
+    input_paths = list(input_paths)
+    if schedule == "input" or len(input_paths) < 2:
+        return input_paths
+    key = cost if schedule == "cost" else _file_size
+    weights = {path: key(path) for path in input_paths}
+    ordered = sorted(input_paths, key=weights.get, reverse=True)
+    logger.info("Schedule %s: %d file, largest first (%s)", schedule, len(ordered),
+                os.path.basename(ordered[0]))
+    return ordered
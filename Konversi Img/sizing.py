@@ -0,0 +1,94 @@
+import math
+
+# perkiraan awal d(log ukuran)/d(quality) untuk WebP/JPEG; diganti slope hasil probe
+DEFAULT_SLOPE = 0.03
+DEFAULT_MAX_PROBES = 6
+DEFAULT_MIN_QUALITY = 10
+# hasil dianggap cukup jika ukuran di antara (1 - tolerance) * target dan target
+DEFAULT_TOLERANCE = 0.05
+
+
+class SizeSearchResult:
+    __slots__ = ("quality", "buffer", "size", "probes", "fits")
+
+    def __init__(self, quality, buffer, size, probes, fits):
+        self.quality = quality
+        self.buffer = buffer
+        self.size = size
+        self.probes = probes
+        self.fits = fits
+
+
+def _next_quality(points, target, low, high, tolerance):
+    """
+    Tebakan quality berikutnya: model log(ukuran) linear terhadap quality,
+    slope dari dua probe yang paling dekat ke target.
+    """
+    if low > high:
+        return None
+    aim = math.log(target * (1.0 - tolerance / 2.0))
+    nearest = sorted(points, key=lambda p: abs(math.log(p[1]) - aim))[:2]
+    slope = DEFAULT_SLOPE
+    if len(nearest) == 2 and nearest[0][0] != nearest[1][0]:
+        (q0, s0), (q1, s1) = nearest
+        measured = (math.log(s1) - math.log(s0)) / (q1 - q0)
+        if measured > 1e-4:
+            slope = measured
+    q0, s0 = nearest[0]
+    guess = int(round(q0 + (aim - math.log(s0)) / slope))
+    return max(low, min(high, guess))
+
+
+def search_quality(encode, target_bytes, max_quality=95, min_quality=DEFAULT_MIN_QUALITY,
+                   start=None, max_probes=DEFAULT_MAX_PROBES, tolerance=DEFAULT_TOLERANCE):
+    """
+    Cari quality tertinggi yang hasilnya <= target_bytes, maksimal max_probes encode.
+    encode(quality) harus mengembalikan io.BytesIO berisi hasil encode (posisi di akhir).
+    start: quality awal (mis. dari hint gambar serupa); default max_quality.
+    Jika tidak ada yang muat, dikembalikan hasil terkecil dengan fits=False.
+    """
+    target_bytes = int(target_bytes)
+    if target_bytes <= 0:
+        raise ValueError("target_size harus > 0")
+    min_quality = max(0, int(min_quality))
+    max_quality = min(100, max(min_quality, int(max_quality)))
+    quality = max_quality if start is None else max(min_quality, min(max_quality, int(start)))
+
+    points = []
+    best = None        # (quality, buffer, size) tertinggi yang muat
+    smallest = None    # (quality, buffer, size) terkecil, untuk fallback
+    fit_q = None       # quality tertinggi yang muat
+    big_q = None       # quality terendah yang terlalu besar
+    while quality is not None and len(points) < max(1, max_probes):
+        buffer = encode(quality)
+        size = buffer.tell()
+        points.append((quality, max(1, size)))
+        if size <= target_bytes:
+            if fit_q is None or quality > fit_q:
+                fit_q = quality
+                best = (quality, buffer, size)
+        else:
+            if big_q is None or quality < big_q:
+                big_q = quality
+        if smallest is None or size < smallest[2]:
+            smallest = (quality, buffer, size)
+        if best is not None and (best[0] >= max_quality or best[2] >= target_bytes * (1.0 - tolerance)):
+            break
+        low = fit_q + 1 if fit_q is not None else min_quality
+        high = big_q - 1 if big_q is not None else max_quality
+        quality = _next_quality(points, target_bytes, low, high, tolerance)
+
+    if best is not None:
+        return SizeSearchResult(best[0], best[1], best[2], len(points), True)
+    return SizeSearchResult(smallest[0], smallest[1], smallest[2], len(points), False)
+
+
+def quality_hint_bucket(fmt, preset, target_bytes, width, height, has_alpha, source_bpp):
+    """
+    Key untuk mengelompokkan gambar "serupa": format, preset, target, skala
+    jumlah pixel (log2), alpha, dan kompleksitas sumber (bit per pixel, log2).
+    """
+    pixels = max(1, width * height)
+    return "%s;%s;t=%d;px=%d;a=%d;bpp=%d" % (
+        fmt, preset, int(target_bytes), int(round(math.log2(pixels) * 2)), int(bool(has_alpha)),
+        int(round(math.log2(max(source_bpp, 0.01)) * 2)))
@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# modul Konversi Img di-import flat (import converter, import manifest, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# converter membuka app.log di cwd saat di-import: jangan tulis ke folder repo
+os.chdir(tempfile.mkdtemp(prefix="konversi_test_"))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+
+def make_image(path, size=(64, 48), color=(200, 80, 40), text=None):
+    """
+    Gambar kecil untuk test: warna rata, opsional dengan teks hitam.
+    """
+    img = Image.new("RGB", size, color)
+    if text:
+        ImageDraw.Draw(img).text((4, size[1] // 3), text, fill=(0, 0, 0))
+    img.save(path)
+    return path
+
+
+@pytest.fixture
+def converter(tmp_path):
+    from converter import ImageConverter
+    conv = ImageConverter(base_media_dir=str(tmp_path / "media"))
+    yield conv
+    conv.manifest.close()
@@ -0,0 +1,121 @@
+import io
+import os
+
+import pytest
+from PIL import Image, ImageSequence
+
+from animation import AnimatedWebPWriter, iter_frames, source_loop
+
+COLORS = [(255, 0, 0), (0, 0, 255), (0, 200, 0), (240, 240, 0)]
+
+
+def _frames(count=4, size=(32, 24)):
+    return [Image.new("RGB", size, COLORS[i % len(COLORS)]) for i in range(count)]
+
+
+def _save_animation(path, durations, **info):
+    frames = _frames(len(durations))
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=durations, **info)
+    return path
+
+
+def _webp_frames(path):
+    with Image.open(path) as img:
+        loop = img.info.get("loop")
+        durations = []
+        for frame in ImageSequence.Iterator(img):
+            frame.load()  # WebP: duration frame baru terisi setelah decode
+            durations.append(frame.info["duration"])
+        return img.format, loop, durations
+
+
+def test_gif_to_animated_webp_keeps_frames_durations_and_loop(converter):
+    path = _save_animation(os.path.join(converter.input_dir, "anim.gif"), [100, 200, 100, 50], loop=0)
+    success, output = converter.convert_file(path)
+    assert success, output
+    assert _webp_frames(output) == ("WEBP", 0, [100, 200, 100, 50])
+
+
+def test_gif_without_loop_block_plays_once(tmp_path):
+    path = _save_animation(str(tmp_path / "once.gif"), [100, 100])
+    with Image.open(path) as img:
+        assert source_loop(img) == 1
+
+
+def test_apng_to_animated_webp(converter):
+    path = _save_animation(os.path.join(converter.input_dir, "anim.png"), [80, 120, 80], loop=3)
+    success, output = converter.convert_file(path)
+    assert success, output
+    assert _webp_frames(output) == ("WEBP", 3, [80, 120, 80])
+
+
+def test_max_fps_drop_keeps_first_frame_of_interval(tmp_path):
+    path = _save_animation(str(tmp_path / "fast.gif"), [20] * 8, loop=0)
+    with Image.open(path) as img:
+        frames = list(iter_frames(img, max_fps=25, policy="drop"))
+    assert [(timestamp, duration) for _, timestamp, duration in frames] == \
+        [(0, 40), (40, 40), (80, 40), (120, 40)]
+    # frame 0, 2, 4, 6: merah dan hijau bergantian
+    assert [frame.convert("RGB").getpixel((0, 0)) for frame, _, _ in frames] == \
+        [COLORS[0], COLORS[2], COLORS[0], COLORS[2]]
+
+
+def test_max_fps_merge_blends_frames_of_interval(tmp_path):
+    path = _save_animation(str(tmp_path / "fast.gif"), [20, 20], loop=0)
+    with Image.open(path) as img:
+        frames = list(iter_frames(img, max_fps=25, policy="merge"))
+    assert len(frames) == 1
+    frame, timestamp, duration = frames[0]
+    assert (timestamp, duration) == (0, 40)
+    red, green, blue, _ = frame.getpixel((0, 0))
+    assert abs(red - 127) <= 2 and green == 0 and abs(blue - 127) <= 2
+
+
+def test_max_fps_conversion_keeps_total_duration(converter):
+    path = _save_animation(os.path.join(converter.input_dir, "fast.gif"), [20] * 8, loop=0)
+    success, output = converter.convert_file(path, max_fps=25)
+    assert success, output
+    _, _, durations = _webp_frames(output)
+    assert durations == [40, 40, 40, 40]
+
+
+def test_encode_error_moves_animation_to_fail(converter, monkeypatch):
+    def broken_finish(self, fp):
+        raise OSError("encoder rusak")
+    monkeypatch.setattr(AnimatedWebPWriter, "finish", broken_finish)
+    path = _save_animation(os.path.join(converter.input_dir, "anim.gif"), [100, 100], loop=0)
+    success, info = converter.convert_file(path)
+    assert not success and "encoder rusak" in info
+    assert os.listdir(converter.fail_dir) == ["anim.gif"]
+    assert not os.path.exists(path)
+
+
+class _RecordingEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def add(self, *args):
+        self.calls.append(args)
+
+    def assemble(self, *args):
+        return b"RIFF"
+
+
+@pytest.mark.parametrize("new_api, arity", [(True, 6), (False, 9)])
+def test_finish_flush_matches_encoder_signature(new_api, arity):
+    writer = AnimatedWebPWriter((32, 24))
+    writer._new_api = new_api
+    writer._encoder = _RecordingEncoder()
+    writer.add(_frames(1)[0], 0, 100)
+    writer.finish(io.BytesIO())
+    add_frame, flush = writer._encoder.calls
+    assert len(add_frame) == len(flush) == arity
+    assert flush[0] is None and flush[1] == 100
+
+
+def test_cover_crop_applies_without_upscaling(converter):
+    path = _save_animation(os.path.join(converter.input_dir, "anim.gif"), [100, 100], loop=0)
+    success, output = converter.convert_file(path, max_width=40, max_height=12, fit="cover")
+    assert success, output
+    with Image.open(output) as img:
+        assert img.size == (32, 12)
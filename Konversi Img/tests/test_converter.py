@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from conftest import make_image
+
+
+def _corpus(conv):
+    for i in range(6):
+        make_image(os.path.join(conv.input_dir, "img%d.png" % i), (48 + i * 8, 40), (i * 40, 120, 200 - i * 30),
+                   text="N%d" % i)
+    make_image(os.path.join(conv.input_dir, "photo.jpg"), (96, 64), (30, 160, 90), text="JPG")
+    with open(os.path.join(conv.input_dir, "broken.png"), "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n not an image")
+
+
+def _listing(conv):
+    return {folder: sorted(os.listdir(path)) for folder, path in
+            (("output", conv.output_dir), ("success", conv.success_dir), ("fail", conv.fail_dir))}
+
+
+@pytest.fixture
+def pair(tmp_path):
+    from converter import ImageConverter
+    convs = [ImageConverter(base_media_dir=str(tmp_path / name)) for name in ("serial", "parallel")]
+    for conv in convs:
+        _corpus(conv)
+    yield convs
+    for conv in convs:
+        conv.manifest.close()
+
+
+def test_parallel_matches_serial(pair):
+    serial, parallel = pair
+    serial_results = serial.convert_all()
+    parallel_results = parallel.convert_all(parallel=True, workers=2)
+    assert [(name, ok) for name, ok, _ in serial_results] == \
+        [(name, ok) for name, ok, _ in parallel_results]
+    assert ("broken.png", False) in [(name, ok) for name, ok, _ in serial_results]
+    assert _listing(serial) == _listing(parallel)
+    assert _listing(serial)["fail"] == ["broken.png"]
+    assert os.listdir(serial.input_dir) == []
+
+
+def test_journal_replay_skips_torn_line(tmp_path):
+    from journal import BatchJournal
+    path = str(tmp_path / "batch.journal")
+    journal = BatchJournal.create(path, "in", ["a.png", "b.png", "c.png"], {"quality": 70})
+    journal.started("a.png")
+    journal.finished("a.png", True)
+    journal.started("b.png")
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"op":"done","fi')
+    state = BatchJournal.load(path)
+    assert state.settings == {"quality": 70}
+    assert state.done == {"a.png": True}
+    assert state.started == {"a.png", "b.png"}
+    assert state.pending == ["b.png", "c.png"]
+    assert not state.complete
+    with pytest.raises(RuntimeError):
+        BatchJournal.create(path, "in", ["d.png"], {})
+
+
+def test_resume_batch_converts_pending_files(converter):
+    from journal import BatchJournal
+    _corpus(converter)
+    names = sorted(os.listdir(converter.input_dir))
+    settings = {"quality": 70, "use_cache": False, "schedule": "input", "options": {}}
+    journal = BatchJournal.create(converter.journal_path, os.path.abspath(converter.input_dir), names,
+                                  settings)
+    # crash setelah file pertama selesai dan file kedua sudah dipindah ke success
+    first, second = [name for name in names if name != "broken.png"][:2]
+    for name in (first, second):
+        journal.started(name)
+        assert converter.convert_file(os.path.join(converter.input_dir, name), quality=70)[0]
+    journal.finished(first, True)
+    journal.close()
+    results = converter.resume_batch()
+    assert [name for name, _, _ in results] == [name for name in names if name != first]
+    assert dict((name, ok) for name, ok, _ in results)[second] is True
+    assert dict((name, ok) for name, ok, _ in results)["broken.png"] is False
+    assert not os.path.exists(converter.journal_path)
+    assert os.listdir(converter.input_dir) == []
+    assert converter.resume_batch() == []
@@ -0,0 +1,114 @@
+import os
+import random
+
+import pytest
+from PIL import Image
+
+from conftest import make_image
+
+
+def _photo(path, seed=3, size=(160, 120)):
+    rng = random.Random(seed)
+    img = Image.new("RGB", size)
+    img.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256))
+                 for _ in range(size[0] * size[1])])
+    img = img.resize((size[0] // 8, size[1] // 8)).resize(size, Image.BILINEAR)
+    img.save(path)
+    return path
+
+
+def test_flat_and_low_detail_images_are_not_grouped(converter):
+    make_image(os.path.join(converter.input_dir, "red.png"), (400, 300), (255, 0, 0))
+    make_image(os.path.join(converter.input_dir, "blue.png"), (400, 300), (0, 0, 255))
+    make_image(os.path.join(converter.input_dir, "sku1.png"), (400, 200), (255, 255, 255), "SKU 1234")
+    make_image(os.path.join(converter.input_dir, "sku2.png"), (400, 200), (255, 255, 255), "SKU 9876")
+    results = converter.convert_all(dedupe=True)
+    assert sorted((name, ok) for name, ok, _ in results) == [
+        ("blue.png", True), ("red.png", True), ("sku1.png", True), ("sku2.png", True)]
+    assert not os.path.exists(os.path.join(converter.output_dir, "duplicates.json"))
+    with Image.open(os.path.join(converter.output_dir, "red.webp")) as img:
+        assert img.convert("RGB").getpixel((0, 0))[0] > 200
+    with Image.open(os.path.join(converter.output_dir, "blue.webp")) as img:
+        assert img.convert("RGB").getpixel((0, 0))[2] > 200
+    names = os.listdir(converter.output_dir)
+    assert sorted(names) == ["blue.webp", "red.webp", "sku1.webp", "sku2.webp"]
+    inodes = {os.stat(os.path.join(converter.output_dir, name)).st_ino for name in names}
+    assert len(inodes) == 4
+
+
+def test_resave_is_still_grouped(converter):
+    original = _photo(os.path.join(converter.input_dir, "photo.png"))
+    with Image.open(original) as img:
+        img.save(os.path.join(converter.input_dir, "photo_q50.jpg"), quality=50)
+    _photo(os.path.join(converter.input_dir, "other.png"), seed=4)
+    representatives, duplicates = converter.find_duplicates(
+        [os.path.join(converter.input_dir, name) for name in ("photo.png", "photo_q50.jpg", "other.png")])
+    assert duplicates == {os.path.join(converter.input_dir, "photo_q50.jpg"): original}
+    assert [os.path.basename(path) for path in representatives] == ["photo.png", "other.png"]
+
+
+def test_confirm_duplicates_rejects_different_colors(tmp_path):
+    from dedupe import confirm_duplicates
+    red = make_image(str(tmp_path / "red.png"), (80, 60), (255, 0, 0))
+    red_again = make_image(str(tmp_path / "red2.png"), (40, 30), (250, 2, 0))
+    blue = make_image(str(tmp_path / "blue.png"), (80, 60), (0, 0, 255))
+    wide = make_image(str(tmp_path / "wide.png"), (120, 60), (255, 0, 0))
+    assert confirm_duplicates([(red_again, red), (blue, red), (wide, red)]) == [True, False, False]
+
+
+def test_multi_index_hash_matches_brute_force():
+    from dedupe import MultiIndexHash
+    rng = random.Random(7)
+    base = [rng.getrandbits(64) for _ in range(50)]
+    values = base + [value ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for value in base]
+    for distance in (0, 3, 4, 9):
+        index = MultiIndexHash(distance)
+        for value in values:
+            index.add(value)
+        for value in values[:20]:
+            expected = [i for i, other in enumerate(values) if bin(value ^ other).count("1") <= distance]
+            assert sorted(index.query(value)) == expected
+
+
+def test_group_duplicates_prefers_largest_lossless():
+    from dedupe import group_duplicates
+    items = [("a.jpg", 0b1011, 100, 50), ("b.png", 0b1010, 100, 40), ("c.png", 0b1011, 50, 90),
+             ("d.png", None, 100, 10), ("e.png", ~0b1011 & (2 ** 64 - 1), 100, 10)]
+    representatives, duplicates = group_duplicates(items, max_distance=4)
+    assert representatives == ["b.png", "d.png", "e.png"]
+    assert duplicates == {"a.jpg": "b.png", "c.png": "b.png"}
+
+
+def test_journal_plan_includes_duplicates_for_resume(converter, monkeypatch):
+    import json
+    original = _photo(os.path.join(converter.input_dir, "photo.png"))
+    with Image.open(original) as img:
+        img.save(os.path.join(converter.input_dir, "photo_q50.jpg"), quality=50)
+    _photo(os.path.join(converter.input_dir, "other.png"), seed=4)
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("crash setelah representatif selesai")
+    monkeypatch.setattr(converter, "_finish_duplicates", crash)
+    with pytest.raises(RuntimeError):
+        converter.convert_all(dedupe=True, journal=True)
+    monkeypatch.undo()
+    assert os.listdir(converter.input_dir) == ["photo_q50.jpg"]
+
+    results = converter.resume_batch()
+    assert results == [("photo_q50.jpg", True, os.path.join(converter.output_dir, "photo_q50.webp"))]
+    assert os.listdir(converter.input_dir) == []
+    assert not os.path.exists(converter.journal_path)
+    assert os.path.samefile(os.path.join(converter.output_dir, "photo_q50.webp"),
+                            os.path.join(converter.output_dir, "photo.webp"))
+    with open(os.path.join(converter.output_dir, "duplicates.json"), encoding="utf-8") as f:
+        assert json.load(f) == {"photo_q50.jpg": "photo.png"}
+
+
+def test_journal_with_dedupe_finishes_duplicates(converter):
+    original = _photo(os.path.join(converter.input_dir, "photo.png"))
+    with Image.open(original) as img:
+        img.save(os.path.join(converter.input_dir, "photo_q50.jpg"), quality=50)
+    results = converter.convert_all(dedupe=True, journal=True)
+    assert [(name, ok) for name, ok, _ in results] == [("photo.png", True), ("photo_q50.jpg", True)]
+    assert os.listdir(converter.input_dir) == []
+    assert not os.path.exists(converter.journal_path)
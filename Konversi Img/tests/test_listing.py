@@ -0,0 +1,76 @@
+import os
+
+from listing import DirectorySnapshot
+
+
+def _touch(folder, name, size=10):
+    path = os.path.join(str(folder), name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return path
+
+
+def test_search_is_substring_and_case_insensitive(tmp_path):
+    for name in ("Banner.png", "logo_banner.JPG", "icon.png", "notes.txt", "Anna.jpeg"):
+        _touch(tmp_path, name)
+    snap = DirectorySnapshot(str(tmp_path), (".png", ".jpg", ".jpeg"))
+    assert snap.refresh()
+    assert [e.name for e in snap.search("BANNER")] == ["Banner.png", "logo_banner.JPG"]
+    assert [e.name for e in snap.search("n", extensions=(".png",))] == ["Banner.png", "icon.png"]
+    # "nna" hanya cocok dengan Anna, bukan sambungan dua nama di index
+    assert [e.name for e in snap.search("nna")] == ["Anna.jpeg"]
+    assert [e.name for e in snap.search("g\nl")] == []
+    assert len(snap.search("")) == 4
+
+
+def test_note_added_and_removed_update_index(tmp_path):
+    _touch(tmp_path, "a.png")
+    snap = DirectorySnapshot(str(tmp_path), (".png",))
+    snap.refresh()
+    added = _touch(tmp_path, "b.png", size=42)
+    snap.note_added(added)
+    snap.note_added(_touch(tmp_path, "c.txt"))
+    assert [(e.name, e.size) for e in snap.entries()] == [("a.png", 10), ("b.png", 42)]
+    snap.note_removed("a.png")
+    assert [e.name for e in snap.search("png")] == ["b.png"]
+    # file masih ada di disk: scan penuh mengembalikannya
+    assert snap.refresh(force=True)
+    assert [e.name for e in snap.entries()] == ["a.png", "b.png"]
+
+
+def test_prefix_search_uses_lowercase_order(tmp_path):
+    for name in ("Banner.png", "banner_2.png", "Bar.png", "apple.png", "BANANA.png"):
+        _touch(tmp_path, name)
+    snap = DirectorySnapshot(str(tmp_path), (".png",))
+    snap.refresh()
+    # urutan asli: huruf besar dulu; prefix tetap menemukan semua varian huruf
+    assert [e.name for e in snap.prefix_search("ban")] == ["BANANA.png", "Banner.png", "banner_2.png"]
+    assert [e.name for e in snap.prefix_search("BAR")] == ["Bar.png"]
+    assert snap.prefix_search("x") == []
+
+
+def test_refresh_restats_file_replaced_under_same_name(tmp_path):
+    _touch(tmp_path, "a.png", size=10)
+    snap = DirectorySnapshot(str(tmp_path), (".png",))
+    snap.refresh()
+    # file baru dengan nama sama (inode baru), mtime folder berubah karena rename
+    replacement = _touch(tmp_path, "tmp.bin", size=99)
+    os.replace(replacement, os.path.join(str(tmp_path), "a.png"))
+    _touch(tmp_path, "b.png")
+    assert snap.refresh()
+    assert [(e.name, e.size) for e in snap.entries()] == [("a.png", 99), ("b.png", 10)]
+
+
+def test_substring_index_follows_incremental_updates(tmp_path):
+    _touch(tmp_path, "produk_merah.png")
+    snap = DirectorySnapshot(str(tmp_path), (".png",))
+    snap.refresh()
+    assert [e.name for e in snap.search("merah")] == ["produk_merah.png"]
+    snap.note_added(_touch(tmp_path, "Banner_Merah.png"))
+    assert [e.name for e in snap.search("MERAH")] == ["Banner_Merah.png", "produk_merah.png"]
+    snap.note_removed("produk_merah.png")
+    assert [e.name for e in snap.search("merah")] == ["Banner_Merah.png"]
+    os.remove(os.path.join(str(tmp_path), "Banner_Merah.png"))
+    _touch(tmp_path, "merah_baru.png")
+    snap.refresh(force=True)
+    assert [e.name for e in snap.search("merah")] == ["merah_baru.png", "produk_merah.png"]
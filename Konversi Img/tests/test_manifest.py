@@ -0,0 +1,71 @@
+import os
+import time
+import threading
+
+from conftest import make_image
+
+
+def _wait(predicate, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_watch_with_cache_uses_manifest_from_worker_threads(converter):
+    results = []
+    for i in range(3):
+        make_image(os.path.join(converter.input_dir, "w%d.png" % i), color=(i * 60, 90, 150))
+    watcher = converter.watch(use_cache=True, workers=2, block=False, settle_time=0.1,
+                              force_polling=True, poll_interval=0.1,
+                              on_result=lambda name, ok, info: results.append((name, ok, info)))
+    try:
+        assert _wait(lambda: len(results) == 3)
+    finally:
+        watcher.stop()
+    assert all(ok for _, ok, _ in results), results
+    assert sorted(os.listdir(converter.fail_dir)) == []
+    assert len(converter.manifest) == 3
+
+
+def test_manifest_shared_between_threads(converter):
+    first = make_image(os.path.join(converter.input_dir, "a.png"))
+    assert converter.convert_file(first, use_cache=True)[0]
+    outcome = []
+    second = make_image(os.path.join(converter.input_dir, "b.png"), color=(10, 20, 30))
+    thread = threading.Thread(target=lambda: outcome.append(
+        converter.convert_file(second, use_cache=True)))
+    thread.start()
+    thread.join()
+    assert outcome[0][0], outcome
+    assert len(converter.manifest) == 2
+
+
+def test_lookup_rejects_output_replaced_with_same_size(tmp_path):
+    from manifest import ConversionManifest
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    manifest = ConversionManifest(str(tmp_path / "m.sqlite"), str(output_dir))
+    output = output_dir / "name.webp"
+    output.write_bytes(b"a" * 100)
+    manifest.record(b"d" * 16, "q=80", str(output))
+    assert manifest.lookup(b"d" * 16, "q=80") == str(output)
+
+    # konversi lain menulis output dengan nama dan ukuran sama (tmp + os.replace)
+    replacement = output_dir / "name.webp.part"
+    replacement.write_bytes(b"b" * 100)
+    os.replace(str(replacement), str(output))
+    assert manifest.lookup(b"d" * 16, "q=80") is None
+    manifest.close()
+
+
+def test_identical_input_reuses_cached_output(converter):
+    import shutil
+    first = make_image(os.path.join(converter.input_dir, "a.png"))
+    assert converter.convert_file(first, use_cache=True)[0]
+    shutil.copy(os.path.join(converter.success_dir, "a.png"), os.path.join(converter.input_dir, "b.png"))
+    ok, output = converter.convert_file(os.path.join(converter.input_dir, "b.png"), use_cache=True)
+    assert ok
+    assert os.path.samefile(output, os.path.join(converter.output_dir, "a.webp"))
@@ -0,0 +1,25 @@
+import os
+import pickle
+
+from conftest import make_image
+
+
+def test_metrics_hook_is_not_pickled_to_workers(converter):
+    records = []
+    converter.metrics_hook = lambda record: records.append(record)
+    clone = pickle.loads(pickle.dumps(converter))
+    assert clone.metrics_hook is None
+    assert clone._new_timer().enabled
+
+
+def test_parallel_convert_all_with_closure_hook(converter):
+    records = []
+    converter.metrics_hook = lambda record: records.append(record)
+    for i in range(3):
+        make_image(os.path.join(converter.input_dir, "m%d.png" % i), color=(i * 70, 10, 10))
+    results = converter.convert_all(parallel=True, workers=2)
+    assert [ok for _, ok, _ in results] == [True] * 3
+    files = [r for r in records if r["type"] == "file"]
+    assert sorted(r["file"] for r in files) == ["m0.png", "m1.png", "m2.png"]
+    assert all("encode" in r["stages"] for r in files)
+    assert records[-1]["type"] == "summary" and records[-1]["files"] == 3
@@ -0,0 +1,96 @@
+import io
+import os
+import shutil
+
+from PIL import Image, ImageDraw
+
+from conftest import make_image
+from perceptual import luma_plane, search_ssim, ssim
+
+
+def _pattern(size=(96, 64)):
+    img = Image.new("RGB", size, (240, 240, 240))
+    draw = ImageDraw.Draw(img)
+    for x in range(0, size[0], 12):
+        draw.line((x, 0, size[0] - x, size[1]), fill=(x * 2 % 256, 40, 120), width=3)
+    return img
+
+
+def _padded_encoder(img, size_of, lossy_below=None):
+    """
+    encode(quality): PNG dari img (lossless, atau diblur jika quality < lossy_below)
+    + padding sampai size_of(quality) byte. Trailing byte diabaikan decoder PNG.
+    """
+    calls = []
+
+    def encode(quality):
+        calls.append(quality)
+        source = img
+        if lossy_below is not None and quality < lossy_below:
+            source = img.resize((img.width // 8, img.height // 8)).resize(img.size)
+        buffer = io.BytesIO()
+        source.save(buffer, "PNG")
+        buffer.write(b"\0" * max(0, size_of(quality) - buffer.tell()))
+        return buffer
+    return encode, calls
+
+
+def test_ssim_identical_is_one_and_blur_is_lower():
+    img = _pattern()
+    reference = luma_plane(img)
+    blurred = img.resize((12, 8)).resize(img.size)
+    assert ssim(reference, luma_plane(img)) > 0.999
+    assert ssim(reference, luma_plane(blurred)) < 0.9
+
+
+def test_search_ssim_finds_lowest_passing_quality():
+    img = _pattern()
+    encode, _ = _padded_encoder(img, lambda q: 4000 + 100 * q, lossy_below=37)
+    result = search_ssim(encode, luma_plane(img), 0.95, fixed_quality=80, min_quality=10,
+                         max_probes=10)
+    assert result.fits
+    assert result.quality == 37
+    assert result.size == 4000 + 100 * 37
+    assert result.fixed_size == 4000 + 100 * 80
+
+
+def test_search_ssim_never_returns_larger_than_fixed_probe():
+    # ukuran naik saat quality turun: quality terendah yang lolos justru paling besar
+    img = _pattern()
+    encode, calls = _padded_encoder(img, lambda q: 20000 - 100 * q)
+    result = search_ssim(encode, luma_plane(img), 0.9, fixed_quality=80, min_quality=10)
+    assert result.fits
+    assert calls[0] == 80 and min(calls) < 80
+    assert result.quality == 80
+    assert result.size == result.fixed_size
+
+
+def test_search_ssim_without_passing_probe_returns_best_score():
+    img = _pattern()
+    encode, _ = _padded_encoder(img, lambda q: 5000, lossy_below=101)
+    result = search_ssim(encode, luma_plane(img), 0.999, fixed_quality=80, max_probes=3)
+    assert not result.fits
+    assert result.probes == 3
+
+
+def test_target_ssim_never_larger_than_fixed_quality(converter):
+    img = Image.new("RGB", (64, 48), (200, 80, 40))
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    data, meta = converter.convert_bytes(buffer.getvalue(), quality=80, target_ssim=0.9)
+    assert meta["fixed_quality_bytes"] >= len(data)
+
+
+def test_auto_quality_is_cached_per_content(converter):
+    records = []
+    converter.metrics_hook = records.append
+    first = make_image(os.path.join(converter.input_dir, "a.png"), (160, 120), text="SSIM cache")
+    shutil.copy(first, os.path.join(converter.input_dir, "b.png"))
+    make_image(os.path.join(converter.input_dir, "c.png"), (160, 120), (20, 90, 200), text="other")
+    for name in ("a.png", "b.png", "c.png"):
+        assert converter.convert_file(os.path.join(converter.input_dir, name), target_ssim=0.95)[0]
+    files = {r["file"]: r for r in records if r.get("type") == "file"}
+    assert files["a.png"]["ssim_probes"] > 0
+    assert files["b.png"]["ssim_probes"] == 0
+    assert files["b.png"]["auto_quality"] == files["a.png"]["auto_quality"]
+    assert files["c.png"]["ssim_probes"] > 0
@@ -0,0 +1,75 @@
+import io
+import os
+import threading
+
+from conftest import make_image
+from sizing import search_quality
+
+
+def _fake_encoder(size_of):
+    calls = []
+
+    def encode(quality):
+        calls.append(quality)
+        buffer = io.BytesIO()
+        buffer.write(b"x" * size_of(quality))
+        return buffer
+    return encode, calls
+
+
+def test_search_quality_picks_highest_quality_that_fits():
+    encode, calls = _fake_encoder(lambda q: 100 * q)
+    result = search_quality(encode, 5000, max_quality=95, max_probes=10, tolerance=0)
+    assert result.fits
+    assert result.quality == 50
+    assert result.size <= 5000
+    assert result.probes == len(set(calls))
+
+
+def test_search_quality_stops_within_tolerance():
+    encode, _ = _fake_encoder(lambda q: 100 * q)
+    result = search_quality(encode, 5000, max_quality=95, tolerance=0.05)
+    assert result.fits
+    assert 4750 <= result.size <= 5000
+
+
+def test_search_quality_returns_smallest_when_nothing_fits():
+    encode, _ = _fake_encoder(lambda q: 10000 + q)
+    result = search_quality(encode, 500, max_quality=90, min_quality=20)
+    assert not result.fits
+    assert result.quality == 20
+
+
+def test_target_size_from_main_and_background_thread(converter):
+    first = make_image(os.path.join(converter.input_dir, "a0.png"), size=(320, 240), text="A0")
+    assert converter.convert_file(first, target_size=20000)[0]
+    second = make_image(os.path.join(converter.input_dir, "b0.png"), size=(200, 500), text="B0")
+    outcome = []
+    thread = threading.Thread(target=lambda: outcome.append(
+        converter.convert_file(second, target_size=20000)))
+    thread.start()
+    thread.join()
+    assert outcome[0][0], outcome
+    assert os.listdir(converter.fail_dir) == []
+
+
+def test_cover_crops_when_jpeg_draft_hits_target_size(converter):
+    from PIL import Image
+    jpeg = os.path.join(converter.input_dir, "wide.jpg")
+    png = os.path.join(converter.input_dir, "wide.png")
+    make_image(jpeg, (800, 600), text="JPEG")
+    make_image(png, (800, 600), text="PNG")
+    for path in (jpeg, png):
+        success, output = converter.convert_file(path, max_width=400, max_height=200, fit="cover")
+        assert success, output
+        with Image.open(output) as img:
+            assert img.size == (400, 200)
+
+
+def test_cover_crops_without_upscaling(converter):
+    from PIL import Image
+    path = make_image(os.path.join(converter.input_dir, "small.png"), (300, 200))
+    success, output = converter.convert_file(path, max_width=400, max_height=100, fit="cover")
+    assert success, output
+    with Image.open(output) as img:
+        assert img.size == (300, 100)
@@ -0,0 +1,184 @@
+import os
+import queue
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+logger = logging.getLogger("ImageConverter")
+
+
+class ThumbnailCache:
+    """
+    Cache thumbnail di disk, key = (path, mtime, size, ukuran thumbnail).
+    File disimpan sebagai PNG supaya bisa langsung dibaca tk.PhotoImage.
+    Eviction LRU saat total ukuran melewati max_bytes.
+    """
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024, thumb_size=(300, 220)):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        self.thumb_size = tuple(thumb_size)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> bytes, urutan = paling lama dipakai dulu
+        self._total = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".png"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.name[:-4], st.st_size))
+        # mtime file cache dipakai sebagai waktu akses terakhir (lihat _touch)
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total += size
+        self._evict()
+
+    def _key(self, path, st):
+        raw = "%s|%d|%d|%dx%d" % (os.path.abspath(path), st.st_mtime_ns, st.st_size,
+                                  self.thumb_size[0], self.thumb_size[1])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.cache_dir, key + ".png")
+
+    def _touch(self, key):
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._file(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+
+    def lookup(self, path):
+        """
+        Path thumbnail jika sudah ada di cache, selain itu None. Tidak men-decode gambar.
+        """
+        try:
+            key = self._key(path, os.stat(path))
+        except OSError:
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._touch(key)
+                return self._file(key)
+        return None
+
+    def get(self, path):
+        """
+        Path thumbnail untuk 'path'; dibuat dulu jika belum ada. None jika gagal.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = self._key(path, st)
+        with self._lock:
+            if key in self._entries:
+                self._touch(key)
+                return self._file(key)
+        target = self._file(key)
+        tmp = "%s.%d.tmp" % (target, threading.get_ident())
+        try:
+            with Image.open(path) as img:
+                # JPEG: decode langsung di skala kecil
+                img.draft("RGB", self.thumb_size)
+                img.thumbnail(self.thumb_size)
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA")
+                img.save(tmp, "PNG", compress_level=1)
+            os.replace(tmp, target)
+        except Exception as e:
+            logger.warning("Thumbnail failed for %s: %s", path, e)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return None
+        size = os.path.getsize(target)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = size
+                self._total += size
+            self._touch(key)
+            self._evict()
+        return target
+
+
+class ThumbnailPrefetcher:
+    """
+    Thread background yang membuat thumbnail. request() untuk klik (prioritas),
+    prefetch() untuk baris yang terlihat. Hasil diambil UI lewat poll_results().
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._urgent = queue.Queue()
+        self._background = queue.Queue()
+        self._results = queue.Queue()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._generation = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def request(self, path):
+        self._urgent.put(path)
+        self._wakeup.set()
+
+    def prefetch(self, paths):
+        # daftar baris terlihat yang baru menggantikan daftar lama
+        self._generation += 1
+        generation = self._generation
+        for path in paths:
+            self._background.put((generation, path))
+        self._wakeup.set()
+
+    def poll_results(self):
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def _next_job(self):
+        try:
+            return self._urgent.get_nowait(), True
+        except queue.Empty:
+            pass
+        while True:
+            try:
+                generation, path = self._background.get_nowait()
+            except queue.Empty:
+                return None, False
+            if generation == self._generation:
+                return path, False
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            path, urgent = self._next_job()
+            if path is None:
+                self._wakeup.wait(0.5)
+                continue
+            thumb = self.cache.get(path)
+            if urgent:
+                self._results.put((path, thumb))
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
@@ -0,0 +1,295 @@
+import os
+import sys
+import time
+import queue
+import select
+import struct
+import logging
+import threading
+from memory import MemoryBudget
+
+logger = logging.getLogger("ImageConverter")
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _InotifySource:
+    """
+    Sumber event berbasis inotify (Linux) lewat ctypes, tanpa dependency tambahan.
+    """
+
+    def __init__(self, path):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+        wd = libc.inotify_add_watch(fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, "inotify_add_watch failed for %s" % path)
+        self.fd = fd
+
+    def read(self, timeout):
+        """
+        Tunggu event sampai 'timeout' detik. Mengembalikan list nama file,
+        atau None jika antrean event kernel overflow (perlu scan ulang).
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class _PollingSource:
+    """
+    Fallback berbasis stat: folder hanya di-list ulang jika mtime folder berubah
+    (file baru/rename), jadi saat idle biayanya satu os.stat per interval.
+    """
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self._dir_mtime = None
+        self._known = set()
+        # isi awal dianggap sudah diketahui; file lama ditangani process_existing
+        self._snapshot()
+
+    def _snapshot(self):
+        try:
+            self._dir_mtime = os.stat(self.path).st_mtime_ns
+            with os.scandir(self.path) as it:
+                self._known = {entry.name for entry in it if entry.is_file()}
+        except OSError:
+            pass
+
+    def read(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return []
+        if mtime == self._dir_mtime:
+            return []
+        self._dir_mtime = mtime
+        try:
+            with os.scandir(self.path) as it:
+                current = {entry.name for entry in it if entry.is_file()}
+        except OSError:
+            return []
+        new_names = current - self._known
+        self._known = current
+        return list(new_names)
+
+    def close(self):
+        pass
+
+
+class HotFolderWatcher:
+    """
+    Mode daemon: pantau input_dir, tunggu sampai file selesai ditulis
+    (ukuran & mtime stabil selama settle_time), lalu masukkan ke queue
+    konversi ber-batas yang dikerjakan oleh thread worker.
+    """
+
+    def __init__(self, converter, extensions=None, quality=80, use_cache=False,
+                 settle_time=1.0, queue_size=64, workers=1, poll_interval=1.0,
+                 process_existing=True, force_polling=False, on_result=None, convert_options=None,
+                 memory_budget=None):
+        self.converter = converter
+        self.extensions = extensions
+        self.quality = quality
+        self.use_cache = use_cache
+        self.settle_time = settle_time
+        self.workers = max(1, int(workers))
+        self.poll_interval = poll_interval
+        self.process_existing = process_existing
+        self.force_polling = force_polling
+        self.on_result = on_result
+        self.convert_options = dict(convert_options or {})
+        # batas perkiraan memori semua worker (byte), lihat ImageConverter.estimate_memory
+        self.memory_budget = MemoryBudget(memory_budget) if memory_budget else None
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._pending = {}  # name -> (size, mtime_ns, last_change_time)
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._source = None
+        self.processed = 0
+        self.failed = 0
+
+    def _open_source(self):
+        if not self.force_polling and sys.platform.startswith("linux"):
+            try:
+                source = _InotifySource(self.converter.input_dir)
+                logger.info("HotFolderWatcher: using inotify on %s", self.converter.input_dir)
+                return source
+            except Exception as e:
+                logger.warning("HotFolderWatcher: inotify unavailable (%s), falling back to polling", e)
+        logger.info("HotFolderWatcher: polling %s every %.1fs", self.converter.input_dir, self.poll_interval)
+        return _PollingSource(self.converter.input_dir, self.poll_interval)
+
+    def _notice(self, names):
+        now = time.monotonic()
+        with self._lock:
+            for name in names:
+                if name in self._inflight or not self.converter._is_supported(name, self.extensions):
+                    continue
+                # reset timer settle setiap kali ada event untuk file ini
+                self._pending[name] = (-1, -1, now)
+
+    def _scan_existing(self):
+        try:
+            with os.scandir(self.converter.input_dir) as it:
+                names = [entry.name for entry in it if entry.is_file()]
+        except OSError:
+            names = []
+        self._notice(names)
+
+    def _source_loop(self):
+        while not self._stop.is_set():
+            names = self._source.read(0.5)
+            if names is None:
+                logger.warning("HotFolderWatcher: inotify queue overflow, rescanning input folder")
+                self._scan_existing()
+            elif names:
+                self._notice(names)
+
+    def _settle_loop(self):
+        interval = max(0.05, self.settle_time / 4.0)
+        while not self._stop.is_set():
+            ready = []
+            now = time.monotonic()
+            with self._lock:
+                for name, (size, mtime, changed_at) in list(self._pending.items()):
+                    try:
+                        st = os.stat(os.path.join(self.converter.input_dir, name))
+                    except OSError:
+                        # sudah hilang (dipindah/dihapus) sebelum sempat diproses
+                        del self._pending[name]
+                        continue
+                    if (st.st_size, st.st_mtime_ns) != (size, mtime):
+                        self._pending[name] = (st.st_size, st.st_mtime_ns, now)
+                    elif now - changed_at >= self.settle_time:
+                        del self._pending[name]
+                        self._inflight.add(name)
+                        ready.append(name)
+            for name in ready:
+                # queue ber-batas: blok di sini kalau worker tertinggal
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(name, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+            self._stop.wait(interval)
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                name = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            input_path = os.path.join(self.converter.input_dir, name)
+            cost = None
+            if self.memory_budget is not None:
+                estimate = self.converter.estimate_memory(input_path, **self.convert_options)
+                while not self._stop.is_set():
+                    if self.memory_budget.acquire(estimate, timeout=0.5):
+                        cost = estimate
+                        break
+                if cost is None:
+                    # berhenti sebelum dapat giliran: file tetap di input untuk run berikutnya
+                    with self._lock:
+                        self._inflight.discard(name)
+                    self._queue.task_done()
+                    continue
+            try:
+                success, info = self.converter.convert_file(input_path, quality=self.quality,
+                                                            use_cache=self.use_cache,
+                                                            **self.convert_options)
+            except Exception as e:
+                logger.exception("HotFolderWatcher: convert failed for %s: %s", input_path, e)
+                success, info = False, str(e)
+            finally:
+                if cost is not None:
+                    self.memory_budget.release(cost)
+            with self._lock:
+                self._inflight.discard(name)
+                if success:
+                    self.processed += 1
+                else:
+                    self.failed += 1
+            if self.on_result is not None:
+                try:
+                    self.on_result(name, success, info)
+                except Exception:
+                    logger.exception("HotFolderWatcher: on_result callback failed")
+            self._queue.task_done()
+
+    def start(self):
+        self._stop.clear()
+        self._source = self._open_source()
+        if self.process_existing:
+            self._scan_existing()
+        targets = [self._source_loop, self._settle_loop] + [self._worker_loop] * self.workers
+        for target in targets:
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info("HotFolderWatcher started on %s (workers=%d)", self.converter.input_dir, self.workers)
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+        logger.info("HotFolderWatcher stopped. processed=%d failed=%d", self.processed, self.failed)
+
+    def run_forever(self):
+        self.start()
+        try:
+            while not self._stop.is_set():
+                self._stop.wait(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()